@@ -0,0 +1,296 @@
+"""
+Benchmark harness for the hot paths, driven by a synthetic race day.
+
+Each benchmark times one stage over the same slice of synthetic load with
+pytest-benchmark, then runs it once more under tracemalloc to measure
+allocations. Results are reported per stage as items/s, the peak memory
+the stage allocated above its starting point and the bytes per item it
+still held afterwards, and compared with a stored baseline:
+
+    python -m pytest benchmarks                        # report vs baseline
+    python -m pytest benchmarks --bench-check          # fail on allocation regressions
+    python -m pytest benchmarks --bench-check --bench-check-throughput
+                                                       # ... and on throughput
+    python -m pytest benchmarks --bench-save-baseline  # record a new baseline
+
+Allocation figures are stable across machines for a given Python version,
+so they are what --bench-check gates on. Throughput moves with the host
+and its load: a fixed calibration loop is timed at the start and end of
+the session, each baseline stage records the calibration rate it was
+measured at, and throughput is compared after scaling by the ratio of the
+two rates. Even normalised it is noisy, so its gate is opt-in and has its
+own, wider tolerance.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+
+from bfrepricer.domain.clock import SimulatedClock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.replay.synthetic import SyntheticLoadConfig, SyntheticRaceDay
+from bfrepricer.state.market_state import MarketSnapshot
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# The first off is 15 minutes in, so the slice covers every market's opening
+# snapshot and the pre-off ramp of the earliest races
+LOAD = SyntheticLoadConfig(lead_time=timedelta(minutes=15))
+
+# Absolute slack on allocation comparisons, so tiny figures do not flap
+_ALLOC_SLACK_KIB = 16.0
+_RETAINED_SLACK_B = 16.0
+
+# Calibration: iterations of _calibration_loop per timing, and timings per
+# calibration run
+_CALIBRATION_N = 200_000
+_CALIBRATION_REPEATS = 5
+
+
+@dataclass(frozen=True)
+class StageResult:
+    items: int
+    items_per_s: float | None  # None with --benchmark-disable
+    alloc_peak_kib: float
+    retained_b_per_item: float
+
+
+_results: Dict[str, StageResult] = {}
+_regressions: List[str] = []
+_slower: List[str] = []  # throughput regressions; gated only with --bench-check-throughput
+_calibration: List[float] = []  # calibration loop iterations/s, per timing
+
+
+def _calibration_loop(n: int) -> Dict[int, float]:
+    # Dict, int and float work, the mix the hot paths are made of
+    d: Dict[int, float] = {}
+    for i in range(n):
+        k = i & 1023
+        d[k] = d.get(k, 0.0) + i * 0.5
+    return d
+
+
+def _calibrate() -> None:
+    for _ in range(_CALIBRATION_REPEATS):
+        t0 = time.perf_counter()
+        _calibration_loop(_CALIBRATION_N)
+        _calibration.append(_CALIBRATION_N / (time.perf_counter() - t0))
+
+
+def _calibration_rate() -> float | None:
+    return round(statistics.median(_calibration), 1) if _calibration else None
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("bfrepricer benchmarks")
+    group.addoption("--bench-ticks", type=int, default=5000, help="synthetic books per stage run")
+    group.addoption("--bench-rounds", type=int, default=5, help="timed rounds per stage")
+    group.addoption("--bench-baseline", default=str(BASELINE), help="baseline JSON path")
+    group.addoption("--bench-save-baseline", action="store_true", help="write results as the new baseline")
+    group.addoption("--bench-check", action="store_true", help="fail the run on allocation regressions")
+    group.addoption(
+        "--bench-check-throughput",
+        action="store_true",
+        help="with --bench-check, also fail on calibration-normalised throughput regressions",
+    )
+    group.addoption(
+        "--bench-tolerance", type=float, default=0.25, help="allowed relative allocation regression (default 0.25)"
+    )
+    group.addoption(
+        "--bench-throughput-tolerance",
+        type=float,
+        default=0.5,
+        help="allowed relative normalised throughput regression (default 0.5)",
+    )
+
+
+def _timing(config: pytest.Config) -> bool:
+    return not config.getoption("benchmark_disable", False)
+
+
+def pytest_sessionstart(session: pytest.Session) -> None:
+    if _timing(session.config):
+        _calibrate()
+
+
+class Stage:
+    """Times `target` with pytest-benchmark and measures its allocations."""
+
+    def __init__(self, name: str, benchmark: Any, rounds: int) -> None:
+        self.name = name
+        self._benchmark = benchmark
+        self._rounds = rounds
+
+    def run(
+        self,
+        target: Callable[..., Any],
+        *,
+        items: int,
+        setup: Callable[[], Tuple[Any, ...]] | None = None,
+    ) -> None:
+        """
+        `setup` builds fresh arguments for each round (untimed), for stages
+        that mutate their inputs.
+        """
+        bench_setup = None if setup is None else (lambda: (setup(), {}))
+        self._benchmark.pedantic(target, setup=bench_setup, rounds=self._rounds, warmup_rounds=1)
+
+        stats = getattr(self._benchmark, "stats", None)
+        per_s = items / stats.stats.median if stats is not None and stats.stats.median > 0 else None
+
+        args = setup() if setup is not None else ()
+        tracemalloc.start()
+        try:
+            start, _ = tracemalloc.get_traced_memory()
+            out = target(*args)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del out
+
+        result = StageResult(
+            items=items,
+            items_per_s=None if per_s is None else round(per_s, 1),
+            alloc_peak_kib=round((peak - start) / 1024, 1),
+            retained_b_per_item=round((current - start) / max(1, items), 1),
+        )
+        self._benchmark.extra_info.update(asdict(result))
+        _results[self.name] = result
+
+
+@pytest.fixture
+def stage(request: pytest.FixtureRequest, benchmark: Any) -> Stage:
+    name = request.node.name.removeprefix("test_")
+    return Stage(name, benchmark, request.config.getoption("--bench-rounds"))
+
+
+@pytest.fixture(scope="session")
+def books(request: pytest.FixtureRequest) -> List[Tuple[Any, Dict[str, Any]]]:
+    n = request.config.getoption("--bench-ticks")
+    return list(itertools.islice(SyntheticRaceDay(LOAD).books(), n))
+
+
+@pytest.fixture(scope="session")
+def ticks(books: List[Tuple[Any, Dict[str, Any]]]) -> List[MarketTick]:
+    from bfrepricer.ingest.fast_decode import decode_book
+
+    return [decode_book(book, seq=seq, publish_time=now) for seq, (now, book) in enumerate(books, start=1)]
+
+
+@pytest.fixture(scope="session")
+def snapshots(ticks: List[MarketTick]) -> List[MarketSnapshot]:
+    """The snapshot after each tick, with cooldowns elapsed as they were live."""
+    clock = SimulatedClock()
+    orch = MarketOrchestrator(clock=clock)
+    out = []
+    for tick in ticks:
+        clock.advance_to(tick.publish_time)
+        if orch.apply(tick) is None:
+            out.append(orch.get(tick.market_id).snapshot())
+    return out
+
+
+def _load_baseline(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def _speed_ratio(now: StageResult, base: Dict[str, Any], calibration: float | None) -> float | None:
+    """
+    Throughput relative to the baseline, scaled by the calibration rates;
+    None if either side was not timed or not calibrated.
+    """
+    base_calibration = base.get("calibration_per_s")
+    if now.items_per_s is None or not base.get("items_per_s") or not calibration or not base_calibration:
+        return None
+    return (now.items_per_s / calibration) / (base["items_per_s"] / base_calibration)
+
+
+def _compare_speed(name: str, now: StageResult, base: Dict[str, Any], calibration: float | None, tol: float) -> List[str]:
+    ratio = _speed_ratio(now, base, calibration) if base.get("items") == now.items else None
+    if ratio is None or ratio >= 1 - tol:
+        return []
+    return [f"{name}: normalised throughput {ratio:.2f}x baseline ({now.items_per_s:.0f}/s vs {base['items_per_s']:.0f}/s)"]
+
+
+def _compare(name: str, now: StageResult, base: Dict[str, Any], tol: float) -> List[str]:
+    if base.get("items") != now.items:
+        return []  # different load slice: not comparable
+    out = []
+    if now.alloc_peak_kib > base["alloc_peak_kib"] * (1 + tol) + _ALLOC_SLACK_KIB:
+        out.append(f"{name}: peak alloc {now.alloc_peak_kib} KiB vs baseline {base['alloc_peak_kib']} KiB")
+    if now.retained_b_per_item > base["retained_b_per_item"] * (1 + tol) + _RETAINED_SLACK_B:
+        out.append(
+            f"{name}: retained {now.retained_b_per_item} B/item vs baseline {base['retained_b_per_item']} B/item"
+        )
+    return out
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    if not _results:
+        return
+    config = session.config
+    if _timing(config):
+        _calibrate()  # again at the end: load may have changed during the run
+    calibration = _calibration_rate()
+    path = Path(config.getoption("--bench-baseline"))
+    baseline = _load_baseline(path).get("stages", {})
+    tol = config.getoption("--bench-tolerance")
+    speed_tol = config.getoption("--bench-throughput-tolerance")
+    for name, result in sorted(_results.items()):
+        if name in baseline:
+            _regressions.extend(_compare(name, result, baseline[name], tol))
+            _slower.extend(_compare_speed(name, result, baseline[name], calibration, speed_tol))
+
+    if config.getoption("--bench-save-baseline"):
+        saved = {name: {**asdict(r), "calibration_per_s": calibration} for name, r in sorted(_results.items())}
+        doc = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "stages": {**baseline, **saved},
+        }
+        path.write_text(json.dumps(doc, indent=2) + "\n")
+    elif config.getoption("--bench-check") and session.exitstatus == pytest.ExitCode.OK:
+        if _regressions or (config.getoption("--bench-check-throughput") and _slower):
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter: Any, exitstatus: int, config: pytest.Config) -> None:
+    if not _results:
+        return
+    baseline = _load_baseline(Path(config.getoption("--bench-baseline"))).get("stages", {})
+    calibration = _calibration_rate()
+    tr = terminalreporter
+    tr.section("stage throughput and allocations")
+    if calibration is not None:
+        tr.write_line(f"calibration loop: {calibration:,.0f} iterations/s; 'vs base' is normalised by it")
+    tr.write_line(f"{'stage':<28}{'items':>8}{'items/s':>14}{'vs base':>9}{'peak KiB':>11}{'B/item':>9}")
+    for name, r in sorted(_results.items()):
+        base = baseline.get(name, {})
+        speed = _speed_ratio(r, base, calibration) if base.get("items") == r.items else None
+        ratio = "" if speed is None else f"{speed:.2f}x"
+        per_s = f"{r.items_per_s:,.0f}" if r.items_per_s is not None else "-"
+        tr.write_line(
+            f"{name:<28}{r.items:>8}{per_s:>14}{ratio:>9}{r.alloc_peak_kib:>11.1f}{r.retained_b_per_item:>9.1f}"
+        )
+    for line in _regressions:
+        tr.write_line(f"REGRESSION {line}", red=True)
+    gated = config.getoption("--bench-check-throughput")
+    for line in _slower:
+        tr.write_line(f"{'REGRESSION' if gated else 'SLOWER'} {line}", red=gated, yellow=not gated)
+    if config.getoption("--bench-save-baseline"):
+        tr.write_line(f"baseline written to {config.getoption('--bench-baseline')}")
@@ -0,0 +1,159 @@
+from typing import List
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from bfrepricer.app.pipeline import TradingPipeline
+from bfrepricer.domain.clock import SimulatedClock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.intent import OrderIntent, Side
+from bfrepricer.execution.position import Position
+from bfrepricer.execution.position_book import PositionBook
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+from bfrepricer.ingest.betfair_adapter import market_tick_from_book
+from bfrepricer.ingest.change_filter import ChangeFilter
+from bfrepricer.ingest.fast_decode import decode_book
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.state.market_state import MarketState
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+
+def _intent_batches(ticks: List[MarketTick]) -> List[List[OrderIntent]]:
+    """One intent per runner per tick, alternating sides, at the touch."""
+    batches = []
+    for tick in ticks:
+        batch = []
+        for k, rb in enumerate(tick.runners):
+            side = Side.BACK if (tick.seq + k) % 2 else Side.LAY
+            price = rb.best_lay.price if side is Side.BACK and rb.best_lay else rb.best_back.price if rb.best_back else None
+            if price is not None:
+                batch.append(OrderIntent(tick.market_id, rb.selection_id, side, price, 2.0, "bench"))
+        batches.append(batch)
+    return batches
+
+
+def test_market_tick_from_book(stage, books):
+    def run():
+        for seq, (now, book) in enumerate(books, start=1):
+            market_tick_from_book(book, seq=seq, publish_time=now)
+
+    stage.run(run, items=len(books))
+
+
+def test_decode_book(stage, books):
+    def run():
+        for seq, (now, book) in enumerate(books, start=1):
+            decode_book(book, seq=seq, publish_time=now)
+
+    stage.run(run, items=len(books))
+
+
+def test_market_state_apply(stage, ticks):
+    def setup():
+        return ({tick.market_id: MarketState(tick.market_id) for tick in ticks},)
+
+    def run(states):
+        for tick in ticks:
+            states[tick.market_id].apply(tick)
+        return states
+
+    stage.run(run, setup=setup, items=len(ticks))
+
+
+def test_orchestrator_apply(stage, ticks):
+    def run(orch):
+        for tick in ticks:
+            orch.apply(tick)
+        return orch
+
+    stage.run(run, setup=lambda: (MarketOrchestrator(),), items=len(ticks))
+
+
+def test_strategy_decide(stage, snapshots):
+    def run(strat):
+        for snap in snapshots:
+            strat.decide(snap)
+        return strat
+
+    stage.run(run, setup=lambda: (TopOfBookMicroStrategy(),), items=len(snapshots))
+
+
+def test_risk_filter_intents(stage, ticks):
+    batches = _intent_batches(ticks)
+    positions = PositionBook()
+    # An existing position on every other selection, so both the reduce and
+    # the increase branches are exercised
+    for batch in batches:
+        for i in batch[::2]:
+            positions.apply_fill(i.market_id, i.selection_id, i.side, i.price, 2.0)
+    gate = RiskGate(RiskConfig(max_abs_pos_per_selection=10.0, max_abs_pos_per_market=30.0, max_order_size=2.0))
+
+    def run():
+        for batch in batches:
+            gate.filter_intents(intents=batch, positions=positions)
+
+    stage.run(run, items=sum(map(len, batches)))
+
+
+def test_position_apply_fill(stage, ticks):
+    fills = [(i.market_id, i.selection_id, i.side, i.price) for batch in _intent_batches(ticks) for i in batch]
+
+    def run(positions):
+        for m, s, side, price in fills:
+            pos = positions.get((m, s))
+            if pos is None:
+                pos = positions[(m, s)] = Position()
+            pos.apply_fill(side, price, 2.0)
+        return positions
+
+    stage.run(run, setup=lambda: ({},), items=len(fills))
+
+
+def test_position_book_apply_fill(stage, ticks):
+    fills = [(i.market_id, i.selection_id, i.side, i.price) for batch in _intent_batches(ticks) for i in batch]
+
+    def run(book):
+        for m, s, side, price in fills:
+            book.apply_fill(m, s, side, price, 2.0)
+        return book
+
+    stage.run(run, setup=lambda: (PositionBook(),), items=len(fills))
+
+
+
+def test_portfolio_mark_changed(stage, ticks):
+    portfolio = pytest.importorskip("bfrepricer.execution.portfolio")
+    book = PositionBook()
+    for batch in _intent_batches(ticks):
+        for i in batch:
+            if (i.market_id, i.selection_id) not in book:
+                book.apply_fill(i.market_id, i.selection_id, i.side, i.price, 2.0)
+
+    def run(marker):
+        for tick in ticks:
+            marker.update_market(tick.market_id, tick.runners, tick.removed)
+            marker.mark_changed()
+        return marker
+
+    stage.run(run, setup=lambda: (portfolio.PortfolioMarker(book),), items=len(ticks))
+
+def test_pipeline_on_tick(stage, ticks):
+    def setup():
+        clock = SimulatedClock()
+        pipeline = TradingPipeline(
+            orch=MarketOrchestrator(clock=clock),
+            strat=TopOfBookMicroStrategy(),
+            close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.10, stop_loss_delta=0.10)),
+            risk=RiskGate(RiskConfig(max_abs_pos_per_selection=10.0, max_abs_pos_per_market=30.0, max_order_size=2.0)),
+            change_filter=ChangeFilter(),
+        )
+        return pipeline, clock
+
+    def run(pipeline, clock):
+        for tick in ticks:
+            pipeline.on_tick(tick, now=clock.advance_to(tick.publish_time))
+        return pipeline
+
+    stage.run(run, setup=setup, items=len(ticks))
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from time import perf_counter_ns
+from typing import AbstractSet, Callable, Dict, Sequence, Set
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId, SelectionId
+from bfrepricer.execution.close_rule import CloseRule
+from bfrepricer.execution.engine import ExecutionEngine
+from bfrepricer.execution.intent import OrderIntent
+from bfrepricer.execution.orders import Order, OrderExecutor
+from bfrepricer.execution.risk import SIZE_TOLERANCE, RiskGate
+from bfrepricer.ingest.change_filter import ChangeFilter
+from bfrepricer.observability.latency import LatencyRecorder
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.state.market_state import MarketSnapshot, MarketState
+from bfrepricer.state.orchestrator import ClosedMarket, EvictedMarket, MarketOrchestrator
+
+
+@dataclass(frozen=True, slots=True)
+class TickOutcome:
+    """
+    What the pipeline did with one tick.
+
+    closed: set if this tick closed (and evicted) the market
+    blocked: True if the regime/cooldown guard prevented execution
+    unchanged: True if the change filter dropped the tick as a repeat
+    close_intents: risk-filtered close-rule intents that were executed
+      (submitted, with an executor)
+    intents: risk-filtered entry intents that were executed (submitted)
+    notes: strategy notes for the entry decision
+    """
+    tick: MarketTick
+    closed: ClosedMarket | None = None
+    blocked: bool = False
+    unchanged: bool = False
+    close_intents: Sequence[OrderIntent] = ()
+    intents: Sequence[OrderIntent] = ()
+    notes: str = ""
+
+
+@dataclass
+class TradingPipeline:
+    """
+    One tick through orchestrator -> strategy / close rule -> risk -> execution.
+
+    Close intents take precedence: if the close rule fires for a market, no
+    entries are considered for that market on the same tick.
+
+    With a `change_filter`, ticks that repeat the last seen book only refresh
+    the market's publish time: the book alone cannot produce a different
+    entry decision. Two things can still change the outcome on an unchanged
+    book, so such ticks are evaluated against the current snapshot:
+    - a market that was blocked on its last evaluation and has since become
+      executable (reopen cooldown expired) gets a full evaluation
+    - a market with fills (or unfilled closes) since the close rule last ran
+      gets the close-rule check for those selections; entries are not
+      reconsidered
+
+    Evaluation is incremental: the strategy re-evaluates only the runners in
+    the snapshot's `changed` set, and the close rule only checks runners
+    whose book moved or that were filled since its last check for the
+    market (everything, if a snapshot was missed).
+
+    Risk runs in ledger mode: accepted intents are reserved in the gate's
+    exposure ledger and committed as the engine fills them, so no position
+    state is copied per tick. All fills must go through the pipeline for the
+    ledger to stay in step with the engine.
+
+    Without an `executor` fills are paper and immediate. With one, intents
+    are sent as orders and fills arrive through on_fill / on_close (the
+    pipeline is the executor's listener) at placement or on executor.poll().
+    Exposure then counts in-flight orders: no entry is taken on a selection
+    with any exposure, and no close is sent while one is already in flight.
+
+    With a `latency` recorder every stage is timed per market ("filter",
+    "apply", "close_rule", "strategy", "risk", "execute"), plus "tick" for
+    the whole call and "tick_to_intent" for ticks that produced intents,
+    measured from on_tick entry to the intents being handed to execution.
+
+    `on_outcome` handlers get every TickOutcome before on_tick returns, on
+    the decision path: state that must track every tick (e.g. portfolio
+    prices) belongs there rather than in reporting, which may lag or drop
+    outcomes.
+    """
+    orch: MarketOrchestrator
+    strat: TopOfBookMicroStrategy
+    close_rule: CloseRule
+    risk: RiskGate
+    engine: ExecutionEngine = field(default_factory=ExecutionEngine)
+    change_filter: ChangeFilter | None = None
+    executor: OrderExecutor | None = None
+    latency: LatencyRecorder | None = None
+    on_outcome: Sequence[Callable[[TickOutcome], None]] = ()
+    _blocked: Set[MarketId] = field(default_factory=set, init=False, repr=False)
+    # Per market: last_seq of the snapshot the close rule last checked, and
+    # selections filled (or with unfilled size closed) since then
+    _close_seq: Dict[MarketId, int] = field(default_factory=dict, init=False, repr=False)
+    _filled: Dict[MarketId, Set[SelectionId]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.risk.sync(self.engine.positions)
+        if self.executor is not None:
+            self.executor.listener = self
+        self.orch.add_evict_handler(self._on_evicted)
+
+    def state_for(self, tick: MarketTick) -> MarketState | None:
+        return self.orch.get(tick.market_id)
+
+    def on_tick(self, tick: MarketTick, *, now: datetime | None = None) -> TickOutcome:
+        """
+        `now` overrides the orchestrator clock for the execution guard.
+        """
+        lat = self.latency
+        if lat is None:
+            out = self._on_tick(tick, now, 0)
+        else:
+            start = perf_counter_ns()
+            out = self._on_tick(tick, now, start)
+            lat.lap("tick", start, tick.market_id)
+            if out.closed is not None:
+                lat.forget(tick.market_id)
+        for handler in self.on_outcome:
+            handler(out)
+        return out
+
+    def _on_tick(self, tick: MarketTick, now: datetime | None, start: int) -> TickOutcome:
+        lat = self.latency
+        mid = tick.market_id
+        t = start
+        if self.change_filter is not None:
+            changed = self.change_filter.filter(tick)
+            if lat is not None:
+                t = lat.lap("filter", t, mid)
+            if changed is None:
+                return self._on_unchanged(tick, now, start)
+            tick = changed
+
+        closed = self.orch.apply(tick)
+        if lat is not None:
+            lat.lap("apply", t, mid)
+        if closed is not None:
+            self._forget(mid)
+            return TickOutcome(tick=tick, closed=closed)
+
+        state = self.orch.get(mid)
+        if state is None or not state.can_execute(now=now):
+            self._blocked.add(mid)
+            return TickOutcome(tick=tick, blocked=True)
+
+        return self._evaluate(tick, state, start)
+
+    def _on_unchanged(self, tick: MarketTick, now: datetime | None, start: int) -> TickOutcome:
+        mid = tick.market_id
+        self.orch.mark_seen(mid, tick.publish_time)
+        state = self.orch.get(mid)
+        if state is None or not state.can_execute(now=now):
+            return TickOutcome(tick=tick, unchanged=True)
+        if mid in self._blocked:
+            return self._evaluate(tick, state, start)
+        if self._filled.get(mid):
+            # Positions moved under an unchanged book: closes may now be due
+            return self._evaluate(tick, state, start, entries=False)
+        return TickOutcome(tick=tick, unchanged=True)
+
+    def _forget(self, market_id: MarketId) -> None:
+        self._blocked.discard(market_id)
+        self._close_seq.pop(market_id, None)
+        self._filled.pop(market_id, None)
+        self.strat.forget(market_id)
+
+    def _on_evicted(self, ev: EvictedMarket) -> None:
+        # Dropped by the orchestrator's lifecycle policy: per-market state here
+        # goes too, and a market that comes back is evaluated from scratch
+        self._forget(ev.market_id)
+        if self.change_filter is not None:
+            self.change_filter.forget(ev.market_id)
+        if self.latency is not None:
+            self.latency.forget(ev.market_id)
+
+    def _close_candidates(self, snap: MarketSnapshot) -> AbstractSet[SelectionId] | None:
+        seen = self._close_seq.get(snap.market_id)
+        self._close_seq[snap.market_id] = snap.last_seq
+        filled = self._filled.pop(snap.market_id, set())
+        if seen == snap.last_seq:
+            return filled
+        if seen is not None and seen == snap.changed_since:
+            return filled | snap.changed
+        return None
+
+    def _execute(self, market_id: MarketId, intents: Sequence[OrderIntent]) -> None:
+        if not intents:
+            return
+        if self.executor is not None:
+            self.executor.submit(intents)
+            self.executor.flush()
+            return
+        # Paper fills are immediate, so reservations are committed in full
+        self.engine.process(intents)
+        for i in intents:
+            self.risk.commit(i)
+        self._filled.setdefault(market_id, set()).update(i.selection_id for i in intents)
+
+    def on_fill(self, order: Order, size: float, price: float) -> None:
+        intent = order.intent
+        self.engine.apply_fill(intent, size, price)
+        self.risk.commit(intent, size)
+        self._filled.setdefault(intent.market_id, set()).add(intent.selection_id)
+
+    def on_close(self, order: Order, size: float) -> None:
+        intent = order.intent
+        self.risk.release(intent, size)
+        # A close that did not (fully) fill must be re-checked, even on an
+        # unchanged book (see _on_unchanged)
+        self._filled.setdefault(intent.market_id, set()).add(intent.selection_id)
+
+    def _evaluate(self, tick: MarketTick, state: MarketState, start: int = 0, *, entries: bool = True) -> TickOutcome:
+        """With entries=False only the close rule runs; if it sends nothing the tick stays `unchanged`."""
+        lat = self.latency
+        mid = tick.market_id
+        self._blocked.discard(mid)
+        t = perf_counter_ns() if lat is not None else 0
+        snap = state.snapshot()
+        close_intents = self.close_rule.decide_closes(
+            market_id=mid,
+            runners=snap.runners,
+            positions=self.engine.positions,
+            selections=self._close_candidates(snap),
+        )
+        if lat is not None:
+            t = lat.lap("close_rule", t, mid)
+        if close_intents:
+            close_intents = self.risk.reserve_intents(
+                i for i in close_intents
+                if abs(self.risk.in_flight(i.market_id, i.selection_id)) < SIZE_TOLERANCE
+            )
+            if lat is not None:
+                t = self._lap_risk(t, start, mid, close_intents)
+            self._execute(mid, close_intents)
+            if lat is not None:
+                lat.lap("execute", t, mid)
+            return TickOutcome(tick=tick, close_intents=tuple(close_intents))
+        if not entries:
+            return TickOutcome(tick=tick, unchanged=True)
+
+        decision = self.strat.decide(snap)
+        if lat is not None:
+            t = lat.lap("strategy", t, mid)
+
+        # Suppress entry if we already have a position (or order) on that selection
+        filtered = [
+            i for i in decision.intents if abs(self.risk.exposure(i.market_id, i.selection_id)) < SIZE_TOLERANCE
+        ]
+
+        intents = self.risk.reserve_intents(filtered)
+        if lat is not None:
+            t = self._lap_risk(t, start, mid, intents)
+        self._execute(mid, intents)
+        if lat is not None:
+            lat.lap("execute", t, mid)
+        return TickOutcome(tick=tick, intents=tuple(intents), notes=decision.notes)
+
+    def _lap_risk(self, t: int, start: int, market_id: MarketId, intents: Sequence[OrderIntent]) -> int:
+        lat = self.latency
+        assert lat is not None
+        now = lat.lap("risk", t, market_id)
+        if intents and start:
+            lat.record("tick_to_intent", now - start, market_id)
+        return now
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import timedelta
 
+from bfrepricer.domain.clock import SimulatedClock
 from bfrepricer.domain.events import MarketTick
 from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId, utc_now
 from bfrepricer.pricing.strategy import StrategyConfig, TopOfBookMicroStrategy
@@ -12,6 +13,7 @@ def mk_tick(
     mid: MarketId,
     seq: int,
     *,
+    clock: SimulatedClock,
     is_open: bool | None = None,
     in_play: bool | None = None,
     is_closed: bool | None = None,
@@ -26,7 +28,7 @@ def mk_tick(
     return MarketTick(
         market_id=mid,
         seq=seq,
-        publish_time=utc_now(),
+        publish_time=clock.now(),
         runners=(rb,),
         is_market_open=is_open,
         is_in_play=in_play,
@@ -35,34 +37,34 @@ def mk_tick(
 
 
 def main() -> None:
-    orch = MarketOrchestrator()
+    # Virtual time: the reopen cooldown is exercised without sleeping
+    clock = SimulatedClock(utc_now())
+    orch = MarketOrchestrator(clock=clock)
     strat = TopOfBookMicroStrategy(
         StrategyConfig(
             min_size=2.0,
-            max_spread_ticks=0.10,
+            max_spread_ticks=5,
             stake_size=2.0,
         )
     )
 
     mid = MarketId("1.1")
 
-    ticks = [
-        mk_tick(mid, 1, is_open=True, back=(2.00, 10.0), lay=(2.02, 12.0)),   # OPEN (cooldown will apply if UNKNOWN->OPEN)
-        mk_tick(mid, 2, is_open=False, back=(2.00, 10.0), lay=(2.02, 12.0)),  # SUSPENDED
-        mk_tick(mid, 3, is_open=True, back=(2.00, 10.0), lay=(2.02, 12.0)),   # REOPEN (cooldown applies)
-        mk_tick(mid, 4, is_open=True, back=(2.00, 10.0), lay=(2.02, 12.0)),   # still OPEN
-        mk_tick(mid, 5, in_play=True, back=(2.00, 10.0), lay=(2.02, 12.0)),   # IN_PLAY lockout
-        mk_tick(mid, 6, is_closed=True, back=(2.00, 10.0), lay=(2.02, 12.0)), # CLOSED terminal
+    book = dict(back=(2.00, 10.0), lay=(2.02, 12.0))
+    # (seconds elapsed before the tick is published, seq, flags)
+    script = [
+        (0, 1, dict(is_open=True)),    # OPEN (cooldown will apply if UNKNOWN->OPEN)
+        (1, 2, dict(is_open=False)),   # SUSPENDED
+        (1, 3, dict(is_open=True)),    # REOPEN (cooldown applies)
+        (3, 4, dict(is_open=True)),    # still OPEN, cooldown has elapsed
+        (1, 5, dict(in_play=True)),    # IN_PLAY lockout
+        (1, 6, dict(is_closed=True)),  # CLOSED terminal
     ]
 
     print("paper runner: starting")
-    for t in ticks:
-        if t.seq == 4:
-            import time
-            time.sleep(3)
-        if t.seq == 4:
-            import time
-            time.sleep(3)
+    for wait_s, seq, flags in script:
+        clock.advance(timedelta(seconds=wait_s))
+        t = mk_tick(mid, seq, clock=clock, **flags, **book)
         closed = orch.apply(t)
         state = orch.get(t.market_id)
 
@@ -75,8 +77,6 @@ def main() -> None:
             continue
 
         snap = state.snapshot()
-        # For paper runner, we override time to allow cooldown demonstration by manually advancing
-        # but since utc_now() moves, we just check and report.
         if not state.can_execute():
             print(f"[{t.seq}] regime={snap.regime.name} cooldown_until={snap.cooldown_until} -> NO EXEC (guard)")
             continue
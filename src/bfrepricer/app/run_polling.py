@@ -1,150 +1,239 @@
 from __future__ import annotations
 
+import asyncio
 import os
-import time
-
-from bfrepricer.ingest.betfair_adapter import market_tick_from_book
-from bfrepricer.ingest.betfair_rest import BetfairClient
+import signal
+from datetime import datetime, timedelta
+
+from bfrepricer.app.pipeline import TickOutcome, TradingPipeline
+from bfrepricer.app.runtime import TradingRuntime, poll_feed
+from bfrepricer.domain.types import MarketId
+from bfrepricer.ingest.betfair_rest import AsyncBetfairClient
+from bfrepricer.ingest.change_filter import ChangeFilter
+from bfrepricer.ingest.poll_scheduler import PollConfig, PollScheduler
 from bfrepricer.pricing.strategy import StrategyConfig, TopOfBookMicroStrategy
 from bfrepricer.execution.engine import ExecutionEngine
 from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
 from bfrepricer.execution.risk import RiskGate, RiskConfig
 from bfrepricer.execution.mark_to_market import mark_to_market
-from bfrepricer.state.orchestrator import MarketOrchestrator
+from bfrepricer.observability.latency import LatencyRecorder, StatsServer
+from bfrepricer.state.orchestrator import EvictedMarket, LifecycleConfig, MarketOrchestrator
+from bfrepricer.state.spill import SnapshotSpill
 
+try:
+    from bfrepricer.execution.portfolio import PortfolioMarker
+except ImportError:  # NumPy is optional: mark position by position instead
+    PortfolioMarker = None  # type: ignore[assignment, misc]
 
-def main() -> None:
+
+def _parse_start_time(raw: str | None) -> datetime | None:
+    if not raw:
+        return None
+    return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+
+
+async def run() -> None:
     app_key = os.environ["BETFAIR_APP_KEY"]
     session = os.environ["BETFAIR_SESSION_TOKEN"]
 
-    bf = BetfairClient(app_key, session)
+    bf = AsyncBetfairClient(app_key, session)
 
-    print("polling runner: discovering market")
+    print("polling runner: discovering markets")
 
-    # UK / GB WIN horse racing today
-    cats = bf.list_market_catalogue(
+    # UK / IE WIN horse racing today
+    cats = await bf.list_market_catalogue(
         filter={
             "eventTypeIds": ["7"],  # Horse Racing
             "marketTypeCodes": ["WIN"],
-            "marketCountries": ["GB"],
+            "marketCountries": ["GB", "IE"],
             "inPlayOnly": False,
         },
-        max_results=1,
+        max_results=1000,
+        market_projection=["MARKET_START_TIME"],
+        sort="FIRST_TO_START",
     )
 
     if not cats:
+        await bf.aclose()
         raise RuntimeError("No markets found")
 
-    market_id = cats[0]["marketId"]
-    print(f"polling runner: market_id={market_id}")
+    latency = LatencyRecorder()
+    stats: StatsServer | None = None
+    if os.environ.get("BFREPRICER_STATS_PORT"):
+        stats = StatsServer(latency, port=int(os.environ["BFREPRICER_STATS_PORT"])).start()
+        print(f"polling runner: latency stats at {stats.url}")
+
+    scheduler = PollScheduler(bf.list_market_book_raw, PollConfig(), latency=latency)
+    for c in cats:
+        scheduler.track(MarketId(c["marketId"]), _parse_start_time(c.get("marketStartTime")))
+    print(f"polling runner: tracking {len(cats)} markets")
+
+    # Closed markets' snapshots only guard against late ticks; keep them
+    # (and a previous run's leftovers) for a few hours, not forever
+    spill_ttl = timedelta(hours=6).total_seconds()
+    spill = None
+    if os.environ.get("BFREPRICER_SPILL_DIR"):
+        spill = SnapshotSpill(os.environ["BFREPRICER_SPILL_DIR"], closed_ttl=spill_ttl)
+        spill.prune(older_than=spill_ttl)
+    # Markets that never close (voided, missed close) must not pile up
+    orch = MarketOrchestrator(
+        lifecycle=LifecycleConfig(idle_after=timedelta(hours=2), max_markets=5000),
+        spill=spill,
+        on_close=[spill.record_closed] if spill is not None else (),
+    )
 
-    orch = MarketOrchestrator()
-    strat = TopOfBookMicroStrategy(StrategyConfig())
     exec_engine = ExecutionEngine()
-    close_rule = CloseRule(CloseRuleConfig(take_profit_delta=0.10, stop_loss_delta=0.10))
-    risk = RiskGate(RiskConfig(max_abs_pos_per_selection=10.0, max_abs_pos_per_market=30.0, max_order_size=2.0))
+    marker = PortfolioMarker(exec_engine.positions) if PortfolioMarker is not None else None
+
+    def mark_prices(out: TickOutcome) -> None:
+        # On the decision path (TradingPipeline.on_outcome), not in report():
+        # reporting lags and drops outcomes under load, prices must not
+        tick = out.tick
+        if out.closed:
+            marker.forget_market(tick.market_id)
+            return
+        if out.unchanged:
+            return
+        state = orch.get(tick.market_id)
+        if state is None:
+            return
+        # An evaluated tick left its snapshot cached (free to re-read, and it
+        # covers runners just filled); a blocked one only moved the runners
+        # it carries
+        if out.blocked:
+            marker.update_market(tick.market_id, tick.runners, tick.removed)
+        else:
+            marker.update_market(tick.market_id, state.snapshot().runners.values(), tick.removed)
+
+    pipeline = TradingPipeline(
+        orch=orch,
+        strat=TopOfBookMicroStrategy(StrategyConfig()),
+        close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.10, stop_loss_delta=0.10)),
+        risk=RiskGate(RiskConfig(max_abs_pos_per_selection=10.0, max_abs_pos_per_market=30.0, max_order_size=2.0)),
+        engine=exec_engine,
+        change_filter=ChangeFilter(),
+        latency=latency,
+        on_outcome=[mark_prices] if marker is not None else (),
+    )
+
     loops = 0
     HEARTBEAT_EVERY = 10
+    LATENCY_EVERY = 1000
     last_exec_snapshot = None
-
-    seq = 1
     last_sig_by_market = {}
-    while True:
-        books = bf.list_market_book(market_id)
-        if not books:
-            time.sleep(2)
-            continue
 
-        tick = market_tick_from_book(books[0], seq=seq)
-        seq += 1
+    def on_evict(ev: EvictedMarket) -> None:
+        last_sig_by_market.pop(ev.market_id, None)
+        if marker is not None:
+            marker.forget_market(ev.market_id)
 
-        closed = orch.apply(tick)
-        if closed:
-            print(f"CLOSED -> evicted {closed.market_id}")
-            break
+    orch.add_evict_handler(on_evict)
 
-        state = orch.get(tick.market_id)
+    def report(out: TickOutcome) -> None:
+        nonlocal loops, last_exec_snapshot
+        tick = out.tick
+
+        if out.closed:
+            print(f"CLOSED -> evicted {out.closed.market_id}")
+            last_sig_by_market.pop(tick.market_id, None)
+            return
+
+        # Identical book to the last poll: nothing downstream re-ran
+        if out.unchanged:
+            return
+
+        state = pipeline.state_for(tick)
         if not state:
-            continue
+            return
 
         loops += 1
         if loops % HEARTBEAT_EVERY == 0:
             snap = state.snapshot()
             print(
-                f"[{tick.seq}] HEARTBEAT regime={snap.regime.name} "
+                f"[{tick.market_id}:{tick.seq}] HEARTBEAT regime={snap.regime.name} "
                 f"in_play={snap.regime.name == 'IN_PLAY'} "
                 f"can_execute={state.can_execute()}"
             )
+        if loops % LATENCY_EVERY == 0:
+            print(latency.format())
+
+        if out.blocked:
+            return
+
+        if out.close_intents:
+            print(f"[{tick.market_id}:{tick.seq}] CLOSE {[(i.side.value, i.selection_id, i.price, i.size, i.reason) for i in out.close_intents]}")
+            return
 
-        if not state.can_execute():
-            print(f"[{tick.seq}] guard blocked (regime/cooldown)")
-            time.sleep(2)
-            continue
-
-        decision = strat.decide(state.snapshot())
-        snap = state.snapshot()
-        close_intents = close_rule.decide_closes(
-            market_id=tick.market_id,
-            runners=snap.runners,
-            positions=exec_engine.positions,
-        )
-        if close_intents:
-            close_intents = risk.filter_intents(intents=close_intents, positions=dict(exec_engine.positions))
-            exec_engine.process(close_intents)
-            print(f"[{tick.seq}] CLOSE {[(i.side.value, i.selection_id, i.price, i.size, i.reason) for i in close_intents]}")
-            time.sleep(2)
-            continue
-
-        # Suppress entry if we already have a position on that selection
-        filtered = []
-        for i in decision.intents:
-            pos = exec_engine.positions.get((i.market_id, i.selection_id))
-            if pos and pos.size != 0:
-                continue
-            filtered.append(i)
-        decision = decision.__class__(intents=tuple(filtered), notes=decision.notes)
-        filtered_intents = risk.filter_intents(intents=decision.intents, positions=dict(exec_engine.positions))
-        decision = decision.__class__(intents=tuple(filtered_intents), notes=decision.notes)
-        exec_engine.process(decision.intents)
-        loops += 1
         # REPORT: only print when positions snapshot changes AND a fill happened
-        if decision.intents:
+        if out.intents:
             snap_exec = exec_engine.snapshot()
             if snap_exec != last_exec_snapshot:
                 last_exec_snapshot = snap_exec
-                # Enrich with mark-to-market PnL
+                # Enrich with mark-to-market PnL, re-pricing only what moved
+                marks = marker.mark_changed() if marker is not None else None
                 enriched = {}
+                unrealized_total = 0.0
                 for (m, s_id), pos in exec_engine.positions.items():
-                    rb = state.snapshot().runners.get(s_id)
-                    mtm = mark_to_market(pos, best_back=rb.best_back if rb else None, best_lay=rb.best_lay if rb else None)
+                    if marks is not None:
+                        mtm = float(marks.unrealized[pos.slot])
+                    else:
+                        m_state = pipeline.orch.get(m)
+                        rb = m_state.snapshot().runners.get(s_id) if m_state else None
+                        mtm = mark_to_market(pos, best_back=rb.best_back if rb else None, best_lay=rb.best_lay if rb else None)
+                    unrealized_total += mtm
                     enriched[f"{m}:{s_id}"] = {
                         **snap_exec[f"{m}:{s_id}"],
                         "unrealized_pnl": round(mtm, 4),
                         "total_pnl": round(pos.realized_pnl + mtm, 4),
                     }
-                print(f"[{tick.seq}] POSITIONS {enriched}")
+                print(f"[{tick.market_id}:{tick.seq}] POSITIONS {enriched} unrealized_total={unrealized_total:.4f}")
 
         # DEDUPE: only emit if intents changed for this market
         sig = tuple(
             (i.selection_id, i.side.value, round(i.price, 4), round(i.size, 4), i.reason)
-            for i in decision.intents
+            for i in out.intents
         )
         last_sig = last_sig_by_market.get(tick.market_id)
 
         if sig != last_sig:
             last_sig_by_market[tick.market_id] = sig
             if not sig:
-                print(f"[{tick.seq}] NO INTENT ({decision.notes})")
+                print(f"[{tick.market_id}:{tick.seq}] NO INTENT ({out.notes})")
             else:
-                for intent in decision.intents:
+                for intent in out.intents:
                     print(
-                        f"[{tick.seq}] INTENT {intent.side.value} "
+                        f"[{tick.market_id}:{tick.seq}] INTENT {intent.side.value} "
                         f"sel={intent.selection_id} "
                         f"price={intent.price} size={intent.size} "
                         f"reason='{intent.reason}'"
                     )
 
-        time.sleep(2)
+    # Decisions run as ticks arrive; report() runs behind them when idle
+    runtime = TradingRuntime(pipeline, report=report)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):  # e.g. Windows
+            pass
+
+    try:
+        await runtime.run([poll_feed(scheduler)], stop=stop)
+    finally:
+        scheduler.close()
+        await bf.aclose()
+        if stats is not None:
+            stats.stop()
+        print(latency.format())
+        print(
+            f"polling runner: {runtime.processed} ticks, {runtime.queue.conflated} conflated, "
+            f"{runtime.reports_dropped} reports dropped"
+        )
+
+
+def main() -> None:
+    asyncio.run(run())
 
 
 if __name__ == "__main__":
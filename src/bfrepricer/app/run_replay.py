@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import sys
+
+from bfrepricer.app.pipeline import TradingPipeline
+from bfrepricer.domain.clock import SimulatedClock
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.engine import ExecutionEngine
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+from bfrepricer.pricing.strategy import StrategyConfig, TopOfBookMicroStrategy
+from bfrepricer.replay.driver import replay
+from bfrepricer.replay.tick_log import read_ticks
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        raise SystemExit("usage: python -m bfrepricer.app.run_replay <tick-log>")
+
+    clock = SimulatedClock()
+    pipeline = TradingPipeline(
+        orch=MarketOrchestrator(clock=clock),
+        strat=TopOfBookMicroStrategy(StrategyConfig()),
+        close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.10, stop_loss_delta=0.10)),
+        risk=RiskGate(RiskConfig(max_abs_pos_per_selection=10.0, max_abs_pos_per_market=30.0, max_order_size=2.0)),
+        engine=ExecutionEngine(),
+    )
+
+    print(f"replay runner: {args[0]}")
+    stats = replay(read_ticks(args[0]), pipeline, clock=clock)
+    print(
+        f"replay runner: ticks={stats.ticks} closed={stats.closed} blocked={stats.blocked} "
+        f"intents={stats.intents} close_intents={stats.close_intents} rejected={stats.rejected} "
+        f"elapsed={stats.elapsed_s:.3f}s ({stats.ticks_per_s:,.0f} ticks/s)"
+    )
+    print(f"replay runner: POSITIONS {pipeline.engine.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
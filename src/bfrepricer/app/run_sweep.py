@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+from bfrepricer.backtest.columns import TickColumns
+from bfrepricer.backtest.sweep import SweepTable, Uniform, grid, random_search, run_sweep
+from bfrepricer.replay.tick_log import read_ticks
+
+
+def _parse_axis(spec: str) -> tuple[str, list[float] | Uniform]:
+    """
+    "close.take_profit_delta=0.05,0.1,0.2" -> listed values
+    "close.take_profit_delta=0.05:0.3"     -> Uniform range (random search only)
+    """
+    name, sep, values = spec.partition("=")
+    if not sep or not values:
+        raise SystemExit(f"bad --param {spec!r}, expected section.field=v1,v2,... or section.field=lo:hi")
+    if ":" in values:
+        lo, hi = values.split(":", 1)
+        return name, Uniform(float(lo), float(hi))
+    return name, [float(v) for v in values.split(",")]
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m bfrepricer.app.run_sweep")
+    ap.add_argument("tick_log")
+    ap.add_argument("--param", action="append", default=[], help="section.field=v1,v2,... or section.field=lo:hi")
+    ap.add_argument("--random", type=int, default=0, help="sample N random points instead of the full grid")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--workers", type=int, default=None, help="default: all cores; 0 runs in-process")
+    ap.add_argument("--data-dir", default=None, help="where to keep the column files (default: temp dir)")
+    ap.add_argument("--top", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    space = dict(_parse_axis(p) for p in args.param)
+    if args.random:
+        points = list(random_search(space, args.random, seed=args.seed))
+    else:
+        if any(isinstance(v, Uniform) for v in space.values()):
+            raise SystemExit("lo:hi ranges need --random N")
+        points = list(grid(space))
+
+    with tempfile.TemporaryDirectory(prefix="bfr-sweep-") as tmp:
+        data_dir = args.data_dir or tmp
+        t0 = time.perf_counter()
+        cols = TickColumns.from_ticks(read_ticks(args.tick_log))
+        cols.save(data_dir)
+        print(f"sweep runner: {len(cols)} rows, {len(cols.market_ids)} markets ({time.perf_counter() - t0:.2f}s)")
+
+        table = SweepTable()
+        t0 = time.perf_counter()
+        for result in run_sweep(data_dir, points, max_workers=args.workers):
+            table.add(result)
+            if len(table) % 50 == 0:
+                print(f"sweep runner: {len(table)}/{len(points)} done")
+        elapsed = time.perf_counter() - t0
+
+    print(f"sweep runner: {len(points)} points in {elapsed:.2f}s")
+    print(table.format(top=args.top))
+
+
+if __name__ == "__main__":
+    main()
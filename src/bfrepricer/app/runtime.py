@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Sequence
+
+from bfrepricer.app.pipeline import TickOutcome, TradingPipeline
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId
+from bfrepricer.ingest.poll_scheduler import PollScheduler
+
+
+def _flags(tick: MarketTick) -> tuple[bool | None, bool | None, bool | None]:
+    return tick.is_market_open, tick.is_in_play, tick.is_closed
+
+
+def _merge(older: MarketTick, newer: MarketTick) -> MarketTick:
+    """One tick equivalent to applying `older` then `newer` (same flags)."""
+    if not older.runners and not older.removed:
+        return newer
+    runners = {rb.selection_id: rb for rb in older.runners}
+    for sel in older.removed:
+        runners.pop(sel, None)
+    rebooked = set()
+    for rb in newer.runners:
+        runners[rb.selection_id] = rb
+        rebooked.add(rb.selection_id)
+    for sel in newer.removed:
+        runners.pop(sel, None)
+    removed = tuple(dict.fromkeys([sel for sel in older.removed if sel not in rebooked] + list(newer.removed)))
+    return MarketTick(
+        market_id=newer.market_id,
+        seq=newer.seq,
+        publish_time=newer.publish_time,
+        runners=tuple(runners.values()),
+        is_market_open=newer.is_market_open,
+        is_in_play=newer.is_in_play,
+        is_closed=newer.is_closed,
+        removed=removed,
+    )
+
+
+class LatestTickQueue:
+    """
+    Bounded asyncio queue of ticks that keeps only the latest per market.
+
+    A tick for a market that already has one pending replaces it: runner
+    updates are merged (newer wins per selection), so nothing the consumer
+    would have applied is lost, only the intermediate states it would never
+    have acted on in time. Ticks are merged only when their market flags are
+    equal; a status change (suspend, reopen, in-play, close) is queued
+    behind the pending tick so the state sees the transition.
+
+    Markets are served in the order they became pending. The bound is on
+    pending markets: put() for a market that is not pending waits while
+    `maxsize` markets are, which holds the producers back; a put for a
+    pending market never waits.
+
+    Single event loop only.
+    """
+
+    def __init__(self, maxsize: int = 1000) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self._maxsize = maxsize
+        self._pending: Dict[MarketId, List[MarketTick]] = {}
+        self._n = 0
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._empty = asyncio.Event()
+        self._empty.set()
+        self._closed = False
+        self.puts = 0
+        self.conflated = 0
+        self.high_water = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def pending_markets(self) -> int:
+        return len(self._pending)
+
+    def full(self) -> bool:
+        return len(self._pending) >= self._maxsize
+
+    async def put(self, tick: MarketTick) -> None:
+        while tick.market_id not in self._pending and self.full():
+            self._not_full.clear()
+            await self._not_full.wait()
+        self.put_nowait(tick)
+
+    def put_nowait(self, tick: MarketTick) -> None:
+        """Enqueue without waiting; may exceed `maxsize` (for callers that must not block)."""
+        if self._closed:
+            raise RuntimeError("queue closed")
+        self.puts += 1
+        ticks = self._pending.get(tick.market_id)
+        if ticks is None:
+            self._pending[tick.market_id] = [tick]
+            self._n += 1
+        elif _flags(ticks[-1]) == _flags(tick):
+            ticks[-1] = _merge(ticks[-1], tick)
+            self.conflated += 1
+        else:
+            ticks.append(tick)
+            self._n += 1
+        self.high_water = max(self.high_water, len(self._pending))
+        self._empty.clear()
+        self._not_empty.set()
+
+    async def get(self) -> MarketTick | None:
+        """Oldest pending market's next tick; None once closed and drained."""
+        while not self._pending:
+            if self._closed:
+                return None
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        mid = next(iter(self._pending))
+        ticks = self._pending[mid]
+        tick = ticks.pop(0)
+        self._n -= 1
+        if not ticks:
+            del self._pending[mid]
+            if not self.full():
+                self._not_full.set()
+            if not self._pending:
+                self._empty.set()
+        return tick
+
+    async def wait_empty(self) -> None:
+        await self._empty.wait()
+
+    def close(self) -> None:
+        """No more puts; get() returns None once the pending ticks are taken."""
+        self._closed = True
+        self._not_empty.set()
+
+
+# A feed produces ticks into the queue until it is exhausted or `stop` is set
+Feed = Callable[[LatestTickQueue, asyncio.Event], Awaitable[None]]
+
+
+def poll_feed(scheduler: PollScheduler, *, min_sleep: float = 0.05) -> Feed:
+    """REST polling through PollScheduler.run_async (async fetch_books) on the event loop."""
+
+    async def feed(queue: LatestTickQueue, stop: asyncio.Event) -> None:
+        await scheduler.run_async(queue.put, stop=stop, min_sleep=min_sleep)
+
+    return feed
+
+
+_END = object()
+
+
+def iter_feed(ticks: Iterable[MarketTick]) -> Feed:
+    """
+    Ticks from a blocking iterator (e.g. StreamingClient.ticks()), each
+    pulled on a worker thread so the loop keeps running while it waits.
+    """
+
+    async def feed(queue: LatestTickQueue, stop: asyncio.Event) -> None:
+        it = iter(ticks)
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            tick = await loop.run_in_executor(None, next, it, _END)
+            if tick is _END:
+                return
+            await queue.put(tick)
+
+    return feed
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """
+    max_pending_markets: LatestTickQueue bound
+    report_buffer: outcomes kept for the reporting task; the oldest are
+      dropped when reporting falls this far behind
+    """
+    max_pending_markets: int = 1000
+    report_buffer: int = 10_000
+
+
+class TradingRuntime:
+    """
+    asyncio runtime around a TradingPipeline.
+
+    - feeds (one task each) produce ticks into a LatestTickQueue
+    - one decision task takes ticks as soon as they arrive and runs them
+      through the pipeline (orchestrator, close rule / strategy, risk,
+      execution); it is the only task that touches pipeline state
+    - a reporting task hands outcomes to `report`, only while no tick is
+      waiting, so printing never delays a decision; when it falls behind by
+      `report_buffer` outcomes the oldest are dropped
+
+    run() returns once every feed has finished and the queue is drained,
+    or promptly after `stop` is set. An exception in any task stops the
+    runtime and is raised from run().
+    """
+
+    def __init__(
+        self,
+        pipeline: TradingPipeline,
+        cfg: RuntimeConfig = RuntimeConfig(),
+        *,
+        report: Callable[[TickOutcome], None] | None = None,
+    ) -> None:
+        self.pipeline = pipeline
+        self.cfg = cfg
+        self.queue = LatestTickQueue(cfg.max_pending_markets)
+        self._report = report
+        self._outcomes: Deque[TickOutcome] = deque(maxlen=cfg.report_buffer)
+        self._outcome_ready = asyncio.Event()
+        self.processed = 0
+        self.reports_dropped = 0
+
+    async def run(self, feeds: Sequence[Feed], *, stop: asyncio.Event | None = None) -> None:
+        stop = stop or asyncio.Event()
+        producers = [asyncio.create_task(feed(self.queue, stop), name=f"feed-{i}") for i, feed in enumerate(feeds)]
+        decisions = asyncio.create_task(self._decide(stop), name="decisions")
+        reporting = asyncio.create_task(self._reporting(), name="reporting")
+
+        async def close_when_fed() -> None:
+            await asyncio.gather(*producers)
+            self.queue.close()
+
+        feeding = asyncio.create_task(close_when_fed(), name="feeding")
+        try:
+            # Ends when decisions finish (fed and drained, or stopped) or any task fails
+            pending = {feeding, decisions}
+            while decisions in pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+        finally:
+            for task in (*producers, feeding, decisions, reporting):
+                task.cancel()
+            await asyncio.gather(*producers, feeding, decisions, reporting, return_exceptions=True)
+        self._flush_reports()
+
+    async def _decide(self, stop: asyncio.Event) -> None:
+        queue = self.queue
+        pipeline = self.pipeline
+        while not stop.is_set():
+            tick = await queue.get()
+            if tick is None:
+                return
+            out = pipeline.on_tick(tick)
+            self.processed += 1
+            if self._report is not None:
+                if len(self._outcomes) == self._outcomes.maxlen:
+                    self.reports_dropped += 1
+                self._outcomes.append(out)
+                self._outcome_ready.set()
+            # Let feeds (and, when idle, reporting) run between ticks
+            await asyncio.sleep(0)
+
+    async def _reporting(self) -> None:
+        outcomes = self._outcomes
+        while True:
+            await self._outcome_ready.wait()
+            while outcomes:
+                await self.queue.wait_empty()
+                if outcomes:
+                    self._report(outcomes.popleft())  # type: ignore[misc]
+                await asyncio.sleep(0)
+            self._outcome_ready.clear()
+
+    def _flush_reports(self) -> None:
+        while self._outcomes:
+            self._report(self._outcomes.popleft())  # type: ignore[misc]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from bfrepricer.domain.clock import SimulatedClock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId
+from bfrepricer.state.market_state import MarketMismatch, OutOfOrderTick
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+_MARKET_IDS_FILE = "market_ids.json"
+
+
+@dataclass(frozen=True)
+class TickColumns:
+    """
+    Recorded market books in columnar form: one row per runner per applied
+    tick, i.e. the runners of the market snapshot the live pipeline would
+    have evaluated after that tick.
+
+    Rows are ordered by tick, then by the snapshot's runner order, so the
+    first qualifying row of a tick is the runner the strategy would pick.
+
+    market:     index into `market_ids`
+    tick:       ordinal of the applied tick (shared by all rows of a tick)
+    time_us:    publish time, microseconds since the epoch
+    selection:  selection id
+    back_*/lay_*: best prices / sizes, NaN when that side is empty
+    tradable:   MarketState.can_execute() at publish time
+    """
+    market_ids: tuple[MarketId, ...]
+    market: np.ndarray
+    tick: np.ndarray
+    time_us: np.ndarray
+    selection: np.ndarray
+    back_price: np.ndarray
+    back_size: np.ndarray
+    lay_price: np.ndarray
+    lay_size: np.ndarray
+    tradable: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.market.shape[0])
+
+    @classmethod
+    def from_ticks(cls, ticks: Iterable[MarketTick]) -> "TickColumns":
+        """
+        Run ticks through a MarketOrchestrator on virtual time (as replay
+        does) and expand every resulting snapshot into rows. Closing and
+        rejected ticks produce no rows.
+        """
+        clock = SimulatedClock()
+        orch = MarketOrchestrator(clock=clock)
+
+        codes: Dict[MarketId, int] = {}
+        market: List[int] = []
+        tick_no: List[int] = []
+        time_us: List[int] = []
+        sel: List[int] = []
+        bp: List[float] = []
+        bs: List[float] = []
+        lp: List[float] = []
+        ls: List[float] = []
+        tradable: List[bool] = []
+
+        nan = float("nan")
+        n_ticks = 0
+        for tick in ticks:
+            now = clock.advance_to(tick.publish_time)
+            try:
+                closed = orch.apply(tick)
+            except (OutOfOrderTick, MarketMismatch):
+                continue
+            if closed is not None:
+                continue
+            state = orch.get(tick.market_id)
+            if state is None:
+                continue
+
+            code = codes.setdefault(tick.market_id, len(codes))
+            ok = state.can_execute(now=now)
+            t_us = (tick.publish_time - _EPOCH) // _US
+            for rb in state.snapshot().runners.values():
+                back, lay = rb.back, rb.lay
+                market.append(code)
+                tick_no.append(n_ticks)
+                time_us.append(t_us)
+                sel.append(rb.selection_id)
+                bp.append(back.best_price if back else nan)
+                bs.append(back.best_size if back else nan)
+                lp.append(lay.best_price if lay else nan)
+                ls.append(lay.best_size if lay else nan)
+                tradable.append(ok)
+            n_ticks += 1
+
+        return cls(
+            market_ids=tuple(codes),
+            market=np.asarray(market, dtype=np.int32),
+            tick=np.asarray(tick_no, dtype=np.int64),
+            time_us=np.asarray(time_us, dtype=np.int64),
+            selection=np.asarray(sel, dtype=np.int64),
+            back_price=np.asarray(bp, dtype=np.float64),
+            back_size=np.asarray(bs, dtype=np.float64),
+            lay_price=np.asarray(lp, dtype=np.float64),
+            lay_size=np.asarray(ls, dtype=np.float64),
+            tradable=np.asarray(tradable, dtype=bool),
+        )
+
+    def save(self, directory: str | Path) -> Path:
+        """
+        Write one .npy file per column (plus market_ids.json) into
+        `directory`, so workers can memory-map them with `load`.
+        """
+        out = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        for f in fields(self):
+            if f.name == "market_ids":
+                continue
+            np.save(out / f"{f.name}.npy", getattr(self, f.name), allow_pickle=False)
+        (out / _MARKET_IDS_FILE).write_text(json.dumps(list(self.market_ids)))
+        return out
+
+    @classmethod
+    def load(cls, directory: str | Path, *, mmap: bool = True) -> "TickColumns":
+        """
+        Read columns written by `save`. With mmap=True the arrays are
+        read-only memory maps: pages are shared through the OS page cache
+        between every process that loads the same directory.
+        """
+        src = Path(directory)
+        mode = "r" if mmap else None
+        arrays = {
+            f.name: np.load(src / f"{f.name}.npy", mmap_mode=mode, allow_pickle=False)
+            for f in fields(cls)
+            if f.name != "market_ids"
+        }
+        market_ids = tuple(MarketId(m) for m in json.loads((src / _MARKET_IDS_FILE).read_text()))
+        return cls(market_ids=market_ids, **arrays)
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from bfrepricer.backtest.columns import TickColumns
+from bfrepricer.domain.ticks import FLOOR_TICK_BY_CENT, PRICE_EPS, PRICES, nearest_tick
+from bfrepricer.domain.types import MarketId
+from bfrepricer.execution.close_rule import CloseRuleConfig
+from bfrepricer.execution.risk import RiskConfig
+from bfrepricer.pricing.strategy import StrategyConfig
+
+
+@dataclass(frozen=True)
+class BacktestLayout:
+    """
+    Config-independent grouping of TickColumns rows by (market, selection).
+
+    perm:    row order sorted by market, selection, tick
+    seg_start / seg_end: [start, end) of each (market, selection) segment in perm order
+    seg_market: market code of each segment (segments of a market are contiguous)
+    """
+    perm: np.ndarray
+    seg_start: np.ndarray
+    seg_end: np.ndarray
+    seg_market: np.ndarray
+
+    @classmethod
+    def from_columns(cls, cols: TickColumns) -> "BacktestLayout":
+        perm = np.lexsort((cols.tick, cols.selection, cols.market))
+        m = cols.market[perm]
+        s = cols.selection[perm]
+        if len(perm) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(perm=perm, seg_start=empty, seg_end=empty, seg_market=empty)
+        brk = np.flatnonzero((m[1:] != m[:-1]) | (s[1:] != s[:-1])) + 1
+        seg_start = np.concatenate(([0], brk)).astype(np.int64)
+        seg_end = np.concatenate((brk, [len(perm)])).astype(np.int64)
+        return cls(perm=perm, seg_start=seg_start, seg_end=seg_end, seg_market=m[seg_start].astype(np.int64))
+
+
+@dataclass(frozen=True)
+class Trades:
+    """
+    One row per position opened. exit_row is -1 (and exit_price NaN) for
+    positions still open at the end of the data, which are marked instead.
+    Row indices refer to TickColumns rows.
+    """
+    market: np.ndarray
+    selection: np.ndarray
+    entry_row: np.ndarray
+    exit_row: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    size: np.ndarray
+    realized_pnl: np.ndarray
+    unrealized_pnl: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.market.shape[0])
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    market_ids: tuple[MarketId, ...]
+    trades: Trades
+
+    @property
+    def n_trades(self) -> int:
+        return len(self.trades)
+
+    @property
+    def realized_pnl(self) -> float:
+        return float(self.trades.realized_pnl.sum())
+
+    @property
+    def unrealized_pnl(self) -> float:
+        return float(self.trades.unrealized_pnl.sum())
+
+    @property
+    def total_pnl(self) -> float:
+        return self.realized_pnl + self.unrealized_pnl
+
+    def pnl_by_market(self) -> Dict[MarketId, float]:
+        t = self.trades
+        totals = np.bincount(t.market, weights=t.realized_pnl + t.unrealized_pnl, minlength=len(self.market_ids))
+        return {mid: float(totals[i]) for i, mid in enumerate(self.market_ids) if np.any(t.market == i)}
+
+
+_TICK_LUT = np.frombuffer(FLOOR_TICK_BY_CENT, dtype=np.uint16)
+_GRID = np.asarray(PRICES)
+
+
+def _ticks(prices: np.ndarray, direction: str) -> np.ndarray:
+    """
+    bfrepricer.domain.ticks floor_tick / ceil_tick / nearest_tick ("down" /
+    "up" / "nearest") over an array, with the same float steps so results
+    match the scalar lookups exactly. Float result; NaN prices give NaN.
+    """
+    n = len(_GRID)
+    valid = ~np.isnan(prices)
+    p = np.where(valid, prices, 1.0)
+    cents = np.clip(np.floor(p * 100 + PRICE_EPS), 0, len(_TICK_LUT) - 1).astype(np.int64)
+    idx = _TICK_LUT[cents].astype(np.int64)
+    if direction == "up":
+        idx += (_GRID[idx] < p - PRICE_EPS) & (idx + 1 < n)
+    elif direction == "nearest":
+        nxt = np.minimum(idx + 1, n - 1)
+        idx += (idx + 1 < n) & (_GRID[nxt] - p < p - _GRID[idx])
+    elif direction != "down":
+        raise ValueError(f"unknown rounding direction: {direction!r}")
+    return np.where(valid, idx, np.nan)
+
+
+def entry_candidates(cols: TickColumns, cfg: StrategyConfig) -> np.ndarray:
+    """
+    Rows where TopOfBookMicroStrategy would emit its single entry intent:
+    the first runner (snapshot order) of each tradable tick passing the
+    book sanity checks. Returns a bool mask over rows.
+    """
+    spread = cols.lay_price - cols.back_price
+    with np.errstate(invalid="ignore"):
+        ok = (
+            cols.tradable
+            & (cols.back_size >= cfg.min_size)
+            & (cols.lay_size >= cfg.min_size)
+            & (spread > 0)
+        )
+        if cfg.max_spread is not None:
+            ok &= spread <= cfg.max_spread
+        if cfg.max_spread_ticks is not None:
+            ok &= _ticks(cols.lay_price, "up") - _ticks(cols.back_price, "down") <= cfg.max_spread_ticks
+    qual = np.flatnonzero(ok)
+    mask = np.zeros(len(cols), dtype=bool)
+    if qual.size:
+        t = cols.tick[qual]
+        first = np.ones(qual.size, dtype=bool)
+        first[1:] = t[1:] != t[:-1]
+        mask[qual[first]] = True
+    return mask
+
+
+@dataclass(frozen=True)
+class _ExitRule:
+    """
+    CloseRuleConfig for a long, per threshold as (mark source, threshold):
+    the source is the best lay in price or, for a tick threshold, in
+    nearest ticks. The entry is measured in the same units.
+    """
+    tp_src: np.ndarray
+    tp_in_ticks: bool
+    tp: float
+    sl_src: np.ndarray
+    sl_in_ticks: bool
+    sl: float
+
+    @classmethod
+    def build(cls, close: CloseRuleConfig, lay: np.ndarray) -> "_ExitRule":
+        lay_ticks = None
+        if close.take_profit_ticks is not None or close.stop_loss_ticks is not None:
+            lay_ticks = _ticks(lay, "nearest")
+        tp_ticks, sl_ticks = close.take_profit_ticks is not None, close.stop_loss_ticks is not None
+        return cls(
+            tp_src=lay_ticks if tp_ticks else lay,
+            tp_in_ticks=tp_ticks,
+            tp=float(close.take_profit_ticks if tp_ticks else close.take_profit_delta),
+            sl_src=lay_ticks if sl_ticks else lay,
+            sl_in_ticks=sl_ticks,
+            sl=float(close.stop_loss_ticks if sl_ticks else close.stop_loss_delta),
+        )
+
+
+def _first_exit(rule: _ExitRule, trad: np.ndarray, lo: int, hi: int, entry: float) -> int:
+    """First index in [lo, hi) where the close rule fires for a long entered at `entry`, else -1."""
+    entry_ticks = float(nearest_tick(entry)) if rule.tp_in_ticks or rule.sl_in_ticks else 0.0
+    tp_entry = entry_ticks if rule.tp_in_ticks else entry
+    sl_entry = entry_ticks if rule.sl_in_ticks else entry
+    same = rule.tp_in_ticks == rule.sl_in_ticks
+    chunk = 64
+    i = lo
+    while i < hi:
+        j = min(hi, i + chunk)
+        tp_edge = rule.tp_src[i:j] - tp_entry
+        sl_edge = tp_edge if same else rule.sl_src[i:j] - sl_entry
+        with np.errstate(invalid="ignore"):
+            hit = trad[i:j] & ((tp_edge >= rule.tp) | (sl_edge <= -rule.sl))
+        k = int(hit.argmax())
+        if hit[k]:
+            return i + k
+        i = j
+        chunk *= 4
+    return -1
+
+
+def run_backtest(
+    cols: TickColumns,
+    strategy: StrategyConfig = StrategyConfig(),
+    close: CloseRuleConfig = CloseRuleConfig(),
+    risk: RiskConfig = RiskConfig(),
+    *,
+    layout: BacktestLayout | None = None,
+) -> BacktestResult:
+    """
+    Backtest TopOfBookMicroStrategy + CloseRule + RiskGate over recorded books.
+
+    Reproduces the TradingPipeline rules, evaluated per trade instead of per tick:
+    - entry: the strategy's single pick per tradable tick, suppressed while
+      that runner holds a position; size clamped to max_order_size and
+      dropped if it would breach the selection or market exposure cap
+    - exit: first later tradable tick where the best lay moves by the
+      take-profit threshold in our favour or the stop-loss threshold
+      against us (price deltas, or ticks where set); the close is a LAY at
+      that best lay
+    - a tick on which any position in the market closes takes no entries
+    - PnL as Position.apply_fill; open positions marked on the last best lay
+
+    Signals and exit conditions are vectorised across rows; the Python
+    loop only runs once per trade (plus rare cap-blocked retries).
+    """
+    layout = layout or BacktestLayout.from_columns(cols)
+    perm = layout.perm
+
+    size = min(float(strategy.stake_size), float(risk.max_order_size))
+    empty = _empty_trades()
+    if size <= 0 or size > risk.max_abs_pos_per_selection or size > risk.max_abs_pos_per_market or not len(perm):
+        return BacktestResult(market_ids=cols.market_ids, trades=empty)
+
+    # Everything below works in perm (market, selection, tick) order
+    cand_pos = np.flatnonzero(entry_candidates(cols, strategy)[perm])
+    tick_s = cols.tick[perm]
+    lay_s = cols.lay_price[perm]
+    back_s = cols.back_price[perm]
+    trad_s = cols.tradable[perm]
+    exit_rule = _ExitRule.build(close, lay_s)
+    mkt_cap = float(risk.max_abs_pos_per_market)
+
+    # Segments that have at least one candidate (segments of a market stay contiguous)
+    first_cand = np.searchsorted(cand_pos, layout.seg_start)
+    padded = np.append(cand_pos, len(perm))
+    live_segs = np.flatnonzero(padded[first_cand] < layout.seg_end)
+
+    out: List[tuple[int, int, int, float, float]] = []  # (seg, entry_pos, exit_pos, entry_price, exit_price)
+
+    def next_cand(seg: int, after_tick: int) -> int:
+        lo, hi = int(layout.seg_start[seg]), int(layout.seg_end[seg])
+        p0 = lo + int(np.searchsorted(tick_s[lo:hi], after_tick, side="right"))
+        k = int(np.searchsorted(cand_pos, p0))
+        if k < cand_pos.size and cand_pos[k] < hi:
+            return int(cand_pos[k])
+        return -1
+
+    i = 0
+    while i < live_segs.size:
+        market = layout.seg_market[live_segs[i]]
+        j = i
+        while j < live_segs.size and layout.seg_market[live_segs[j]] == market:
+            j += 1
+
+        # (tick, entry position, segment) heap of pending entries for this market
+        pending = []
+        for seg in live_segs[i:j]:
+            p = int(cand_pos[first_cand[seg]])
+            pending.append((int(tick_s[p]), p, int(seg)))
+        heapq.heapify(pending)
+        exits: list[tuple[int, int]] = []  # (exit tick, seg) of open positions
+        market_abs = 0.0
+
+        while pending:
+            t, p, seg = heapq.heappop(pending)
+
+            closing_now = False
+            while exits and exits[0][0] <= t:
+                et, _ = heapq.heappop(exits)
+                market_abs -= size
+                closing_now = closing_now or et == t
+
+            if closing_now or market_abs + size > mkt_cap:
+                nxt = next_cand(seg, t)
+                if nxt >= 0:
+                    heapq.heappush(pending, (int(tick_s[nxt]), nxt, seg))
+                continue
+
+            entry_price = float(back_s[p])
+            x = _first_exit(exit_rule, trad_s, p + 1, int(layout.seg_end[seg]), entry_price)
+            if x < 0:
+                out.append((seg, p, -1, entry_price, float("nan")))
+                market_abs += size
+                # Never closes: exposure held for the rest of the market
+                heapq.heappush(exits, (np.iinfo(np.int64).max, seg))
+                continue
+
+            out.append((seg, p, x, entry_price, float(lay_s[x])))
+            market_abs += size
+            heapq.heappush(exits, (int(tick_s[x]), seg))
+            nxt = next_cand(seg, int(tick_s[x]))
+            if nxt >= 0:
+                heapq.heappush(pending, (int(tick_s[nxt]), nxt, seg))
+
+        i = j
+
+    if not out:
+        return BacktestResult(market_ids=cols.market_ids, trades=empty)
+
+    seg_a = np.fromiter((o[0] for o in out), dtype=np.int64, count=len(out))
+    entry_pos = np.fromiter((o[1] for o in out), dtype=np.int64, count=len(out))
+    exit_pos = np.fromiter((o[2] for o in out), dtype=np.int64, count=len(out))
+    entry_price = np.fromiter((o[3] for o in out), dtype=np.float64, count=len(out))
+    exit_price = np.fromiter((o[4] for o in out), dtype=np.float64, count=len(out))
+    sizes = np.full(len(out), size)
+
+    is_open = exit_pos < 0
+    realized = np.where(is_open, 0.0, sizes * (exit_price - entry_price))
+    last_lay = lay_s[layout.seg_end[seg_a] - 1]
+    with np.errstate(invalid="ignore"):
+        unrealized = np.where(is_open & ~np.isnan(last_lay), sizes * (last_lay - entry_price), 0.0)
+
+    order = np.lexsort((entry_pos, layout.seg_market[seg_a]))
+    trades = Trades(
+        market=cols.market[perm[entry_pos]][order],
+        selection=cols.selection[perm[entry_pos]][order],
+        entry_row=perm[entry_pos][order],
+        exit_row=np.where(is_open, -1, perm[np.maximum(exit_pos, 0)])[order],
+        entry_price=entry_price[order],
+        exit_price=exit_price[order],
+        size=sizes[order],
+        realized_pnl=realized[order],
+        unrealized_pnl=unrealized[order],
+    )
+    return BacktestResult(market_ids=cols.market_ids, trades=trades)
+
+
+def _empty_trades() -> Trades:
+    i64 = np.zeros(0, dtype=np.int64)
+    f64 = np.zeros(0, dtype=np.float64)
+    return Trades(
+        market=np.zeros(0, dtype=np.int32),
+        selection=i64,
+        entry_row=i64,
+        exit_row=i64,
+        entry_price=f64,
+        exit_price=f64,
+        size=f64,
+        realized_pnl=f64,
+        unrealized_pnl=f64,
+    )
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Sequence
+
+from bfrepricer.backtest.columns import TickColumns
+from bfrepricer.backtest.engine import BacktestLayout, run_backtest
+from bfrepricer.execution.close_rule import CloseRuleConfig
+from bfrepricer.execution.risk import RiskConfig
+from bfrepricer.pricing.strategy import StrategyConfig
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    """One combination of the three tuning configs."""
+    strategy: StrategyConfig = StrategyConfig()
+    close: CloseRuleConfig = CloseRuleConfig()
+    risk: RiskConfig = RiskConfig()
+    params: tuple[tuple[str, float], ...] = ()  # the values that were varied, for display
+
+
+@dataclass(frozen=True)
+class Uniform:
+    """Continuous range for random_search: values drawn uniformly from [low, high]."""
+    low: float
+    high: float
+
+
+_SECTIONS = {f.name: f.type for f in fields(SweepPoint) if f.name != "params"}
+
+
+def _check_param(name: str) -> tuple[str, str]:
+    section, _, attr = name.partition(".")
+    if section not in _SECTIONS:
+        raise ValueError(f"{name!r}: section must be one of {sorted(_SECTIONS)}")
+    cfg = getattr(SweepPoint(), section)
+    if attr not in {f.name for f in fields(cfg)}:
+        raise ValueError(f"{name!r}: {type(cfg).__name__} has no field {attr!r}")
+    return section, attr
+
+
+def make_point(params: Mapping[str, float], base: SweepPoint = SweepPoint()) -> SweepPoint:
+    """
+    Apply dotted overrides such as {"close.take_profit_delta": 0.2} to `base`.
+    """
+    changes: Dict[str, Dict[str, float]] = {}
+    for name, value in params.items():
+        section, attr = _check_param(name)
+        changes.setdefault(section, {})[attr] = value
+    updated = {s: replace(getattr(base, s), **kw) for s, kw in changes.items()}
+    return replace(base, params=base.params + tuple(params.items()), **updated)
+
+
+def grid(space: Mapping[str, Sequence[float]], base: SweepPoint = SweepPoint()) -> Iterator[SweepPoint]:
+    """Every combination of the listed values, in row-major order."""
+    names = list(space)
+    for n in names:
+        _check_param(n)
+    for values in itertools.product(*(space[n] for n in names)):
+        yield make_point(dict(zip(names, values)), base)
+
+
+def random_search(
+    space: Mapping[str, Sequence[float] | Uniform],
+    n: int,
+    *,
+    seed: int | None = None,
+    base: SweepPoint = SweepPoint(),
+) -> Iterator[SweepPoint]:
+    """
+    `n` random points. Sequences are sampled uniformly by element,
+    Uniform ranges continuously.
+    """
+    for name in space:
+        _check_param(name)
+    rnd = random.Random(seed)
+    for _ in range(n):
+        params = {}
+        for name, dist in space.items():
+            params[name] = rnd.uniform(dist.low, dist.high) if isinstance(dist, Uniform) else rnd.choice(dist)
+        yield make_point(params, base)
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    index: int
+    point: SweepPoint
+    n_trades: int
+    realized_pnl: float
+    unrealized_pnl: float
+    total_pnl: float
+    elapsed_s: float
+
+
+# Per-worker state: the recorded data is mapped once when the worker starts
+# and reused by every point it evaluates.
+_worker_cols: TickColumns | None = None
+_worker_layout: BacktestLayout | None = None
+
+
+def _init_worker(data_dir: str) -> None:
+    global _worker_cols, _worker_layout
+    _worker_cols = TickColumns.load(data_dir, mmap=True)
+    _worker_layout = BacktestLayout.from_columns(_worker_cols)
+
+
+def _evaluate(cols: TickColumns, layout: BacktestLayout, index: int, point: SweepPoint) -> SweepResult:
+    t0 = time.perf_counter()
+    res = run_backtest(cols, point.strategy, point.close, point.risk, layout=layout)
+    return SweepResult(
+        index=index,
+        point=point,
+        n_trades=res.n_trades,
+        realized_pnl=res.realized_pnl,
+        unrealized_pnl=res.unrealized_pnl,
+        total_pnl=res.total_pnl,
+        elapsed_s=time.perf_counter() - t0,
+    )
+
+
+def _evaluate_chunk(chunk: List[tuple[int, SweepPoint]]) -> List[SweepResult]:
+    assert _worker_cols is not None and _worker_layout is not None
+    return [_evaluate(_worker_cols, _worker_layout, i, p) for i, p in chunk]
+
+
+def run_sweep(
+    data_dir: str | Path,
+    points: Iterable[SweepPoint],
+    *,
+    max_workers: int | None = None,
+    chunksize: int = 4,
+    mp_context=None,
+) -> Iterator[SweepResult]:
+    """
+    Backtest every point against the columns saved in `data_dir`
+    (TickColumns.save), yielding results as they complete.
+
+    Points are sent to a process pool in chunks of `chunksize`; each worker
+    memory-maps the data once on start-up. max_workers=0 evaluates
+    in-process, which is handy for debugging and small sweeps.
+    """
+    indexed = list(enumerate(points))
+    if max_workers == 0:
+        cols = TickColumns.load(data_dir, mmap=True)
+        layout = BacktestLayout.from_columns(cols)
+        for i, p in indexed:
+            yield _evaluate(cols, layout, i, p)
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    chunks = [indexed[k : k + chunksize] for k in range(0, len(indexed), chunksize)]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, max(1, len(chunks))),
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(str(data_dir),),
+    ) as pool:
+        futures = [pool.submit(_evaluate_chunk, c) for c in chunks]
+        for fut in as_completed(futures):
+            yield from fut.result()
+
+
+class SweepTable:
+    """
+    Ranked summary of sweep results, filled incrementally as results arrive.
+
+    Ranked by `metric` (any numeric SweepResult field), best first; ties
+    keep submission order.
+    """
+
+    def __init__(self, metric: str = "total_pnl", *, descending: bool = True) -> None:
+        if metric not in {f.name for f in fields(SweepResult)} or metric == "point":
+            raise ValueError(f"unknown metric {metric!r}")
+        self.metric = metric
+        self.descending = descending
+        self._results: List[SweepResult] = []
+
+    def add(self, result: SweepResult) -> None:
+        self._results.append(result)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def ranked(self) -> List[SweepResult]:
+        sign = -1.0 if self.descending else 1.0
+        return sorted(self._results, key=lambda r: (sign * getattr(r, self.metric), r.index))
+
+    def format(self, top: int | None = 20) -> str:
+        rows = self.ranked()[:top] if top else self.ranked()
+        lines = [f"{'rank':>4} {'#':>5} {'trades':>7} {'realized':>10} {'unrealized':>10} {'total':>10}  params"]
+        for rank, r in enumerate(rows, 1):
+            params = " ".join(f"{k}={v:g}" for k, v in r.point.params)
+            lines.append(
+                f"{rank:>4} {r.index:>5} {r.n_trades:>7} {r.realized_pnl:>10.4f} "
+                f"{r.unrealized_pnl:>10.4f} {r.total_pnl:>10.4f}  {params}"
+            )
+        return "\n".join(lines)
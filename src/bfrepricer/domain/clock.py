@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+
+from .types import utc_now
+
+
+class Clock(Protocol):
+    """
+    Source of time for everything that makes time-based decisions
+    (freshness, cooldowns, poll cadence).
+
+    now():  UTC wall time used for market decisions
+    monotonic(): seconds on a monotonic scale, for measuring intervals
+    sleep(): block (or, for virtual clocks, advance) by `seconds`
+    wait(): like sleep, but returns early with True once `event` is set
+    """
+
+    def now(self) -> datetime: ...
+
+    def monotonic(self) -> float: ...
+
+    def sleep(self, seconds: float) -> None: ...
+
+    def wait(self, event: threading.Event, seconds: float) -> bool: ...
+
+
+class SystemClock:
+    """Real time."""
+
+    def now(self) -> datetime:
+        return utc_now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        return event.wait(max(0.0, seconds))
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class SimulatedClock:
+    """
+    Virtual time that only moves when told to.
+
+    sleep()/wait() advance the clock instantly instead of blocking, so code
+    written against Clock runs at full speed under replay and in tests while
+    cooldown and freshness logic still see the elapsed time.
+    """
+
+    def __init__(self, start: datetime | None = None) -> None:
+        self._start = start or datetime(2000, 1, 1, tzinfo=timezone.utc)
+        self._now = self._start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def monotonic(self) -> float:
+        return (self._now - self._start).total_seconds()
+
+    def set(self, t: datetime) -> None:
+        if t < self._now:
+            raise ValueError(f"clock cannot move backwards: {t} < {self._now}")
+        self._now = t
+
+    def advance(self, delta: timedelta | float) -> datetime:
+        if not isinstance(delta, timedelta):
+            delta = timedelta(seconds=delta)
+        if delta < timedelta(0):
+            raise ValueError("clock cannot move backwards")
+        self._now += delta
+        return self._now
+
+    def advance_to(self, t: datetime) -> datetime:
+        """Move forward to `t`; earlier times leave the clock where it is."""
+        if t > self._now:
+            self._now = t
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.advance(seconds)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        if event.is_set():
+            return True
+        self.sleep(seconds)
+        return event.is_set()
+
+
+class SteppedClock(SimulatedClock):
+    """
+    Virtual time that advances by a fixed `step` on every now() read.
+
+    Useful for driving loops that poll the clock: each iteration observes
+    time moving forward without any explicit advance() calls.
+    """
+
+    def __init__(self, start: datetime | None = None, *, step: timedelta = timedelta(seconds=1)) -> None:
+        super().__init__(start)
+        self._step = step
+
+    def now(self) -> datetime:
+        current = self._now
+        self._now += self._step
+        return current
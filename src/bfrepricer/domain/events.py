@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 
-from .types import MarketId, RunnerBook
+from .types import MarketId, RunnerBook, SelectionId
 
 
 @dataclass(frozen=True, slots=True)
@@ -17,6 +17,8 @@ class MarketTick:
     is_market_open: True=open, False=suspended/closed-ish, None=unknown
     is_in_play: True if market has turned in-play (irreversible)
     is_closed: True if market is closed (terminal)
+    removed: selections withdrawn from the market (status REMOVED); their
+      books are dropped from state
     """
     market_id: MarketId
     seq: int
@@ -25,3 +27,4 @@ class MarketTick:
     is_market_open: bool | None = None
     is_in_play: bool | None = None
     is_closed: bool | None = None
+    removed: tuple[SelectionId, ...] = ()
@@ -0,0 +1,175 @@
+"""
+Exchange price ladder arithmetic in integer tick space.
+
+Every valid Betfair price from 1.01 to 1000 is listed once in `PRICES`;
+a price's tick index is its position there, so "n ticks away" is integer
+addition and the distance between two prices is a subtraction.
+
+Lookups are O(1) through `FLOOR_TICK_BY_CENT`, which maps every price in
+whole hundredths (101 .. 100000) to the index of the highest valid price
+at or below it. Prices that are not on the ladder (averaged fills, prices
+from other sources) are resolved explicitly: `floor_tick` / `ceil_tick` /
+`nearest_tick` pick the neighbouring valid price, `tick_index` rejects
+them. Prices outside [MIN_PRICE, MAX_PRICE] clamp to the ends of the ladder.
+
+The plural helpers apply the same lookup across a sequence in one call and
+return `array` buffers. The table is a plain `array('H')`, so NumPy code can
+wrap it with `np.frombuffer` and index it directly (see backtest.engine).
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Literal, Tuple
+
+# Exchange price increments: (upper bound, step)
+INCREMENTS: Tuple[Tuple[float, float], ...] = (
+    (2.0, 0.01), (3.0, 0.02), (4.0, 0.05), (6.0, 0.1), (10.0, 0.2),
+    (20.0, 0.5), (30.0, 1.0), (50.0, 2.0), (100.0, 5.0), (1000.0, 10.0),
+)
+
+
+def _price_grid() -> Tuple[float, ...]:
+    prices = [1.01]
+    for upper, step in INCREMENTS:
+        while prices[-1] < upper - 1e-9:
+            prices.append(round(prices[-1] + step, 2))
+    return tuple(prices)
+
+
+PRICES: Tuple[float, ...] = _price_grid()
+N_TICKS = len(PRICES)
+MIN_PRICE = PRICES[0]
+MAX_PRICE = PRICES[-1]
+
+_CENTS = tuple(round(p * 100) for p in PRICES)
+# Slack for prices a float op or two away from a whole hundredth; shared with
+# array versions of the lookups (backtest.engine) so they round identically
+PRICE_EPS = 1e-6
+
+
+def _floor_table() -> array:
+    # Hundredths below the ladder clamp to tick 0
+    table = array("H", [0]) * _CENTS[0]
+    for i in range(N_TICKS - 1):
+        table.extend(array("H", [i]) * (_CENTS[i + 1] - _CENTS[i]))
+    table.append(N_TICKS - 1)
+    return table
+
+
+FLOOR_TICK_BY_CENT = _floor_table()
+_MAX_CENT = len(FLOOR_TICK_BY_CENT) - 1
+
+Rounding = Literal["nearest", "down", "up"]
+
+
+def floor_tick(price: float) -> int:
+    """Index of the highest valid price <= `price`."""
+    c = int(price * 100 + PRICE_EPS)
+    return FLOOR_TICK_BY_CENT[0 if c < 0 else _MAX_CENT if c > _MAX_CENT else c]
+
+
+def ceil_tick(price: float) -> int:
+    """Index of the lowest valid price >= `price`."""
+    i = floor_tick(price)
+    if PRICES[i] < price - PRICE_EPS and i + 1 < N_TICKS:
+        i += 1
+    return i
+
+
+def nearest_tick(price: float) -> int:
+    """Index of the valid price closest to `price` (ties go down)."""
+    i = floor_tick(price)
+    if i + 1 < N_TICKS and PRICES[i + 1] - price < price - PRICES[i]:
+        i += 1
+    return i
+
+
+def tick_index(price: float) -> int:
+    """Index of a valid price; ValueError if `price` is not on the ladder."""
+    i = floor_tick(price)
+    if abs(PRICES[i] - price) > PRICE_EPS:
+        raise ValueError(f"not a valid exchange price: {price}")
+    return i
+
+
+def is_valid_price(price: float) -> bool:
+    return MIN_PRICE - PRICE_EPS <= price <= MAX_PRICE + PRICE_EPS and abs(PRICES[floor_tick(price)] - price) <= PRICE_EPS
+
+
+def price_at(index: int) -> float:
+    """Price at tick `index`; IndexError outside [0, N_TICKS)."""
+    if not 0 <= index < N_TICKS:
+        raise IndexError(f"tick index out of range: {index}")
+    return PRICES[index]
+
+
+def _resolver(direction: Rounding):
+    if direction == "nearest":
+        return nearest_tick
+    if direction == "down":
+        return floor_tick
+    if direction == "up":
+        return ceil_tick
+    raise ValueError(f"unknown rounding direction: {direction!r}")
+
+
+def round_price(price: float, direction: Rounding = "nearest") -> float:
+    """`price` rounded onto the ladder."""
+    return PRICES[_resolver(direction)(price)]
+
+
+def tick_distance(a: float, b: float) -> int:
+    """Ticks from valid price `a` up to valid price `b` (negative if b < a)."""
+    return tick_index(b) - tick_index(a)
+
+
+def spread_ticks(back_price: float, lay_price: float) -> int:
+    """
+    Ticks from `back_price` up to `lay_price`, with off-ladder prices widened
+    to the enclosing ticks: ceil_tick(lay) - floor_tick(back), in one call.
+    """
+    c = int(back_price * 100 + PRICE_EPS)
+    lo = FLOOR_TICK_BY_CENT[0 if c < 0 else _MAX_CENT if c > _MAX_CENT else c]
+    c = int(lay_price * 100 + PRICE_EPS)
+    hi = FLOOR_TICK_BY_CENT[0 if c < 0 else _MAX_CENT if c > _MAX_CENT else c]
+    if PRICES[hi] < lay_price - PRICE_EPS and hi + 1 < N_TICKS:
+        hi += 1
+    return hi - lo
+
+
+def shift_price(price: float, ticks: int) -> float:
+    """The valid price `ticks` ticks above (below, if negative) valid `price`, clamped to the ladder."""
+    i = tick_index(price) + ticks
+    return PRICES[0 if i < 0 else N_TICKS - 1 if i >= N_TICKS else i]
+
+
+# --- sequence forms ---------------------------------------------------------
+
+
+def tick_indices(prices: Iterable[float], direction: Rounding | None = None) -> array:
+    """
+    Tick indices as array('h'). With `direction` None every price must be
+    valid (as tick_index); otherwise off-ladder prices are rounded.
+    """
+    return array("h", map(tick_index if direction is None else _resolver(direction), prices))
+
+
+def prices_at(indices: Iterable[int]) -> array:
+    """Prices for tick indices as array('d')."""
+    return array("d", map(price_at, indices))
+
+
+def round_prices(prices: Iterable[float], direction: Rounding = "nearest") -> array:
+    resolve = _resolver(direction)
+    return array("d", (PRICES[resolve(p)] for p in prices))
+
+
+def tick_distances(a: Iterable[float], b: Iterable[float]) -> array:
+    """Element-wise tick_distance(a[i], b[i]) as array('h')."""
+    return array("h", map(tick_distance, a, b))
+
+
+def shift_prices(prices: Iterable[float], ticks: int) -> array:
+    """Every price shifted by `ticks` ticks (clamped), as array('d')."""
+    return array("d", (shift_price(p, ticks) for p in prices))
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import NewType
+from typing import Iterable, Iterator, List, NewType
 
 MarketId = NewType("MarketId", str)
 SelectionId = NewType("SelectionId", int)
@@ -24,9 +26,222 @@ class PriceSize:
             raise ValueError(f"size must be >= 0, got {self.size}")
 
 
-@dataclass(frozen=True, slots=True)
+class Ladder:
+    """
+    One side of a runner's price ladder, at full depth.
+
+    Prices and sizes live in two parallel `array('d')` buffers kept in
+    ascending price order, so a ladder costs two small buffers regardless of
+    depth and level lookups are a binary search. Best price is the highest
+    level for the back side and the lowest for the lay side.
+
+    Ladders inside a RunnerBook are shared between snapshots and must be
+    treated as read-only; ingest code mutates its own ladder and hands out
+    `copy()`s.
+    """
+
+    __slots__ = ("_prices", "_sizes", "_is_back")
+
+    def __init__(self, is_back: bool, levels: Iterable[tuple[float, float]] = ()) -> None:
+        self._is_back = is_back
+        self._prices = array("d")
+        self._sizes = array("d")
+        book = {float(p): float(s) for p, s in levels}
+        pairs = sorted((p, s) for p, s in book.items() if s != 0)
+        if pairs:
+            self._prices.extend(p for p, _ in pairs)
+            self._sizes.extend(s for _, s in pairs)
+            _validate(self._prices, self._sizes)
+
+    @classmethod
+    def back(cls, levels: Iterable[tuple[float, float]] = ()) -> "Ladder":
+        return cls(True, levels)
+
+    @classmethod
+    def lay(cls, levels: Iterable[tuple[float, float]] = ()) -> "Ladder":
+        return cls(False, levels)
+
+    @classmethod
+    def from_best(cls, is_back: bool, best: PriceSize | None) -> "Ladder":
+        ladder = cls(is_back)
+        if best is not None:
+            ladder._prices.append(best.price)
+            ladder._sizes.append(best.size)
+        return ladder
+
+    @classmethod
+    def from_arrays(cls, is_back: bool, prices: array, sizes: array) -> "Ladder":
+        """
+        Adopt ascending, de-duplicated price/size buffers without re-sorting.
+
+        Used by decoders that already hold ladder-ordered data; validation is
+        a single bulk check.
+        """
+        if len(prices) != len(sizes):
+            raise ValueError("prices and sizes must have the same length")
+        _validate(prices, sizes)
+        ladder = cls.__new__(cls)
+        ladder._is_back = is_back
+        ladder._prices = prices
+        ladder._sizes = sizes
+        return ladder
+
+    @property
+    def is_back(self) -> bool:
+        return self._is_back
+
+    @property
+    def prices(self) -> array:
+        """Ascending prices (read-only view of the internal buffer)."""
+        return self._prices
+
+    @property
+    def sizes(self) -> array:
+        """Sizes aligned with `prices` (read-only view of the internal buffer)."""
+        return self._sizes
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __bool__(self) -> bool:
+        return len(self._prices) > 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Ladder):
+            return NotImplemented
+        return (
+            self._is_back == other._is_back
+            and self._prices == other._prices
+            and self._sizes == other._sizes
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        side = "back" if self._is_back else "lay"
+        return f"Ladder.{side}({list(self)!r})"
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        """(price, size) pairs, best level first."""
+        if self._is_back:
+            return zip(reversed(self._prices), reversed(self._sizes))
+        return zip(self._prices, self._sizes)
+
+    def copy(self) -> "Ladder":
+        other = Ladder.__new__(Ladder)
+        other._is_back = self._is_back
+        other._prices = self._prices[:]
+        other._sizes = self._sizes[:]
+        return other
+
+    def update(self, price: float, size: float) -> None:
+        """Set the size available at `price`; size 0 removes the level."""
+        if not (price > 1.0):
+            raise ValueError(f"price must be > 1.0, got {price}")
+        if size < 0:
+            raise ValueError(f"size must be >= 0, got {size}")
+
+        prices = self._prices
+        i = bisect_left(prices, price)
+        present = i < len(prices) and prices[i] == price
+        if size == 0:
+            if present:
+                del prices[i]
+                del self._sizes[i]
+        elif present:
+            self._sizes[i] = size
+        else:
+            prices.insert(i, price)
+            self._sizes.insert(i, size)
+
+    def clear(self) -> None:
+        del self._prices[:]
+        del self._sizes[:]
+
+    def size_at(self, price: float) -> float:
+        i = bisect_left(self._prices, price)
+        if i < len(self._prices) and self._prices[i] == price:
+            return self._sizes[i]
+        return 0.0
+
+    @property
+    def best_price(self) -> float | None:
+        if not self._prices:
+            return None
+        return self._prices[-1] if self._is_back else self._prices[0]
+
+    @property
+    def best_size(self) -> float | None:
+        if not self._sizes:
+            return None
+        return self._sizes[-1] if self._is_back else self._sizes[0]
+
+    def best(self) -> PriceSize | None:
+        if not self._prices:
+            return None
+        i = -1 if self._is_back else 0
+        return PriceSize(self._prices[i], self._sizes[i])
+
+    def levels(self, depth: int | None = None) -> List[PriceSize]:
+        """Best-first levels, optionally truncated to `depth`."""
+        out: List[PriceSize] = []
+        for price, size in self:
+            if depth is not None and len(out) >= depth:
+                break
+            out.append(PriceSize(price, size))
+        return out
+
+    def total_size(self) -> float:
+        return sum(self._sizes)
+
+
+def _validate(prices: array, sizes: array) -> None:
+    # Bulk check instead of one PriceSize.__post_init__ per level
+    if prices and not (prices[0] > 1.0):
+        raise ValueError(f"price must be > 1.0, got {prices[0]}")
+    if sizes and min(sizes) < 0:
+        raise ValueError(f"size must be >= 0, got {min(sizes)}")
+
+
+@dataclass(frozen=True, slots=True, init=False)
 class RunnerBook:
+    """
+    Full-depth book for one runner.
+
+    Accepts either top-of-book PriceSizes (legacy form, positional) or full
+    ladders via `back=` / `lay=`. `best_back` / `best_lay` are derived.
+    """
     selection_id: SelectionId
-    # Best-effort top-of-book view (we can generalize to ladders later)
-    best_back: PriceSize | None
-    best_lay: PriceSize | None
+    back: Ladder
+    lay: Ladder
+
+    def __init__(
+        self,
+        selection_id: SelectionId,
+        best_back: PriceSize | None = None,
+        best_lay: PriceSize | None = None,
+        *,
+        back: Ladder | None = None,
+        lay: Ladder | None = None,
+    ) -> None:
+        if back is not None and best_back is not None:
+            raise ValueError("pass either best_back or back, not both")
+        if lay is not None and best_lay is not None:
+            raise ValueError("pass either best_lay or lay, not both")
+        object.__setattr__(self, "selection_id", selection_id)
+        object.__setattr__(self, "back", back if back is not None else Ladder.from_best(True, best_back))
+        object.__setattr__(self, "lay", lay if lay is not None else Ladder.from_best(False, best_lay))
+
+    def __hash__(self) -> int:
+        # Ladder is mutable, so unhashable; a RunnerBook's ladders are
+        # read-only, so its hash can cover their contents
+        back, lay = self.back, self.lay
+        return hash((self.selection_id, tuple(back.prices), tuple(back.sizes), tuple(lay.prices), tuple(lay.sizes)))
+
+    @property
+    def best_back(self) -> PriceSize | None:
+        return self.back.best()
+
+    @property
+    def best_lay(self) -> PriceSize | None:
+        return self.lay.best()
@@ -1,18 +1,32 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import AbstractSet, List, Mapping, Tuple
 
+from bfrepricer.domain.ticks import nearest_tick
 from bfrepricer.domain.types import MarketId, SelectionId
 from bfrepricer.execution.intent import OrderIntent, Side
 from bfrepricer.execution.position import Position
+from bfrepricer.execution.position_book import PositionBook
 from bfrepricer.domain.types import RunnerBook
 
 
 @dataclass(frozen=True)
 class CloseRuleConfig:
+    """
+    Thresholds are raw price moves by default. Setting `take_profit_ticks`
+    / `stop_loss_ticks` measures that threshold in ladder ticks instead
+    (mark and entry each taken at their nearest valid price), so the same
+    setting means the same thing at 1.5 and at 15.
+    """
     take_profit_delta: float = 0.10  # price move in our favor
     stop_loss_delta: float = 0.10    # price move against us
+    take_profit_ticks: int | None = None
+    stop_loss_ticks: int | None = None
+
+
+def _edge_note(edge: float, edge_ticks: int | None) -> str:
+    return f"edge={edge:.3f}" if edge_ticks is None else f"edge={edge:.3f} ({edge_ticks} ticks)"
 
 
 @dataclass
@@ -23,14 +37,37 @@ class CloseRule:
         self,
         *,
         market_id: MarketId,
-        runners: Dict[SelectionId, RunnerBook],
-        positions: Dict[Tuple[MarketId, SelectionId], Position],
+        runners: Mapping[SelectionId, RunnerBook],
+        positions: Mapping[Tuple[MarketId, SelectionId], Position],
+        selections: AbstractSet[SelectionId] | None = None,
     ) -> List[OrderIntent]:
+        """
+        `selections` restricts the check to those runners (the ones whose
+        book or position changed since the last call); None checks every
+        position in the market. With a PositionBook only this market's
+        positions are visited.
+        """
         intents: List[OrderIntent] = []
 
-        for (m, sel), pos in positions.items():
-            if m != market_id:
-                continue
+        if isinstance(positions, PositionBook):
+            by_sel = positions.market(market_id)
+        else:
+            by_sel = {sel: pos for (m, sel), pos in positions.items() if m == market_id}
+
+        if selections is None:
+            candidates = list(by_sel.items())
+        else:
+            candidates = []
+            for sel in selections:
+                pos = by_sel.get(sel)
+                if pos is not None:
+                    candidates.append((sel, pos))
+
+        tp_ticks = self.cfg.take_profit_ticks
+        sl_ticks = self.cfg.stop_loss_ticks
+        in_ticks = tp_ticks is not None or sl_ticks is not None
+
+        for sel, pos in candidates:
             if pos.size == 0:
                 continue
 
@@ -58,7 +95,15 @@ class CloseRule:
                 close_price = rb.best_back.price
                 close_size = abs(pos.size)
 
-            if edge >= self.cfg.take_profit_delta:
+            edge_ticks = 0
+            if in_ticks:
+                edge_ticks = nearest_tick(mark) - nearest_tick(pos.avg_price)
+                if pos.size < 0:
+                    edge_ticks = -edge_ticks
+            take = edge_ticks >= tp_ticks if tp_ticks is not None else edge >= self.cfg.take_profit_delta
+            stop = edge_ticks <= -sl_ticks if sl_ticks is not None else edge <= -self.cfg.stop_loss_delta
+
+            if take:
                 intents.append(
                     OrderIntent(
                         market_id=market_id,
@@ -66,10 +111,10 @@ class CloseRule:
                         side=close_side,
                         price=close_price,
                         size=close_size,
-                        reason=f"close_rule: take_profit edge={edge:.3f}",
+                        reason=f"close_rule: take_profit {_edge_note(edge, edge_ticks if in_ticks else None)}",
                     )
                 )
-            elif edge <= -self.cfg.stop_loss_delta:
+            elif stop:
                 intents.append(
                     OrderIntent(
                         market_id=market_id,
@@ -77,7 +122,7 @@ class CloseRule:
                         side=close_side,
                         price=close_price,
                         size=close_size,
-                        reason=f"close_rule: stop_loss edge={edge:.3f}",
+                        reason=f"close_rule: stop_loss {_edge_note(edge, edge_ticks if in_ticks else None)}",
                     )
                 )
 
@@ -1,25 +1,28 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Iterable
+from typing import Iterable
 
 from bfrepricer.execution.intent import OrderIntent
-from bfrepricer.execution.position import Position
-from bfrepricer.domain.types import MarketId, SelectionId
+from bfrepricer.execution.position_book import PositionBook
 
 
 @dataclass
 class ExecutionEngine:
-    positions: Dict[tuple[MarketId, SelectionId], Position] = field(default_factory=dict)
+    positions: PositionBook = field(default_factory=PositionBook)
 
     def process(self, intents: Iterable[OrderIntent]) -> None:
         """
         Paper execution: assume immediate fill at quoted price.
         """
         for intent in intents:
-            key = (intent.market_id, intent.selection_id)
-            pos = self.positions.setdefault(key, Position())
-            pos.apply_fill(intent.side, intent.price, intent.size)
+            self.positions.apply_fill(
+                intent.market_id, intent.selection_id, intent.side, intent.price, intent.size
+            )
+
+    def apply_fill(self, intent: OrderIntent, size: float, price: float) -> None:
+        """Record a fill reported by the exchange (live / simulated execution)."""
+        self.positions.apply_fill(intent.market_id, intent.selection_id, intent.side, price, size)
 
     def snapshot(self) -> dict:
         """
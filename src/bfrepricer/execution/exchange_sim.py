@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import Ladder, MarketId, SelectionId
+from bfrepricer.execution.orders import Report
+
+
+@dataclass(slots=True, eq=False)
+class _Bet:
+    bet_id: str
+    market_id: MarketId
+    selection_id: SelectionId
+    side: str
+    price: float
+    size: float
+    customer_order_ref: str | None
+    size_matched: float = 0.0
+    matched_value: float = 0.0  # sum(price * size) over matches
+    size_cancelled: float = 0.0
+    size_lapsed: float = 0.0
+
+    @property
+    def size_remaining(self) -> float:
+        return max(0.0, self.size - self.size_matched - self.size_cancelled - self.size_lapsed)
+
+    @property
+    def avg_price_matched(self) -> float:
+        return self.matched_value / self.size_matched if self.size_matched else 0.0
+
+    @property
+    def status(self) -> str:
+        return "EXECUTABLE" if self.size_remaining > 1e-9 else "EXECUTION_COMPLETE"
+
+
+class SimulatedExchange:
+    """
+    Local matching engine speaking the OrderTransport protocol, for testing
+    OrderExecutor offline.
+
+    Liquidity comes from market ticks (`on_tick`): each runner's ladders are
+    copied and our bets match against them, consuming what they take until
+    the next update for that runner replaces the ladder. A BACK at p matches
+    available-to-back levels priced >= p (best first), a LAY at p matches
+    available-to-lay levels priced <= p. Unmatched size rests and is matched
+    against later updates. Closing or in-play ticks lapse resting bets.
+    Matching is immediate; see QueueMatchingSimulator for queue priority
+    and latency.
+
+    Instruction limits and customerRef de-duplication follow the exchange,
+    so batching and retry behaviour can be exercised end to end.
+    """
+
+    def __init__(self, *, max_place_instructions: int = 200, max_cancel_instructions: int = 60) -> None:
+        self._max_place = max_place_instructions
+        self._max_cancel = max_cancel_instructions
+        self._books: Dict[tuple[MarketId, SelectionId], tuple[Ladder, Ladder]] = {}
+        self._bets: Dict[str, _Bet] = {}
+        self._resting: Dict[MarketId, List[_Bet]] = {}
+        self._place_reports: Dict[str, Report] = {}  # customerRef -> report
+        self._ids = itertools.count(1)
+        self.calls: Dict[str, int] = {}
+
+    # ---- market data
+
+    def on_tick(self, tick: MarketTick) -> None:
+        for rb in tick.runners:
+            self._books[(tick.market_id, rb.selection_id)] = (rb.back.copy(), rb.lay.copy())
+        if tick.is_closed is True or tick.is_in_play is True:
+            for bet in self._resting.pop(tick.market_id, []):
+                bet.size_lapsed += bet.size_remaining
+            return
+        if tick.runners:
+            changed = {rb.selection_id for rb in tick.runners}
+            for bet in self._resting.get(tick.market_id, []):
+                if bet.selection_id in changed:
+                    self._match(bet)
+            self._prune(tick.market_id)
+
+    # Orchestrator sink form, so book updates arrive with the ticks
+    record = on_tick
+
+    # ---- OrderTransport
+
+    def place_orders(self, market_id: str, instructions: List[Dict[str, Any]], customer_ref: str) -> Report:
+        self._count("placeOrders")
+        if customer_ref in self._place_reports:
+            return self._place_reports[customer_ref]
+        mid = MarketId(market_id)
+        if len(instructions) > self._max_place:
+            return {"status": "FAILURE", "errorCode": "INVALID_INPUT_DATA", "marketId": market_id, "instructionReports": []}
+
+        reports = []
+        for ins in instructions:
+            limit = ins.get("limitOrder") or {}
+            price = float(limit.get("price", 0.0))
+            size = float(limit.get("size", 0.0))
+            side = ins.get("side")
+            if side not in ("BACK", "LAY") or not price > 1.0:
+                reports.append({"status": "FAILURE", "errorCode": "INVALID_BET_PRICE", "instruction": ins})
+                continue
+            if not size > 0:
+                reports.append({"status": "FAILURE", "errorCode": "INVALID_BET_SIZE", "instruction": ins})
+                continue
+            bet = self._new_bet(mid, SelectionId(ins["selectionId"]), side, price, size, ins.get("customerOrderRef"))
+            reports.append(self._place_report(bet, ins))
+
+        self._prune(mid)
+        report = {"status": "SUCCESS", "marketId": market_id, "customerRef": customer_ref, "instructionReports": reports}
+        self._place_reports[customer_ref] = report
+        return report
+
+    def cancel_orders(self, market_id: str, instructions: List[Dict[str, Any]]) -> Report:
+        self._count("cancelOrders")
+        if len(instructions) > self._max_cancel:
+            return {"status": "FAILURE", "errorCode": "INVALID_INPUT_DATA", "marketId": market_id, "instructionReports": []}
+        reports = []
+        for ins in instructions:
+            bet = self._bets.get(str(ins.get("betId")))
+            if bet is None or bet.size_remaining <= 1e-9:
+                reports.append({"status": "FAILURE", "errorCode": "BET_TAKEN_OR_LAPSED", "instruction": ins})
+                continue
+            reduction = ins.get("sizeReduction")
+            cancelled = bet.size_remaining if reduction is None else min(float(reduction), bet.size_remaining)
+            bet.size_cancelled += cancelled
+            reports.append({"status": "SUCCESS", "instruction": ins, "sizeCancelled": cancelled})
+        self._prune(MarketId(market_id))
+        return {"status": "SUCCESS", "marketId": market_id, "instructionReports": reports}
+
+    def replace_orders(self, market_id: str, instructions: List[Dict[str, Any]]) -> Report:
+        self._count("replaceOrders")
+        if len(instructions) > self._max_cancel:
+            return {"status": "FAILURE", "errorCode": "INVALID_INPUT_DATA", "marketId": market_id, "instructionReports": []}
+        reports = []
+        for ins in instructions:
+            bet = self._bets.get(str(ins.get("betId")))
+            new_price = float(ins.get("newPrice", 0.0))
+            if bet is None or bet.size_remaining <= 1e-9:
+                reports.append({"status": "FAILURE", "errorCode": "BET_TAKEN_OR_LAPSED", "instruction": ins})
+                continue
+            if not new_price > 1.0:
+                reports.append({"status": "FAILURE", "errorCode": "INVALID_BET_PRICE", "instruction": ins})
+                continue
+            cancelled = bet.size_remaining
+            bet.size_cancelled += cancelled
+            new = self._new_bet(bet.market_id, bet.selection_id, bet.side, new_price, cancelled, bet.customer_order_ref)
+            reports.append(
+                {
+                    "status": "SUCCESS",
+                    "cancelInstructionReport": {"status": "SUCCESS", "sizeCancelled": cancelled},
+                    "placeInstructionReport": self._place_report(new, ins),
+                }
+            )
+        self._prune(MarketId(market_id))
+        return {"status": "SUCCESS", "marketId": market_id, "instructionReports": reports}
+
+    def list_current_orders(self, bet_ids: Sequence[str]) -> Report:
+        self._count("listCurrentOrders")
+        orders = []
+        for bet_id in bet_ids:
+            bet = self._bets.get(str(bet_id))
+            if bet is None:
+                continue
+            orders.append(
+                {
+                    "betId": bet.bet_id,
+                    "marketId": bet.market_id,
+                    "selectionId": bet.selection_id,
+                    "side": bet.side,
+                    "priceSize": {"price": bet.price, "size": bet.size},
+                    "status": bet.status,
+                    "averagePriceMatched": bet.avg_price_matched,
+                    "sizeMatched": bet.size_matched,
+                    "sizeRemaining": bet.size_remaining,
+                    "sizeCancelled": bet.size_cancelled,
+                    "sizeLapsed": bet.size_lapsed,
+                    "customerOrderRef": bet.customer_order_ref,
+                }
+            )
+        return {"currentOrders": orders, "moreAvailable": False}
+
+    # ---- matching
+
+    def _new_bet(
+        self, market_id: MarketId, selection_id: SelectionId, side: str, price: float, size: float, ref: str | None
+    ) -> _Bet:
+        bet = _Bet(str(next(self._ids)), market_id, selection_id, side, price, size, ref)
+        self._bets[bet.bet_id] = bet
+        self._match(bet)
+        if bet.size_remaining > 1e-9:
+            self._resting.setdefault(market_id, []).append(bet)
+        return bet
+
+    def _match(self, bet: _Bet) -> None:
+        book = self._books.get((bet.market_id, bet.selection_id))
+        if book is None:
+            return
+        back, lay = book
+        # Best first: back ladder from the highest price down, lay from the lowest up
+        ladder = back if bet.side == "BACK" else lay
+        for price, available in list(ladder):
+            if bet.size_remaining <= 1e-9:
+                break
+            if (bet.side == "BACK" and price < bet.price) or (bet.side == "LAY" and price > bet.price):
+                break
+            take = min(available, bet.size_remaining)
+            bet.size_matched += take
+            bet.matched_value += take * price
+            ladder.update(price, available - take)
+
+    def _prune(self, market_id: MarketId) -> None:
+        resting = self._resting.get(market_id)
+        if resting is None:
+            return
+        live = [b for b in resting if b.size_remaining > 1e-9]
+        if live:
+            self._resting[market_id] = live
+        else:
+            del self._resting[market_id]
+
+    def _place_report(self, bet: _Bet, ins: Dict[str, Any]) -> Report:
+        return {
+            "status": "SUCCESS",
+            "instruction": ins,
+            "betId": bet.bet_id,
+            "sizeMatched": bet.size_matched,
+            "averagePriceMatched": bet.avg_price_matched,
+            "orderStatus": bet.status,
+        }
+
+    def _count(self, op: str) -> None:
+        self.calls[op] = self.calls.get(op, 0) + 1
@@ -1,18 +1,353 @@
-from bfrepricer.domain.types import MarketId, SelectionId
+from __future__ import annotations
+
+import itertools
+import os
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Protocol, Sequence
+
+from bfrepricer.domain.types import MarketId
+from bfrepricer.execution.intent import OrderIntent
+
+Report = Dict[str, Any]
+
+
+class OrderStatus(Enum):
+    PENDING = "PENDING"                        # queued or sent, no bet id yet
+    EXECUTABLE = "EXECUTABLE"                  # live on the exchange, partly or not matched
+    EXECUTION_COMPLETE = "EXECUTION_COMPLETE"  # fully matched, cancelled or lapsed
+    REJECTED = "REJECTED"                      # placement failed
+
+
+@dataclass(frozen=True)
+class ExecutionConfig:
+    """
+    Exchange limits per request: placeOrders accepts up to 200 instructions,
+    cancelOrders and replaceOrders up to 60. listCurrentOrders is queried in
+    chunks of `max_order_queries` bet ids.
+    """
+    max_place_instructions: int = 200
+    max_cancel_instructions: int = 60
+    max_replace_instructions: int = 60
+    max_order_queries: int = 250
+    persistence_type: str = "LAPSE"
+
+
+class OrderTransport(Protocol):
+    """Betting operations in Betfair's request/report shapes (BetfairClient, SimulatedExchange)."""
+
+    def place_orders(self, market_id: str, instructions: List[Dict[str, Any]], customer_ref: str) -> Report: ...
+
+    def cancel_orders(self, market_id: str, instructions: List[Dict[str, Any]]) -> Report: ...
+
+    def replace_orders(self, market_id: str, instructions: List[Dict[str, Any]]) -> Report: ...
+
+    def list_current_orders(self, bet_ids: Sequence[str]) -> Report: ...
+
+
+class OrderListener(Protocol):
+    def on_fill(self, order: "Order", size: float, price: float) -> None:
+        """`size` newly matched at average `price`."""
+
+    def on_close(self, order: "Order", size: float) -> None:
+        """`size` will never match (rejected, cancelled or lapsed)."""
+
+
+@dataclass(slots=True, eq=False)
+class Order:
+    """
+    One intent's life on the exchange.
+
+    A replace moves the unmatched part to a new bet, so an order may span
+    several bet ids; `bet_id` is the live one. Matched size and price are
+    summed over all of them.
+    """
+    ref: str
+    intent: OrderIntent
+    price: float
+    status: OrderStatus = OrderStatus.PENDING
+    bet_ids: List[str] = field(default_factory=list)
+    size_matched: float = 0.0
+    size_closed: float = 0.0
+    avg_price_matched: float = 0.0
+    error_code: str | None = None
+    # bet id -> (size matched, average price) as last reported
+    _bet_fills: Dict[str, tuple[float, float]] = field(default_factory=dict, repr=False)
+    # bet id -> size cancelled + lapsed already reported through on_close
+    _bet_closed: Dict[str, float] = field(default_factory=dict, repr=False)
+
+    @property
+    def market_id(self) -> MarketId:
+        return self.intent.market_id
+
+    @property
+    def bet_id(self) -> str | None:
+        return self.bet_ids[-1] if self.bet_ids else None
+
+    @property
+    def size_remaining(self) -> float:
+        return max(0.0, self.intent.size - self.size_matched - self.size_closed)
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in (OrderStatus.PENDING, OrderStatus.EXECUTABLE)
+
 
 class OrderExecutor:
     """
-    Handles order placement and cancellation. Integrate Betfair API here.
+    Sends order intents to the exchange in batches and tracks their state.
+
+    Policies:
+    - submit() / cancel() / replace() only queue; flush() sends one request
+      per market and operation, split at the per-request instruction limit
+    - fills are reported to the listener as they are seen: immediately for
+      size matched at placement, later from poll() (listCurrentOrders) for
+      partial and resting fills
+    - any size that can no longer match (rejected placement, cancellation,
+      lapse) is reported through on_close, so reservations can be released
+    - each placeOrders request carries a unique customerRef, which the
+      exchange uses to de-duplicate, so a retried request cannot double-place;
+      a batch whose request raised is re-sent unchanged on the next flush()
+    - transports are blocking; call from a single thread
     """
-    def __init__(self, auth):
-        self.auth = auth
 
-    def place_order(self, market_id: MarketId, selection_id: SelectionId,
-                    price: float, size: float, side: str) -> str:
+    def __init__(
+        self,
+        transport: OrderTransport,
+        cfg: ExecutionConfig = ExecutionConfig(),
+        *,
+        listener: OrderListener | None = None,
+        ref_prefix: str | None = None,
+    ) -> None:
+        self._transport = transport
+        self._cfg = cfg
+        self.listener = listener
+        # customerOrderRef / customerRef are capped at 32 chars
+        self._prefix = ref_prefix or os.urandom(4).hex()
+        self._refs = itertools.count(1)
+
+        self._place: Dict[MarketId, List[Order]] = {}
+        self._cancel: Dict[MarketId, List[tuple[Order, float | None]]] = {}
+        self._replace: Dict[MarketId, List[tuple[Order, float]]] = {}
+        # Place requests built but not yet acknowledged: (market, orders, customerRef)
+        self._batches: List[tuple[MarketId, List[Order], str]] = []
+
+        self._orders: Dict[str, Order] = {}   # ref -> order, open ones only
+        self._by_bet: Dict[str, Order] = {}   # bet id -> open order
+        self.requests = 0
+
+    def _next_ref(self) -> str:
+        return f"{self._prefix}-{next(self._refs)}"
+
+    # ---- queueing
+
+    def submit(self, intents: Iterable[OrderIntent]) -> List[Order]:
+        out = []
+        for intent in intents:
+            order = Order(ref=self._next_ref(), intent=intent, price=intent.price)
+            self._orders[order.ref] = order
+            self._place.setdefault(intent.market_id, []).append(order)
+            out.append(order)
+        return out
+
+    def cancel(self, order: Order, size_reduction: float | None = None) -> None:
+        """Cancel the unmatched part of `order` (or only `size_reduction` of it)."""
+        if order.is_open:
+            self._cancel.setdefault(order.market_id, []).append((order, size_reduction))
+
+    def replace(self, order: Order, new_price: float) -> None:
+        """Move the unmatched part of `order` to `new_price`."""
+        if order.is_open:
+            self._replace.setdefault(order.market_id, []).append((order, new_price))
+
+    def open_orders(self) -> List[Order]:
+        return list(self._orders.values())
+
+    # ---- sending
+
+    def flush(self) -> None:
         """
-        Place an order and return a unique order ID.
+        Send everything queued. If a request raises, the exception propagates
+        and everything not yet acknowledged stays queued for the next flush().
         """
-        raise NotImplementedError("Order placement is not yet implemented.")
+        cfg = self._cfg
+
+        # Place batches get their customerRef once, so a re-send is an exact repeat
+        for market_id, orders in self._place.items():
+            for chunk in _chunks(orders, cfg.max_place_instructions):
+                self._batches.append((market_id, chunk, self._next_ref()))
+        self._place = {}
+        while self._batches:
+            self._send_place(*self._batches[0])
+            self._batches.pop(0)
+
+        while self._cancel:
+            market_id, cancels = next(iter(self._cancel.items()))
+            chunk = cancels[: cfg.max_cancel_instructions]
+            self._send_cancel(market_id, chunk)
+            _consume(self._cancel, market_id, len(chunk))
+
+        while self._replace:
+            market_id, replaces = next(iter(self._replace.items()))
+            chunk = replaces[: cfg.max_replace_instructions]
+            self._send_replace(market_id, chunk)
+            _consume(self._replace, market_id, len(chunk))
+
+    def _send_place(self, market_id: MarketId, orders: List[Order], customer_ref: str) -> None:
+        instructions = [
+            {
+                "selectionId": o.intent.selection_id,
+                "handicap": 0,
+                "side": o.intent.side.value,
+                "orderType": "LIMIT",
+                "limitOrder": {
+                    "size": o.intent.size,
+                    "price": o.price,
+                    "persistenceType": self._cfg.persistence_type,
+                },
+                "customerOrderRef": o.ref,
+            }
+            for o in orders
+        ]
+        self.requests += 1
+        report = self._transport.place_orders(market_id, instructions, customer_ref)
+
+        reports = report.get("instructionReports") or []
+        for i, o in enumerate(orders):
+            ir = reports[i] if i < len(reports) else {}
+            if ir.get("status") != "SUCCESS" or not ir.get("betId"):
+                o.error_code = ir.get("errorCode") or report.get("errorCode")
+                self._finish(o, OrderStatus.REJECTED)
+                continue
+            o.status = OrderStatus.EXECUTABLE
+            o.bet_ids.append(str(ir["betId"]))
+            self._by_bet[o.bet_ids[-1]] = o
+            self._on_bet(o, o.bet_ids[-1], ir.get("sizeMatched", 0.0), ir.get("averagePriceMatched", 0.0))
+            if ir.get("orderStatus") == "EXECUTION_COMPLETE":
+                self._finish(o, OrderStatus.EXECUTION_COMPLETE)
+
+    def _send_cancel(self, market_id: MarketId, cancels: List[tuple[Order, float | None]]) -> None:
+        sendable = [(o, r) for o, r in cancels if o.is_open and o.bet_id is not None]
+        if not sendable:
+            return
+        instructions: List[Dict[str, Any]] = []
+        for o, reduction in sendable:
+            ins: Dict[str, Any] = {"betId": o.bet_id}
+            if reduction is not None:
+                ins["sizeReduction"] = reduction
+            instructions.append(ins)
+        self.requests += 1
+        report = self._transport.cancel_orders(market_id, instructions)
+
+        for (o, _), ir in zip(sendable, report.get("instructionReports") or []):
+            if ir.get("status") != "SUCCESS":
+                o.error_code = ir.get("errorCode")
+                continue
+            cancelled = float(ir.get("sizeCancelled", 0.0))
+            o._bet_closed[o.bet_id] = o._bet_closed.get(o.bet_id, 0.0) + cancelled
+            self._close(o, cancelled)
+
+    def _send_replace(self, market_id: MarketId, replaces: List[tuple[Order, float]]) -> None:
+        sendable = [(o, p) for o, p in replaces if o.is_open and o.bet_id is not None]
+        if not sendable:
+            return
+        instructions = [{"betId": o.bet_id, "newPrice": p} for o, p in sendable]
+        self.requests += 1
+        report = self._transport.replace_orders(market_id, instructions)
+
+        for (o, new_price), ir in zip(sendable, report.get("instructionReports") or []):
+            if ir.get("status") != "SUCCESS":
+                o.error_code = ir.get("errorCode")
+                continue
+            pr = ir.get("placeInstructionReport") or {}
+            bet_id = pr.get("betId")
+            if not bet_id:
+                continue
+            # The old bet stays indexed so late fills on it still reconcile
+            o.price = new_price
+            o.bet_ids.append(str(bet_id))
+            self._by_bet[o.bet_ids[-1]] = o
+            self._on_bet(o, o.bet_ids[-1], pr.get("sizeMatched", 0.0), pr.get("averagePriceMatched", 0.0))
+            if pr.get("orderStatus") == "EXECUTION_COMPLETE":
+                self._finish(o, OrderStatus.EXECUTION_COMPLETE)
+
+    # ---- reconciliation
+
+    def poll(self) -> None:
+        """Pull current state of every live bet and report new fills and closures."""
+        bet_ids = list(self._by_bet)
+        for chunk in _chunks(bet_ids, self._cfg.max_order_queries):
+            self.requests += 1
+            report = self._transport.list_current_orders(chunk)
+            for co in report.get("currentOrders") or []:
+                bet_id = str(co.get("betId"))
+                o = self._by_bet.get(bet_id)
+                if o is None:
+                    continue
+                self._on_bet(o, bet_id, co.get("sizeMatched", 0.0), co.get("averagePriceMatched", 0.0))
+                if o.bet_id != bet_id:
+                    continue  # a replaced bet: its unmatched size moved to the live one
+                # Cancels acknowledged before they take effect (and lapses)
+                # only show up here
+                closed = float(co.get("sizeCancelled") or 0.0) + float(co.get("sizeLapsed") or 0.0)
+                delta = closed - o._bet_closed.get(bet_id, 0.0)
+                if delta > 1e-9:
+                    o._bet_closed[bet_id] = closed
+                    self._close(o, delta)
+                if co.get("status") == "EXECUTION_COMPLETE":
+                    self._finish(o, OrderStatus.EXECUTION_COMPLETE)
+
+    def _on_bet(self, o: Order, bet_id: str, matched: float, avg_price: float) -> None:
+        matched = float(matched or 0.0)
+        avg_price = float(avg_price or 0.0)
+        prev_matched, prev_avg = o._bet_fills.get(bet_id, (0.0, 0.0))
+        delta = matched - prev_matched
+        if delta <= 1e-9:
+            return
+        o._bet_fills[bet_id] = (matched, avg_price)
+        price = (avg_price * matched - prev_avg * prev_matched) / delta
+
+        total = o.size_matched + delta
+        o.avg_price_matched = (o.avg_price_matched * o.size_matched + price * delta) / total
+        o.size_matched = total
+        if self.listener is not None:
+            self.listener.on_fill(o, delta, price)
+        if o.size_remaining <= 1e-9:
+            self._finish(o, OrderStatus.EXECUTION_COMPLETE)
+
+    def _close(self, o: Order, size: float) -> None:
+        size = min(size, o.size_remaining)
+        if size > 0:
+            o.size_closed += size
+            if self.listener is not None:
+                self.listener.on_close(o, size)
+        if o.size_remaining <= 1e-9:
+            self._finish(o, OrderStatus.EXECUTION_COMPLETE)
+
+    def _finish(self, o: Order, status: OrderStatus) -> None:
+        if not o.is_open:
+            return
+        o.status = status
+        # Whatever did not match by now never will
+        remaining = o.size_remaining
+        if remaining > 1e-9:
+            o.size_closed += remaining
+            if self.listener is not None:
+                self.listener.on_close(o, remaining)
+        self._orders.pop(o.ref, None)
+        for bet_id in o.bet_ids:
+            self._by_bet.pop(bet_id, None)
+
+
+def _consume(queue: Dict[MarketId, List[Any]], market_id: MarketId, n: int) -> None:
+    rest = queue[market_id][n:]
+    if rest:
+        queue[market_id] = rest
+    else:
+        del queue[market_id]
+
 
-    def cancel_order(self, order_id: str) -> None:
-        raise NotImplementedError("Order cancellation is not yet implemented.")
+def _chunks(items: List[Any], n: int) -> Iterable[List[Any]]:
+    n = max(1, n)
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
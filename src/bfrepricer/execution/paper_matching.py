@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Sequence
+
+from bfrepricer.domain.clock import SYSTEM_CLOCK, Clock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import Ladder, MarketId, SelectionId
+from bfrepricer.execution.exchange_sim import SimulatedExchange, _Bet
+from bfrepricer.execution.orders import Report
+
+
+@dataclass(frozen=True)
+class PaperMatchingConfig:
+    """
+    place_latency: time from placeOrders until the bet reaches the book
+    cancel_latency: time from cancelOrders until the cancel takes effect;
+      the bet can still be matched in between
+    trade_fraction: share of any size that disappears from our price level
+      assumed to have traded (from the front of the queue); the rest is
+      taken as cancellations spread evenly through the queue
+    """
+    place_latency: timedelta = timedelta(milliseconds=150)
+    cancel_latency: timedelta = timedelta(milliseconds=150)
+    trade_fraction: float = 0.5
+
+
+@dataclass(slots=True, eq=False)
+class _QueuedBet(_Bet):
+    active_at: datetime | None = None
+    active: bool = False
+    ahead: float = 0.0                 # visible size queued in front of us
+    cancel_at: datetime | None = None
+    cancel_size: float | None = None   # None: everything left
+
+
+class QueueMatchingSimulator(SimulatedExchange):
+    """
+    Paper matching that respects queue priority and latency.
+
+    A resting BACK at p sits in the available-to-lay queue at p (a LAY in
+    the available-to-back queue). When the bet reaches the book we record
+    the visible size at p as our place in the queue. Ladders carry no traded
+    volume, so it is inferred from the level shrinking between updates:
+    `trade_fraction` of the shrink is traded and consumes the queue ahead of
+    us before filling us; the rest is cancellations, spread evenly through
+    the queue. A level that disappears while the book moves past p (traded
+    through) fills us completely. Size added at p queues behind us.
+
+    A bet that reaches the book with the opposite side at or through its
+    price matches immediately against that side, best price first.
+
+    Time is the tick publish_time for book updates and `clock` for order
+    operations, so under replay (SimulatedClock) latency is virtual too.
+    Cancels are acknowledged with sizeCancelled 0 and applied once due; the
+    cancelled size then appears in listCurrentOrders. Replaces cancel the old
+    bet at once and place the new one with placement latency.
+
+    Usable as an orchestrator sink (`record`) so it sees every book update
+    before the strategy does. Per update the work is O(our resting bets in
+    that market), with one binary search per bet on the ladder.
+    """
+
+    def __init__(
+        self,
+        cfg: PaperMatchingConfig = PaperMatchingConfig(),
+        *,
+        clock: Clock = SYSTEM_CLOCK,
+        max_place_instructions: int = 200,
+        max_cancel_instructions: int = 60,
+    ) -> None:
+        super().__init__(
+            max_place_instructions=max_place_instructions, max_cancel_instructions=max_cancel_instructions
+        )
+        self._cfg = cfg
+        self._clock = clock
+        self._last_seq: Dict[MarketId, int] = {}
+        # Size our own crossing fills took from a level, until the runner next updates
+        self._taken: Dict[tuple[MarketId, SelectionId, str, float], float] = {}
+
+    # ---- market data
+
+    def on_tick(self, tick: MarketTick) -> None:
+        mid = tick.market_id
+        if tick.seq <= self._last_seq.get(mid, -1):
+            return
+        self._last_seq[mid] = tick.seq
+        now = tick.publish_time
+
+        resting = self._resting.get(mid, ())
+        self._apply_cancels(resting, now)
+
+        old_books: Dict[SelectionId, tuple[Ladder, Ladder]] = {}
+        for rb in tick.runners:
+            key = (mid, rb.selection_id)
+            old = self._books.get(key)
+            if old is not None:
+                old_books[rb.selection_id] = old
+            # Ladders in a RunnerBook are read-only and shared; no copy needed
+            self._books[key] = (rb.back, rb.lay)
+        if tick.runners and self._taken:
+            changed = {rb.selection_id for rb in tick.runners}
+            for k in [k for k in self._taken if k[0] == mid and k[1] in changed]:
+                del self._taken[k]
+
+        if tick.is_closed is True or tick.is_in_play is True:
+            for bet in self._resting.pop(mid, []):
+                bet.size_lapsed += bet.size_remaining
+            return
+
+        for bet in resting:
+            if bet.size_remaining <= 1e-9:
+                continue
+            if not bet.active:
+                if bet.active_at is not None and now >= bet.active_at:
+                    self._activate(bet)
+                continue
+            old = old_books.get(bet.selection_id)
+            if old is not None:
+                self._on_update(bet, old)
+        self._prune(mid)
+
+    record = on_tick
+
+    # ---- OrderTransport overrides
+
+    def cancel_orders(self, market_id: str, instructions: List[Dict[str, Any]]) -> Report:
+        if self._cfg.cancel_latency <= timedelta(0):
+            return super().cancel_orders(market_id, instructions)
+        self._count("cancelOrders")
+        if len(instructions) > self._max_cancel:
+            return {"status": "FAILURE", "errorCode": "INVALID_INPUT_DATA", "marketId": market_id, "instructionReports": []}
+        due = self._clock.now() + self._cfg.cancel_latency
+        reports = []
+        for ins in instructions:
+            bet = self._bets.get(str(ins.get("betId")))
+            if not isinstance(bet, _QueuedBet) or bet.size_remaining <= 1e-9:
+                reports.append({"status": "FAILURE", "errorCode": "BET_TAKEN_OR_LAPSED", "instruction": ins})
+                continue
+            reduction = ins.get("sizeReduction")
+            bet.cancel_at = due
+            bet.cancel_size = None if reduction is None else float(reduction)
+            reports.append({"status": "SUCCESS", "instruction": ins, "sizeCancelled": 0.0})
+        return {"status": "SUCCESS", "marketId": market_id, "instructionReports": reports}
+
+    def list_current_orders(self, bet_ids: Sequence[str]) -> Report:
+        now = self._clock.now()
+        self._apply_cancels((self._bets[b] for b in map(str, bet_ids) if b in self._bets), now)
+        return super().list_current_orders(bet_ids)
+
+    def _new_bet(
+        self, market_id: MarketId, selection_id: SelectionId, side: str, price: float, size: float, ref: str | None
+    ) -> _Bet:
+        bet = _QueuedBet(str(next(self._ids)), market_id, selection_id, side, price, size, ref)
+        bet.active_at = self._clock.now() + self._cfg.place_latency
+        self._bets[bet.bet_id] = bet
+        if self._cfg.place_latency <= timedelta(0):
+            self._activate(bet)
+        if bet.size_remaining > 1e-9:
+            self._resting.setdefault(market_id, []).append(bet)
+        return bet
+
+    # ---- matching
+
+    def _activate(self, bet: _QueuedBet) -> None:
+        bet.active = True
+        book = self._books.get((bet.market_id, bet.selection_id))
+        if book is None:
+            bet.ahead = 0.0
+            return
+        self._cross(bet, book)
+        back, lay = book
+        bet.ahead = (lay if bet.side == "BACK" else back).size_at(bet.price)
+
+    def _cross(self, bet: _QueuedBet, book: tuple[Ladder, Ladder]) -> None:
+        back, lay = book
+        # A BACK takes available-to-back at >= its price, a LAY available-to-lay at <= its price
+        is_back = bet.side == "BACK"
+        opposite = back if is_back else lay
+        best = opposite.best_price
+        if best is None or (best < bet.price if is_back else best > bet.price):
+            return
+        for price, available in opposite:
+            if bet.size_remaining <= 1e-9:
+                break
+            if (is_back and price < bet.price) or (not is_back and price > bet.price):
+                break
+            k = (bet.market_id, bet.selection_id, bet.side, price)
+            free = available - self._taken.get(k, 0.0)
+            if free <= 0:
+                continue
+            take = min(free, bet.size_remaining)
+            self._taken[k] = self._taken.get(k, 0.0) + take
+            self._fill(bet, take, price)
+
+    def _on_update(self, bet: _QueuedBet, old: tuple[Ladder, Ladder]) -> None:
+        book = self._books[(bet.market_id, bet.selection_id)]
+        self._cross(bet, book)
+        if bet.size_remaining <= 1e-9:
+            return
+
+        is_back = bet.side == "BACK"
+        old_level = old[1] if is_back else old[0]
+        new_level = book[1] if is_back else book[0]
+        before = old_level.size_at(bet.price)
+        after = new_level.size_at(bet.price)
+        if after >= before:
+            return
+
+        if after == 0:
+            best = new_level.best_price
+            if best is not None and (best > bet.price if is_back else best < bet.price):
+                # Level traded through: everyone at our price was filled
+                self._fill(bet, bet.size_remaining, bet.price)
+                return
+
+        shrink = before - after
+        traded = shrink * self._cfg.trade_fraction
+        cancelled = shrink - traded
+        if before > 0:
+            bet.ahead -= cancelled * bet.ahead / before
+        eat = min(bet.ahead, traded)
+        bet.ahead -= eat
+        traded -= eat
+        if traded > 1e-9:
+            self._fill(bet, min(traded, bet.size_remaining), bet.price)
+        bet.ahead = max(0.0, min(bet.ahead, after))
+
+    def _apply_cancels(self, bets: Iterable[_Bet], now: datetime) -> None:
+        for bet in bets:
+            if not isinstance(bet, _QueuedBet) or bet.cancel_at is None or now < bet.cancel_at:
+                continue
+            remaining = bet.size_remaining
+            size = remaining if bet.cancel_size is None else min(bet.cancel_size, remaining)
+            bet.size_cancelled += size
+            bet.cancel_at = None
+            bet.cancel_size = None
+
+    @staticmethod
+    def _fill(bet: _Bet, size: float, price: float) -> None:
+        bet.size_matched += size
+        bet.matched_value += size * price
@@ -0,0 +1,218 @@
+"""
+Mark-to-market across every position in a PositionBook at once.
+
+`mark_positions` is the vectorized form of `mark_to_market`: longs are
+marked on the best lay, shorts on the best back, and a position with no
+price on its side marks to 0.
+
+`PortfolioMarker` keeps the best back / lay of every position's runner,
+and a copy of its size and average price, in columns aligned with the
+book's slots. Ticks update the prices of the runners they carry
+(`update_market`) and fills the positions they touch (through the book's
+fill handlers); `mark()` then prices the whole portfolio in one pass, and
+`mark_changed()` re-prices only the positions whose runner moved or that
+were filled since the previous mark, folding the difference into the
+per-market and total figures.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Sequence, Set
+
+import numpy as np
+
+from bfrepricer.domain.types import MarketId, RunnerBook, SelectionId
+from bfrepricer.execution.position_book import PositionBook, PositionView
+
+
+def mark_positions(
+    size: np.ndarray, avg_price: np.ndarray, best_back: np.ndarray, best_lay: np.ndarray
+) -> np.ndarray:
+    """
+    Unrealized PnL per position; NaN prices mean no price on that side.
+
+    Long  -> mark on best LAY
+    Short -> mark on best BACK
+    """
+    mark = np.where(size > 0, best_lay, best_back)
+    pnl = size * (mark - avg_price)
+    return np.where(np.isnan(pnl), 0.0, pnl)
+
+
+@dataclass(frozen=True)
+class PortfolioMarks:
+    """
+    unrealized: unrealized PnL per position, indexed by PositionBook slot
+    by_market: unrealized PnL per market, indexed by market code
+      (`market_ids[code]`)
+    total: unrealized PnL over the whole portfolio
+    changed: slots re-priced by this mark (every slot for a full mark)
+
+    The arrays are read-only views of the marker's state, and market_ids
+    the book's own list; all are only valid until the next mark, so copy
+    them to keep them.
+    """
+    unrealized: np.ndarray
+    by_market: np.ndarray
+    total: float
+    changed: np.ndarray
+    market_ids: Sequence[MarketId]
+
+    def per_market(self) -> Dict[MarketId, float]:
+        return dict(zip(self.market_ids, self.by_market.tolist()))
+
+
+def _read_only(a: np.ndarray) -> np.ndarray:
+    v = a.view()
+    v.flags.writeable = False
+    return v
+
+
+def _grown(a: np.ndarray, n: int, fill: float | int) -> np.ndarray:
+    out = np.full(max(n, 2 * len(a)), fill, dtype=a.dtype)
+    out[: len(a)] = a
+    return out
+
+
+class PortfolioMarker:
+    """
+    Bulk, incremental mark-to-market over a PositionBook.
+
+    Prices come from ticks: pass each market's changed runner books (and
+    removed selections) to `update_market`, or the full snapshot runners
+    for a market whose positions may be new. `forget_market` drops a
+    market's prices (closed or evicted), so its positions mark to 0.
+    Markets without positions cost one dict lookup per update.
+
+    The marker copies the ledger once, when it is created, and from then on
+    follows fills through a fill handler on the book, so a mark reads only
+    the slots that changed. It stays attached to the book for the book's
+    lifetime.
+    """
+
+    def __init__(self, book: PositionBook) -> None:
+        self._book = book
+        # Per slot, with spare capacity; only the first _n are marked
+        self._back = np.full(0, np.nan)
+        self._lay = np.full(0, np.nan)
+        self._size = np.zeros(0)
+        self._avg = np.zeros(0)
+        self._code = np.zeros(0, dtype=np.intp)
+        self._unrealized = np.zeros(0)
+        self._n = 0
+        self._by_market = np.zeros(0)
+        # Slots to re-price at the next mark, and fills not yet copied
+        self._dirty: Set[int] = set()
+        self._filled: Dict[int, PositionView] = {}
+
+        size, avg, _, code, _ = book.columns()
+        n = self._n = len(size)
+        self._reserve(n)
+        self._size[:n] = np.frombuffer(size, dtype=np.float64)
+        self._avg[:n] = np.frombuffer(avg, dtype=np.float64)
+        self._code[:n] = np.frombuffer(code, dtype=f"i{code.itemsize}")
+        self._dirty.update(range(n))
+        book.add_fill_handler(self._on_fill)
+
+    def _reserve(self, n: int) -> None:
+        if n > len(self._back):
+            self._back = _grown(self._back, n, np.nan)
+            self._lay = _grown(self._lay, n, np.nan)
+            self._size = _grown(self._size, n, 0.0)
+            self._avg = _grown(self._avg, n, 0.0)
+            self._code = _grown(self._code, n, 0)
+            self._unrealized = _grown(self._unrealized, n, 0.0)
+
+    def _on_fill(self, view: PositionView) -> None:
+        self._filled[view.slot] = view
+
+    def update_market(
+        self,
+        market_id: MarketId,
+        runners: Iterable[RunnerBook],
+        removed: Iterable[SelectionId] = (),
+    ) -> None:
+        """Record new best prices for the given runners of one market."""
+        positions = self._book.market(market_id)
+        if not positions:
+            return
+        self._reserve(len(self._book))
+        back, lay, dirty = self._back, self._lay, self._dirty
+        for rb in runners:
+            view = positions.get(rb.selection_id)
+            if view is None:
+                continue
+            i = view.slot
+            # best_price, not best_back: no PriceSize per runner
+            bp, lp = rb.back.best_price, rb.lay.best_price
+            back[i] = bp if bp is not None else np.nan
+            lay[i] = lp if lp is not None else np.nan
+            dirty.add(i)
+        for sel in removed:
+            view = positions.get(sel)
+            if view is not None:
+                back[view.slot] = lay[view.slot] = np.nan
+                dirty.add(view.slot)
+
+    def forget_market(self, market_id: MarketId) -> None:
+        """Drop the prices of a market that closed or left memory."""
+        positions = self._book.market(market_id)
+        if not positions:
+            return
+        self._reserve(len(self._book))
+        for view in positions.values():
+            self._back[view.slot] = self._lay[view.slot] = np.nan
+            self._dirty.add(view.slot)
+
+    def mark(self) -> PortfolioMarks:
+        """Re-price every position."""
+        self._copy_fills()
+        n = self._n
+        self._unrealized[:n] = mark_positions(self._size[:n], self._avg[:n], self._back[:n], self._lay[:n])
+        self._by_market = np.bincount(
+            self._code[:n], weights=self._unrealized[:n], minlength=len(self._book.market_ids)
+        )
+        return self._finish(np.arange(n))
+
+    def mark_changed(self) -> PortfolioMarks:
+        """
+        Re-price only positions whose prices were updated, or that were
+        filled, since the previous mark.
+        """
+        self._copy_fills()
+        n_markets = len(self._book.market_ids)
+        if n_markets > len(self._by_market):
+            self._by_market = _grown(self._by_market, n_markets, 0.0)
+
+        idx = np.fromiter(sorted(self._dirty), dtype=np.intp, count=len(self._dirty))
+        pnl = mark_positions(self._size[idx], self._avg[idx], self._back[idx], self._lay[idx])
+        np.add.at(self._by_market, self._code[idx], pnl - self._unrealized[idx])
+        self._unrealized[idx] = pnl
+        return self._finish(idx)
+
+    def _copy_fills(self) -> None:
+        filled = self._filled
+        if not filled:
+            return
+        # Every new slot is created by a fill, so this covers new positions
+        self._n = len(self._book)
+        self._reserve(self._n)
+        for i, view in filled.items():
+            self._size[i] = view.size
+            self._avg[i] = view.avg_price
+            self._code[i] = view.market_code
+        self._dirty.update(filled)
+        filled.clear()
+
+    def _finish(self, changed: np.ndarray) -> PortfolioMarks:
+        self._dirty.clear()
+        n, market_ids = self._n, self._book.market_ids
+        by_market = self._by_market[: len(market_ids)]
+        return PortfolioMarks(
+            unrealized=_read_only(self._unrealized[:n]),
+            by_market=_read_only(by_market),
+            total=float(by_market.sum()),
+            changed=_read_only(changed),
+            market_ids=market_ids,
+        )
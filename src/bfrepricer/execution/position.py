@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from bfrepricer.execution.intent import Side
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     size: float = 0.0        # positive = long, negative = short
     avg_price: float = 0.0
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from bfrepricer.domain.types import MarketId, SelectionId
+from bfrepricer.execution.intent import Side
+from bfrepricer.execution.position import Position
+
+PositionKey = Tuple[MarketId, SelectionId]
+
+
+class PositionView:
+    """
+    Live, read-only view of one PositionBook slot.
+
+    Reads like a Position (`size`, `avg_price`, `realized_pnl`) without
+    holding any of the values itself; `to_position()` takes a detached copy.
+    """
+
+    __slots__ = ("_book", "_slot")
+
+    def __init__(self, book: "PositionBook", slot: int) -> None:
+        self._book = book
+        self._slot = slot
+
+    @property
+    def slot(self) -> int:
+        return self._slot
+
+    @property
+    def size(self) -> float:
+        return self._book._size[self._slot]
+
+    @property
+    def avg_price(self) -> float:
+        return self._book._avg_price[self._slot]
+
+    @property
+    def realized_pnl(self) -> float:
+        return self._book._realized[self._slot]
+
+    @property
+    def market_code(self) -> int:
+        """The market's code in PositionBook.market_ids."""
+        return self._book._slot_market[self._slot]
+
+    def to_position(self) -> Position:
+        return Position(self.size, self.avg_price, self.realized_pnl)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (PositionView, Position)):
+            return NotImplemented
+        return (self.size, self.avg_price, self.realized_pnl) == (other.size, other.avg_price, other.realized_pnl)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"PositionView(size={self.size!r}, avg_price={self.avg_price!r}, realized_pnl={self.realized_pnl!r})"
+
+
+_EMPTY: Mapping[SelectionId, PositionView] = MappingProxyType({})
+
+
+class PositionBook(Mapping[PositionKey, PositionView]):
+    """
+    Positions as a compact ledger, indexed by market, with a running
+    absolute exposure per market.
+
+    Each (market, selection) is interned to a slot on its first fill; size,
+    average price and realized PnL live in three parallel `array('d')`
+    columns indexed by slot, alongside the slot's market code and
+    selection. Totals over every position (`total_realized()`,
+    `total_abs()`) are single passes over a column, and `columns()` hands
+    the raw values to bulk consumers such as portfolio mark-to-market.
+
+    Reads as a flat (market, selection) -> Position mapping, so existing
+    callers that iterate or `.get()` keep working; the values are
+    PositionViews onto the ledger. Per-market lookups (`market()`,
+    `market_abs()`) cost O(positions in that market) and O(1) respectively
+    instead of a walk over every position ever opened.
+
+    Fills must go through `apply_fill()` so the exposure totals stay in step.
+    Fill handlers (`add_fill_handler()`) get the PositionView of every fill
+    once it is applied, so incremental consumers track the slots that
+    changed rather than re-reading the ledger.
+    """
+
+    __slots__ = (
+        "_by_market", "_market_abs", "_size", "_avg_price", "_realized",
+        "_slot_market", "_slot_selection", "_market_code", "_market_ids", "_on_fill",
+    )
+
+    def __init__(self) -> None:
+        self._by_market: Dict[MarketId, Dict[SelectionId, PositionView]] = {}
+        self._market_abs: Dict[MarketId, float] = {}
+        # Ledger columns, one entry per slot
+        self._size = array("d")
+        self._avg_price = array("d")
+        self._realized = array("d")
+        self._slot_market = array("l")
+        self._slot_selection = array("q")
+        # Market interning for _slot_market
+        self._market_code: Dict[MarketId, int] = {}
+        self._market_ids: List[MarketId] = []
+        self._on_fill: Tuple[Callable[[PositionView], None], ...] = ()
+
+    def add_fill_handler(self, handler: Callable[[PositionView], None]) -> None:
+        self._on_fill += (handler,)
+
+    def __getitem__(self, key: PositionKey) -> PositionView:
+        m, s = key
+        return self._by_market[m][s]
+
+    def get(self, key: PositionKey, default: PositionView | None = None) -> PositionView | None:  # type: ignore[override]
+        by_sel = self._by_market.get(key[0])
+        if by_sel is None:
+            return default
+        return by_sel.get(key[1], default)
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            m, s = key  # type: ignore[misc]
+        except (TypeError, ValueError):
+            return False
+        by_sel = self._by_market.get(m)
+        return by_sel is not None and s in by_sel
+
+    def __iter__(self) -> Iterator[PositionKey]:
+        for m, by_sel in self._by_market.items():
+            for s in by_sel:
+                yield (m, s)
+
+    def __len__(self) -> int:
+        return len(self._size)
+
+    def market(self, market_id: MarketId) -> Mapping[SelectionId, PositionView]:
+        """Read-only view of one market's positions by selection."""
+        by_sel = self._by_market.get(market_id)
+        return MappingProxyType(by_sel) if by_sel is not None else _EMPTY
+
+    def market_abs(self, market_id: MarketId) -> float:
+        """Sum of |size| over the market's positions."""
+        return self._market_abs.get(market_id, 0.0)
+
+    def slot(self, key: PositionKey) -> int | None:
+        view = self.get(key)
+        return view.slot if view is not None else None
+
+    @property
+    def market_ids(self) -> List[MarketId]:
+        """Markets by code: `market_ids[code]` for the codes in columns()."""
+        return self._market_ids
+
+    def columns(self) -> Tuple[array, array, array, array, array]:
+        """
+        Copies of the ledger columns, indexed by slot:
+        (size, avg_price, realized_pnl, market code, selection id).
+
+        Copies, so consumers (e.g. np.frombuffer) never pin the live buffers,
+        which must stay resizable for new slots.
+        """
+        return (
+            self._size[:],
+            self._avg_price[:],
+            self._realized[:],
+            self._slot_market[:],
+            self._slot_selection[:],
+        )
+
+    def total_realized(self) -> float:
+        return sum(self._realized)
+
+    def total_abs(self) -> float:
+        """Sum of |size| over every position."""
+        return sum(map(abs, self._size))
+
+    def apply_fill(
+        self, market_id: MarketId, selection_id: SelectionId, side: Side, price: float, size: float
+    ) -> PositionView:
+        by_sel = self._by_market.get(market_id)
+        if by_sel is None:
+            by_sel = self._by_market[market_id] = {}
+        view = by_sel.get(selection_id)
+        if view is None:
+            view = by_sel[selection_id] = self._new_slot(market_id, selection_id)
+
+        # Position.apply_fill, on the ledger columns
+        i = view._slot
+        sizes, avg = self._size, self._avg_price
+        before = sizes[i]
+        signed = size if side == Side.BACK else -size
+        if before != 0 and (before > 0) != (signed > 0):
+            closing = min(abs(before), abs(signed))
+            self._realized[i] += closing * (price - avg[i]) * (1 if before > 0 else -1)
+            after = sizes[i] = before + signed
+            if after == 0:
+                avg[i] = 0.0
+        else:
+            after = sizes[i] = before + signed
+            avg[i] = (avg[i] * before + price * signed) / after if before != 0 else price
+        self._market_abs[market_id] = self._market_abs.get(market_id, 0.0) - abs(before) + abs(after)
+        for handler in self._on_fill:
+            handler(view)
+        return view
+
+    def _new_slot(self, market_id: MarketId, selection_id: SelectionId) -> PositionView:
+        code = self._market_code.get(market_id)
+        if code is None:
+            code = self._market_code[market_id] = len(self._market_ids)
+            self._market_ids.append(market_id)
+        self._size.append(0.0)
+        self._avg_price.append(0.0)
+        self._realized.append(0.0)
+        self._slot_market.append(code)
+        self._slot_selection.append(selection_id)
+        return PositionView(self, len(self._size) - 1)
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Mapping, Tuple
 
 from bfrepricer.domain.types import MarketId, SelectionId
-from bfrepricer.execution.intent import OrderIntent
+from bfrepricer.execution.intent import OrderIntent, Side
 from bfrepricer.execution.position import Position
+from bfrepricer.execution.position_book import PositionBook
+
+
+def _market_abs(positions: Mapping[Tuple[MarketId, SelectionId], Position], market_id: MarketId) -> float:
+    if isinstance(positions, PositionBook):
+        return positions.market_abs(market_id)
+    return sum(abs(pos.size) for (m, _s), pos in positions.items() if m == market_id)
 
 
 @dataclass(frozen=True)
@@ -15,15 +22,140 @@ class RiskConfig:
     max_order_size: float = 2.0
 
 
+PositionKey = Tuple[MarketId, SelectionId]
+
+# Ledger sizes closer to zero than this are zero: partial fills leave float
+# residue (3 x 0.1 against 0.3), and the executor never reports remainders
+# below it
+SIZE_TOLERANCE = 1e-9
+
+
 @dataclass
 class RiskGate:
+    """
+    Pre-trade exposure checks.
+
+    `filter_intents()` is the stateless form: it derives exposure from the
+    positions it is given on every call.
+
+    The ledger form keeps its own exposure per selection and per market,
+    updated incrementally, so a check is a handful of dict lookups and
+    never copies engine state:
+    - `reserve()` checks one intent against filled + in-flight exposure and,
+      if accepted, records the size as in flight
+    - `commit()` moves a filled size from in flight to filled
+    - `release()` drops a rejected / cancelled / lapsed size from in flight
+    Exposure for the caps counts in-flight sizes as if filled. `sync()`
+    seeds the ledger from existing positions.
+    """
     cfg: RiskConfig
+    _filled: Dict[PositionKey, float] = field(default_factory=dict, init=False, repr=False)
+    _pending: Dict[PositionKey, float] = field(default_factory=dict, init=False, repr=False)
+    _market_abs: Dict[MarketId, float] = field(default_factory=dict, init=False, repr=False)
+
+    def sync(self, positions: Mapping[PositionKey, Position]) -> None:
+        """Reset the ledger to `positions` (nothing in flight)."""
+        self._filled = {k: pos.size for k, pos in positions.items() if pos.size != 0}
+        self._pending = {}
+        self._market_abs = {}
+        for (m, _s), size in self._filled.items():
+            self._market_abs[m] = self._market_abs.get(m, 0.0) + abs(size)
+
+    def exposure(self, market_id: MarketId, selection_id: SelectionId) -> float:
+        """Signed size, filled plus in flight."""
+        key = (market_id, selection_id)
+        return self._filled.get(key, 0.0) + self._pending.get(key, 0.0)
+
+    def in_flight(self, market_id: MarketId, selection_id: SelectionId) -> float:
+        """Signed size reserved but not yet filled or released."""
+        return self._pending.get((market_id, selection_id), 0.0)
+
+    def market_exposure(self, market_id: MarketId) -> float:
+        """Sum of |exposure| over the market's selections."""
+        return self._market_abs.get(market_id, 0.0)
+
+    def reserve(self, intent: OrderIntent) -> float:
+        """
+        Check `intent` and reserve its (clamped) size.
+
+        Returns the accepted size, or 0.0 if the intent must be dropped.
+        Same invariants as filter_intents(): never exceed caps, always
+        allow reducing intents.
+        """
+        size = min(float(intent.size), float(self.cfg.max_order_size))
+        if size <= 0:
+            return 0.0
+
+        m = intent.market_id
+        key = (m, intent.selection_id)
+        pending = self._pending.get(key, 0.0)
+        before = self._filled.get(key, 0.0) + pending
+        after = before + (size if intent.side is Side.BACK else -size)
+
+        if abs(after) >= abs(before):
+            if abs(after) > self.cfg.max_abs_pos_per_selection:
+                return 0.0
+            market_abs = self._market_abs.get(m, 0.0)
+            if market_abs - abs(before) + abs(after) > self.cfg.max_abs_pos_per_market:
+                return 0.0
+
+        self._pending[key] = pending + (after - before)
+        self._market_abs[m] = self._market_abs.get(m, 0.0) - abs(before) + abs(after)
+        return size
+
+    def commit(self, intent: OrderIntent, size: float | None = None) -> None:
+        """Record a fill of `size` (default: all of `intent.size`) against its reservation."""
+        signed = intent.size if size is None else size
+        if intent.side is not Side.BACK:
+            signed = -signed
+        key = (intent.market_id, intent.selection_id)
+        self._set_pending(key, self._pending.get(key, 0.0) - signed)
+        filled = self._filled.get(key, 0.0) + signed
+        if abs(filled) < SIZE_TOLERANCE:
+            self._filled.pop(key, None)
+        else:
+            self._filled[key] = filled
+
+    def release(self, intent: OrderIntent, size: float | None = None) -> None:
+        """Drop `size` (default: all of `intent.size`) of a reservation that will not fill."""
+        signed = intent.size if size is None else size
+        if intent.side is not Side.BACK:
+            signed = -signed
+        m = intent.market_id
+        key = (m, intent.selection_id)
+        pending = self._pending.get(key, 0.0)
+        before = self._filled.get(key, 0.0) + pending
+        after = before - signed
+        self._set_pending(key, pending - signed)
+        self._market_abs[m] = self._market_abs.get(m, 0.0) - abs(before) + abs(after)
+
+    def reserve_intents(self, intents: Iterable[OrderIntent]) -> List[OrderIntent]:
+        """
+        Ledger form of filter_intents(): reserve each intent in order and
+        return those accepted, clamped where needed and tagged like
+        filter_intents() (" | risk:ok" / " | risk:allow_reduce").
+        """
+        out: List[OrderIntent] = []
+        for i in intents:
+            before = abs(self.exposure(i.market_id, i.selection_id))
+            size = self.reserve(i)
+            if size <= 0:
+                continue
+            tag = " | risk:allow_reduce" if abs(self.exposure(i.market_id, i.selection_id)) < before else " | risk:ok"
+            out.append(replace(i, size=size, reason=i.reason + tag))
+        return out
+
+    def _set_pending(self, key: PositionKey, pending: float) -> None:
+        if abs(pending) < SIZE_TOLERANCE:
+            self._pending.pop(key, None)
+        else:
+            self._pending[key] = pending
 
     def filter_intents(
         self,
         *,
         intents: Iterable[OrderIntent],
-        positions: Dict[Tuple[MarketId, SelectionId], Position],
+        positions: Mapping[Tuple[MarketId, SelectionId], Position],
     ) -> List[OrderIntent]:
         """
         Returns a filtered/clamped list of intents.
@@ -32,13 +164,15 @@ class RiskGate:
         - Never increase exposure beyond caps.
         - Always allow position-reducing intents (risk-off).
         - Fail closed: if anything is ambiguous, drop the intent.
+
+        `positions` is read, never mutated. With a PositionBook the market
+        exposure is its running total rather than a walk over all positions.
         """
         out: List[OrderIntent] = []
 
-        # Precompute market abs exposure
+        # Exposure as of the intents accepted so far in this batch
+        sizes: Dict[Tuple[MarketId, SelectionId], float] = {}
         market_abs: Dict[MarketId, float] = {}
-        for (m, _s), pos in positions.items():
-            market_abs[m] = market_abs.get(m, 0.0) + abs(pos.size)
 
         for i in intents:
             # Clamp single order size
@@ -47,13 +181,17 @@ class RiskGate:
                 continue
 
             key = (i.market_id, i.selection_id)
-            pos = positions.get(key, Position())
+            before = sizes.get(key)
+            if before is None:
+                pos = positions.get(key)
+                before = pos.size if pos is not None else 0.0
+            if i.market_id not in market_abs:
+                market_abs[i.market_id] = _market_abs(positions, i.market_id)
 
             # Signed delta: BACK increases long, LAY increases short
             signed = size if i.side.value == "BACK" else -size
 
             # Determine whether this intent increases or reduces absolute exposure
-            before = pos.size
             after = before + signed
 
             reduces_abs = abs(after) < abs(before)
@@ -68,11 +206,9 @@ class RiskGate:
                     size=size,
                     reason=i.reason + " | risk:allow_reduce",
                 ))
-                # Update temp positions for subsequent intents in this batch
-                pos2 = Position(size=before, avg_price=pos.avg_price, realized_pnl=pos.realized_pnl)
-                pos2.size = after
-                positions[key] = pos2
-                market_abs[i.market_id] = market_abs.get(i.market_id, 0.0) - abs(before) + abs(after)
+                # Update temp tracking for subsequent intents in this batch
+                sizes[key] = after
+                market_abs[i.market_id] += abs(after) - abs(before)
                 continue
 
             # Increasing exposure: enforce caps
@@ -82,7 +218,7 @@ class RiskGate:
                 continue
 
             # Per-market cap (approx, using abs position)
-            current_market_abs = market_abs.get(i.market_id, 0.0)
+            current_market_abs = market_abs[i.market_id]
             projected_market_abs = current_market_abs - abs(before) + abs(after)
             if projected_market_abs > self.cfg.max_abs_pos_per_market:
                 continue
@@ -97,9 +233,7 @@ class RiskGate:
             ))
 
             # Update temp tracking so multiple intents in a tick don't exceed caps
-            pos2 = Position(size=before, avg_price=pos.avg_price, realized_pnl=pos.realized_pnl)
-            pos2.size = after
-            positions[key] = pos2
+            sizes[key] = after
             market_abs[i.market_id] = projected_market_abs
 
         return out
@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from typing import Any
 
 from bfrepricer.domain.events import MarketTick
-from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId
+from bfrepricer.domain.types import Ladder, MarketId, PriceSize, RunnerBook, SelectionId
 
 
 def _utc_now() -> datetime:
@@ -35,26 +35,25 @@ def best_prices_from_ex(ex: dict[str, Any]) -> tuple[PriceSize | None, PriceSize
     return best_back, best_lay
 
 
-def market_tick_from_book(book: dict[str, Any], *, seq: int, publish_time: datetime | None = None) -> MarketTick:
+def ladders_from_ex(ex: dict[str, Any]) -> tuple[Ladder, Ladder]:
     """
-    Convert a Betfair MarketBook-like dict into our canonical MarketTick.
+    Full-depth back/lay ladders from Betfair 'ex' structure.
 
-    Works for REST listMarketBook responses and for streaming snapshots
-    as long as the structure is similar.
+    Same keys as best_prices_from_ex; every level is kept.
+    """
+    atb = ex.get("availableToBack") or ()
+    atl = ex.get("availableToLay") or ()
+    back = Ladder.back((lv["price"], lv["size"]) for lv in atb)
+    lay = Ladder.lay((lv["price"], lv["size"]) for lv in atl)
+    return back, lay
 
-    Minimal expected keys on book:
-      - marketId: str
-      - status: "OPEN" | "SUSPENDED" | "CLOSED" | ...
-      - inplay: bool (optional)
-      - runners: [{selectionId: int, ex: {...}}, ...]
 
-    We intentionally fail closed:
-      - unknown status => is_market_open=None, is_closed=None
+def market_flags(status: str | None, in_play: bool | None) -> tuple[bool | None, bool | None, bool | None]:
     """
-    market_id = MarketId(str(book["marketId"]))
-    status = book.get("status")
-    in_play = book.get("inplay")
+    Map Betfair market status / in-play flag to (is_market_open, is_in_play, is_closed).
 
+    Unknown status fails closed: is_market_open=None, is_closed=None.
+    """
     is_market_open: bool | None = None
     is_closed: bool | None = None
 
@@ -67,14 +66,42 @@ def market_tick_from_book(book: dict[str, Any], *, seq: int, publish_time: datet
         is_market_open = False
 
     is_in_play: bool | None = True if in_play is True else None
+    return is_market_open, is_in_play, is_closed
+
+
+def market_tick_from_book(book: dict[str, Any], *, seq: int, publish_time: datetime | None = None) -> MarketTick:
+    """
+    Convert a Betfair MarketBook-like dict into our canonical MarketTick.
+
+    Works for REST listMarketBook responses and for streaming snapshots
+    as long as the structure is similar.
+
+    Minimal expected keys on book:
+      - marketId: str
+      - status: "OPEN" | "SUSPENDED" | "CLOSED" | ...
+      - inplay: bool (optional)
+      - runners: [{selectionId: int, status: str (optional), ex: {...}}, ...]
+
+    Runners with status REMOVED (non-runners) are reported in `removed`
+    instead of carrying a book.
+
+    We intentionally fail closed:
+      - unknown status => is_market_open=None, is_closed=None
+    """
+    market_id = MarketId(str(book["marketId"]))
+    is_market_open, is_in_play, is_closed = market_flags(book.get("status"), book.get("inplay"))
 
     runners_raw = book.get("runners") or []
     runners: list[RunnerBook] = []
+    removed: list[SelectionId] = []
     for r in runners_raw:
         sel = SelectionId(int(r["selectionId"]))
+        if r.get("status") == "REMOVED":
+            removed.append(sel)
+            continue
         ex = r.get("ex") or {}
-        best_back, best_lay = best_prices_from_ex(ex)
-        runners.append(RunnerBook(selection_id=sel, best_back=best_back, best_lay=best_lay))
+        back, lay = ladders_from_ex(ex)
+        runners.append(RunnerBook(selection_id=sel, back=back, lay=lay))
 
     return MarketTick(
         market_id=market_id,
@@ -84,4 +111,5 @@ def market_tick_from_book(book: dict[str, Any], *, seq: int, publish_time: datet
         is_market_open=is_market_open,
         is_in_play=is_in_play,
         is_closed=is_closed,
+        removed=tuple(removed),
     )
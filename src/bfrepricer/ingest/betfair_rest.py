@@ -0,0 +1,441 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import random
+import ssl
+import threading
+from dataclasses import dataclass
+from typing import Any, Coroutine, Dict, List, Sequence, TypeVar
+from urllib.parse import urlsplit
+
+from bfrepricer.ingest.fast_decode import loads
+
+T = TypeVar("T")
+
+BETTING_URL = "https://api.betfair.com/exchange/betting/rest/v1.0/"
+
+# APING error codes worth retrying; anything else (bad input, bad session,
+# TOO_MUCH_DATA, ...) fails straight away.
+RETRYABLE_ERROR_CODES = frozenset({"TOO_MANY_REQUESTS", "SERVICE_BUSY", "TIMEOUT_ERROR", "UNEXPECTED_ERROR"})
+
+
+class BetfairApiError(RuntimeError):
+    def __init__(self, message: str, *, status: int | None = None, error_code: str | None = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.error_code = error_code
+        self.retryable = retryable
+
+
+@dataclass(frozen=True)
+class RestConfig:
+    """
+    url: base URL of the betting REST endpoint (operation names are appended)
+    max_connections: size of the keep-alive pool, i.e. max calls in flight
+    timeout: per attempt, covering connect + request + response
+    max_attempts: attempts per call, including the first
+    backoff_base / backoff_max: exponential backoff bounds in seconds (jittered)
+    retry_budget_ratio / retry_budget_min: see RetryBudget
+    """
+    url: str = BETTING_URL
+    max_connections: int = 4
+    timeout: float = 10.0
+    max_attempts: int = 4
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+    retry_budget_ratio: float = 0.1
+    retry_budget_min: int = 10
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of overall traffic.
+
+    Every call deposits `ratio` tokens (up to `min_retries` + ratio * 100),
+    every retry spends one. When the exchange is struggling the budget
+    drains and callers fail fast instead of multiplying the load.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_retries: int = 10) -> None:
+        self._ratio = ratio
+        self._cap = min_retries + ratio * 100
+        self._tokens = float(min_retries)
+
+    @property
+    def available(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        self._tokens = min(self._cap, self._tokens + self._ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+@dataclass(frozen=True, slots=True)
+class HttpResponse:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    keep_alive: bool
+
+
+class _Connection:
+    """One HTTP/1.1 keep-alive connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+
+    @property
+    def usable(self) -> bool:
+        return not self._reader.at_eof() and not self._writer.is_closing()
+
+    def close(self) -> None:
+        self._writer.close()
+
+    async def request(self, head: bytes, body: bytes) -> HttpResponse:
+        self._writer.write(head + body)
+        await self._writer.drain()
+        return await self._read_response()
+
+    async def _read_response(self) -> HttpResponse:
+        reader = self._reader
+        line = await reader.readline()
+        if not line:
+            raise ConnectionResetError("connection closed before response")
+        version, status, _ = (line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+
+        headers: Dict[str, str] = {}
+        while True:
+            raw = await reader.readline()
+            if raw in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = raw.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                parts.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(parts)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        if headers.get("content-encoding", "").lower() == "gzip":
+            body = gzip.decompress(body)
+        return HttpResponse(status=int(status), headers=headers, body=body, keep_alive=keep_alive)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of keep-alive connections to a single host.
+
+    At most `max_size` requests are in flight; extra callers wait for a
+    free slot. Idle connections are reused, so a steady poll costs one
+    round trip rather than a TCP + TLS handshake.
+    """
+
+    def __init__(self, host: str, port: int, *, ssl_context: ssl.SSLContext | None, max_size: int) -> None:
+        self.host = host
+        self.port = port
+        self._ssl = ssl_context
+        self._slots = asyncio.Semaphore(max_size)
+        self._idle: List[_Connection] = []
+        self.connects = 0
+
+    async def _open(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self._ssl, server_hostname=self.host if self._ssl else None
+        )
+        self.connects += 1
+        return _Connection(reader, writer)
+
+    def _take_idle(self) -> _Connection | None:
+        while self._idle:
+            conn = self._idle.pop()
+            if conn.usable:
+                return conn
+            conn.close()
+        return None
+
+    async def request(self, head: bytes, body: bytes) -> HttpResponse:
+        async with self._slots:
+            conn = self._take_idle()
+            reused = conn is not None
+            if conn is None:
+                conn = await self._open()
+            try:
+                resp = await conn.request(head, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server dropped an idle connection; not a real failure
+                conn = await self._open()
+                try:
+                    resp = await conn.request(head, body)
+                except BaseException:
+                    conn.close()
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.keep_alive:
+                self._idle.append(conn)
+            else:
+                conn.close()
+            return resp
+
+    def close(self) -> None:
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+
+
+class AsyncBetfairClient:
+    """
+    asyncio client for the betting REST API (listMarketBook etc.).
+
+    - one keep-alive ConnectionPool, `cfg.max_connections` calls in flight
+    - identical concurrent calls (same operation and parameters) share a
+      single request
+    - `call_raw` / `list_market_book_raw` return the undecoded response body
+      for fast_decode; `call` decodes it per caller
+    - transient failures (connection errors, timeouts, 429/5xx, busy APING
+      codes) are retried with jittered exponential backoff while the shared
+      RetryBudget allows
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, app_key: str, session_token: str, cfg: RestConfig = RestConfig()) -> None:
+        self.cfg = cfg
+        url = urlsplit(cfg.url)
+        secure = url.scheme == "https"
+        self._host = url.hostname or ""
+        self._path = url.path if url.path.endswith("/") else url.path + "/"
+        self._pool = ConnectionPool(
+            self._host,
+            url.port or (443 if secure else 80),
+            ssl_context=ssl.create_default_context() if secure else None,
+            max_size=cfg.max_connections,
+        )
+        self._headers = (
+            f"Host: {url.netloc}\r\n"
+            f"X-Application: {app_key}\r\n"
+            f"X-Authentication: {session_token}\r\n"
+            "Content-Type: application/json\r\n"
+            "Accept: application/json\r\n"
+            "Accept-Encoding: gzip\r\n"
+            "Connection: keep-alive\r\n"
+        )
+        self.budget = RetryBudget(cfg.retry_budget_ratio, cfg.retry_budget_min)
+        self._inflight: Dict[tuple[str, bytes], asyncio.Future[bytes]] = {}
+        self.requests = 0
+        self.coalesced = 0
+        self.retries = 0
+
+    @property
+    def connects(self) -> int:
+        return self._pool.connects
+
+    async def call(self, operation: str, params: Dict[str, Any]) -> Any:
+        return loads(await self.call_raw(operation, params))
+
+    async def call_raw(self, operation: str, params: Dict[str, Any]) -> bytes:
+        body = json.dumps(params, sort_keys=True, separators=(",", ":")).encode()
+        key = (operation, body)
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self._call_with_retries(operation, body))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _f: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: one caller being cancelled must not cancel the shared request
+        return await asyncio.shield(fut)
+
+    async def _call_with_retries(self, operation: str, body: bytes) -> bytes:
+        cfg = self.cfg
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await asyncio.wait_for(self._call_once(operation, body), cfg.timeout)
+            except (ConnectionError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+                err: BetfairApiError = BetfairApiError(f"{operation}: {exc!r}", retryable=True)
+                cause: BaseException = exc
+            except BetfairApiError as exc:
+                err = cause = exc
+            if not err.retryable or attempt >= cfg.max_attempts or not self.budget.try_spend():
+                raise err from cause
+            self.retries += 1
+            delay = min(cfg.backoff_max, cfg.backoff_base * 2 ** (attempt - 1))
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def _call_once(self, operation: str, body: bytes) -> bytes:
+        head = (
+            f"POST {self._path}{operation}/ HTTP/1.1\r\n{self._headers}Content-Length: {len(body)}\r\n\r\n"
+        ).encode("latin-1")
+        self.requests += 1
+        resp = await self._pool.request(head, body)
+        if resp.status == 200:
+            return resp.body
+        raise _api_error(operation, resp)
+
+    async def list_market_catalogue(
+        self,
+        *,
+        filter: Dict[str, Any],
+        max_results: int,
+        market_projection: Sequence[str] = (),
+        sort: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"filter": filter, "maxResults": max_results}
+        if market_projection:
+            params["marketProjection"] = list(market_projection)
+        if sort:
+            params["sort"] = sort
+        return await self.call("listMarketCatalogue", params)
+
+    async def list_market_book(
+        self,
+        market_ids: Sequence[str],
+        *,
+        price_projection: Dict[str, Any] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return loads(await self.list_market_book_raw(market_ids, price_projection=price_projection))
+
+    async def list_market_book_raw(
+        self,
+        market_ids: Sequence[str],
+        *,
+        price_projection: Dict[str, Any] | None = None,
+    ) -> bytes:
+        params = {
+            "marketIds": list(market_ids),
+            "priceProjection": price_projection or {"priceData": ["EX_BEST_OFFERS"]},
+        }
+        return await self.call_raw("listMarketBook", params)
+
+    # Order operations. placeOrders always carries a customerRef, which the
+    # exchange de-duplicates on, so the transient-failure retry cannot place
+    # twice; it also keeps concurrent placements from being coalesced.
+
+    async def place_orders(
+        self, market_id: str, instructions: List[Dict[str, Any]], customer_ref: str
+    ) -> Dict[str, Any]:
+        return await self.call(
+            "placeOrders", {"marketId": market_id, "instructions": instructions, "customerRef": customer_ref}
+        )
+
+    async def cancel_orders(self, market_id: str, instructions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return await self.call("cancelOrders", {"marketId": market_id, "instructions": instructions})
+
+    async def replace_orders(self, market_id: str, instructions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return await self.call("replaceOrders", {"marketId": market_id, "instructions": instructions})
+
+    async def list_current_orders(self, bet_ids: Sequence[str]) -> Dict[str, Any]:
+        return await self.call("listCurrentOrders", {"betIds": list(bet_ids)})
+
+    async def aclose(self) -> None:
+        self._pool.close()
+
+
+def _api_error(operation: str, resp: HttpResponse) -> BetfairApiError:
+    code = None
+    try:
+        detail = json.loads(resp.body).get("detail", {})
+        code = next(iter(detail.values())).get("errorCode")
+    except (ValueError, AttributeError, StopIteration):
+        pass
+    retryable = resp.status == 429 or resp.status >= 500 or code in RETRYABLE_ERROR_CODES
+    return BetfairApiError(
+        f"{operation}: HTTP {resp.status}" + (f" {code}" if code else ""),
+        status=resp.status,
+        error_code=code,
+        retryable=retryable,
+    )
+
+
+class BetfairClient:
+    """
+    Blocking facade over AsyncBetfairClient for thread-based callers such
+    as PollScheduler.
+
+    Owns a private event loop on a background thread; calls from any number
+    of threads are multiplexed onto the one connection pool, so concurrent
+    polls share connections and identical requests are coalesced.
+    """
+
+    def __init__(self, app_key: str, session_token: str, cfg: RestConfig = RestConfig()) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="betfair-rest", daemon=True)
+        self._thread.start()
+        self.client = AsyncBetfairClient(app_key, session_token, cfg)
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def list_market_catalogue(
+        self,
+        *,
+        filter: Dict[str, Any],
+        max_results: int,
+        market_projection: Sequence[str] = (),
+        sort: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        return self._run(
+            self.client.list_market_catalogue(
+                filter=filter, max_results=max_results, market_projection=market_projection, sort=sort
+            )
+        )
+
+    def list_market_book(self, market_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        return self._run(self.client.list_market_book(market_ids))
+
+    def list_market_book_raw(self, market_ids: Sequence[str]) -> bytes:
+        return self._run(self.client.list_market_book_raw(market_ids))
+
+    def place_orders(self, market_id: str, instructions: List[Dict[str, Any]], customer_ref: str) -> Dict[str, Any]:
+        return self._run(self.client.place_orders(market_id, instructions, customer_ref))
+
+    def cancel_orders(self, market_id: str, instructions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return self._run(self.client.cancel_orders(market_id, instructions))
+
+    def replace_orders(self, market_id: str, instructions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return self._run(self.client.replace_orders(market_id, instructions))
+
+    def list_current_orders(self, bet_ids: Sequence[str]) -> Dict[str, Any]:
+        return self._run(self.client.list_current_orders(bet_ids))
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+    def __enter__(self) -> "BetfairClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Dict
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId, RunnerBook, SelectionId
+
+
+class _MarketPrint:
+    __slots__ = ("seq", "flags", "runners")
+
+    def __init__(self) -> None:
+        self.seq = -1
+        self.flags: tuple[bool | None, bool | None, bool | None] | None = None
+        self.runners: Dict[SelectionId, RunnerBook] = {}
+
+
+def _same_book(a: RunnerBook, b: RunnerBook) -> bool:
+    # Ladder equality is a compare of the raw price/size buffers
+    return a is b or (a.back == b.back and a.lay == b.lay)
+
+
+class ChangeFilter:
+    """
+    Drops market ticks that carry nothing new, before they reach the
+    orchestrator.
+
+    Per market it keeps the last seen flags and, per runner, the last seen
+    book (its content is the fingerprint; comparing two ladders is a compare
+    of their array buffers). filter() returns:
+
+    - None when flags and every runner are unchanged and no runner it has
+      seen is newly `removed`
+    - the tick with only its changed runners otherwise (MarketState merges
+      partial runner updates, so unchanged runners need not be re-applied)
+    - closing ticks and ticks at or behind the last seen seq unchanged, so
+      the state machine keeps its say over terminal and out-of-order input
+    """
+
+    def __init__(self) -> None:
+        self._markets: Dict[MarketId, _MarketPrint] = {}
+        self.passed = 0
+        self.dropped = 0
+
+    def filter(self, tick: MarketTick) -> MarketTick | None:
+        if tick.is_closed is True:
+            self._markets.pop(tick.market_id, None)
+            self.passed += 1
+            return tick
+
+        mp = self._markets.get(tick.market_id)
+        if mp is None:
+            mp = self._markets[tick.market_id] = _MarketPrint()
+        elif tick.seq <= mp.seq:
+            self.passed += 1
+            return tick
+        mp.seq = tick.seq
+
+        flags = (tick.is_market_open, tick.is_in_play, tick.is_closed)
+        flags_changed = flags != mp.flags
+        mp.flags = flags
+
+        seen = mp.runners
+        # A withdrawal is news once; later ticks repeating it are not
+        removed = False
+        for sel in tick.removed:
+            removed = seen.pop(sel, None) is not None or removed
+        changed = []
+        for rb in tick.runners:
+            prev = seen.get(rb.selection_id)
+            if prev is None or not _same_book(prev, rb):
+                seen[rb.selection_id] = rb
+                changed.append(rb)
+
+        if not changed and not flags_changed and not removed:
+            self.dropped += 1
+            return None
+
+        self.passed += 1
+        if len(changed) == len(tick.runners):
+            return tick
+        return replace(tick, runners=tuple(changed))
+
+    def forget(self, market_id: MarketId) -> None:
+        self._markets.pop(market_id, None)
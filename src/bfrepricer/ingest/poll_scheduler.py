@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import perf_counter_ns
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from bfrepricer.domain.clock import SYSTEM_CLOCK, Clock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId
+from bfrepricer.ingest.fast_decode import decode_book, loads
+from bfrepricer.observability.latency import LatencyRecorder
+
+# Either decoded books or the raw listMarketBook response body
+FetchBooks = Callable[[Sequence[MarketId]], List[dict[str, Any]] | bytes]
+AsyncFetchBooks = Callable[[Sequence[MarketId]], Awaitable[List[dict[str, Any]] | bytes]]
+
+
+@dataclass(frozen=True, slots=True)
+class PollBand:
+    """Poll every `interval` while the off is at most `max_time_to_off` away."""
+    max_time_to_off: timedelta
+    interval: timedelta
+
+
+@dataclass(frozen=True)
+class PollConfig:
+    # Checked in order; the first band whose horizon covers time-to-off wins.
+    # Markets past their scheduled off (late / in-play) use the first band.
+    bands: tuple[PollBand, ...] = (
+        PollBand(timedelta(minutes=5), timedelta(seconds=1)),
+        PollBand(timedelta(minutes=30), timedelta(seconds=3)),
+        PollBand(timedelta(hours=2), timedelta(seconds=15)),
+    )
+    idle_interval: timedelta = timedelta(seconds=60)
+
+    # Exchange request weighting: listMarketBook with EX_BEST_OFFERS costs
+    # 5 points per market and a single request may not exceed 200 points.
+    weight_per_market: int = 5
+    max_weight_per_request: int = 200
+
+    # Global request budget (token bucket) and fetch concurrency
+    max_requests_per_second: float = 5.0
+    max_burst: int = 5
+    max_workers: int = 4
+
+    @property
+    def markets_per_request(self) -> int:
+        return max(1, self.max_weight_per_request // max(1, self.weight_per_market))
+
+
+class PollScheduler:
+    """
+    Polls many markets through batched listMarketBook calls.
+
+    Policies:
+    - Each tracked market has its own cadence derived from time-to-off
+    - Due markets are grouped (most urgent first) into requests that stay
+      under the per-request weight limit
+    - Requests are rate limited by a token bucket; markets that miss the
+      budget stay due and are picked up on the next round
+    - Requests run concurrently on a thread pool, but ticks are handed back
+      on the calling thread only, so a single MarketOrchestrator can consume
+      them without locking (run_async: concurrently on the event loop, with
+      ticks awaited into a consumer)
+    - Markets that close are untracked automatically
+
+    `fetch_books` is blocking for run() / poll_once() and a coroutine
+    function for run_async().
+
+    With a `latency` recorder, each request's round trip is recorded as
+    "fetch" (timed on the worker, recorded on the calling thread) and each
+    book's decode as "decode", per market.
+    """
+
+    def __init__(
+        self,
+        fetch_books: FetchBooks | AsyncFetchBooks,
+        cfg: PollConfig = PollConfig(),
+        *,
+        clock: Clock = SYSTEM_CLOCK,
+        latency: LatencyRecorder | None = None,
+    ) -> None:
+        self._fetch_books = fetch_books
+        self._cfg = cfg
+        self._clock = clock
+        self._latency = latency
+
+        self._start_times: Dict[MarketId, datetime | None] = {}
+        self._next_due: Dict[MarketId, datetime | None] = {}  # None = due now
+        self._seq = itertools.count(1)
+
+        self._tokens: float = float(cfg.max_burst)
+        self._tokens_at: datetime | None = None
+
+        self._pool = ThreadPoolExecutor(max_workers=cfg.max_workers, thread_name_prefix="poll")
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def track(self, market_id: MarketId, start_time: datetime | None = None) -> None:
+        self._start_times[market_id] = start_time
+        self._next_due.setdefault(market_id, None)
+
+    def untrack(self, market_id: MarketId) -> None:
+        self._start_times.pop(market_id, None)
+        self._next_due.pop(market_id, None)
+
+    def tracked_market_ids(self) -> Iterable[MarketId]:
+        return self._start_times.keys()
+
+    def interval_for(self, market_id: MarketId, now: datetime) -> timedelta:
+        start = self._start_times.get(market_id)
+        if start is None:
+            return self._cfg.idle_interval
+
+        to_off = start - now
+        for band in self._cfg.bands:
+            if to_off <= band.max_time_to_off:
+                return band.interval
+        return self._cfg.idle_interval
+
+    def next_wakeup(self, now: datetime) -> datetime | None:
+        return min((t or now for t in self._next_due.values()), default=None)
+
+    def _refill(self, now: datetime) -> None:
+        if self._tokens_at is not None:
+            elapsed = (now - self._tokens_at).total_seconds()
+            if elapsed > 0:
+                self._tokens = min(
+                    float(self._cfg.max_burst),
+                    self._tokens + elapsed * self._cfg.max_requests_per_second,
+                )
+        self._tokens_at = now
+
+    def due_batches(self, now: datetime) -> List[List[MarketId]]:
+        """
+        Returns the requests to send now, most overdue / urgent markets first.
+
+        Consumes request budget and reschedules every market it returns.
+        """
+        self._refill(now)
+
+        due = [m for m, t in self._next_due.items() if t is None or t <= now]
+        if not due:
+            return []
+
+        # Longest overdue first (so budget-deferred markets cannot starve),
+        # then closest to the off; unknown start times last
+        horizon = timedelta(days=365)
+        due.sort(key=lambda m: (self._next_due[m] or now - horizon, self._start_times.get(m) or now + horizon))
+
+        per = self._cfg.markets_per_request
+        batches: List[List[MarketId]] = []
+        for i in range(0, len(due), per):
+            if self._tokens < 1.0:
+                break
+            self._tokens -= 1.0
+            batch = due[i : i + per]
+            for m in batch:
+                self._next_due[m] = now + self.interval_for(m, now)
+            batches.append(batch)
+
+        return batches
+
+    def poll_once(self, now: datetime | None = None) -> List[MarketTick]:
+        now = now or self._clock.now()
+        batches = self.due_batches(now)
+        if not batches:
+            return []
+
+        futures = [self._pool.submit(self._timed_fetch, batch) for batch in batches]
+
+        ticks: List[MarketTick] = []
+        for fut in futures:
+            try:
+                books, fetch_ns = fut.result()
+            except Exception as exc:  # one failed request must not stall the card
+                print(f"poll scheduler: request failed: {exc!r}")
+                continue
+            ticks.extend(self._decode(books, fetch_ns, now))
+
+        return ticks
+
+    def _decode(self, books: List[dict[str, Any]] | bytes, fetch_ns: int, now: datetime) -> List[MarketTick]:
+        lat = self._latency
+        t = 0
+        if lat is not None:
+            lat.record("fetch", fetch_ns)
+            t = perf_counter_ns()
+        if isinstance(books, (bytes, bytearray, memoryview)):
+            books = loads(books)
+        ticks: List[MarketTick] = []
+        for book in books or ():
+            tick = decode_book(book, seq=next(self._seq), publish_time=now)
+            if lat is not None:
+                t = lat.lap("decode", t, tick.market_id)
+            if tick.market_id not in self._start_times:
+                continue
+            if tick.is_closed is True:
+                self.untrack(tick.market_id)
+            ticks.append(tick)
+        return ticks
+
+    def _timed_fetch(self, batch: Sequence[MarketId]) -> Tuple[List[dict[str, Any]] | bytes, int]:
+        t = perf_counter_ns()
+        books = self._fetch_books(batch)  # type: ignore[misc]
+        return books, perf_counter_ns() - t
+
+    async def _timed_fetch_async(self, batch: Sequence[MarketId]) -> Tuple[List[dict[str, Any]] | bytes, int]:
+        t = perf_counter_ns()
+        books = await self._fetch_books(batch)  # type: ignore[misc]
+        return books, perf_counter_ns() - t
+
+    def run(
+        self,
+        on_tick: Callable[[MarketTick], None],
+        *,
+        stop: threading.Event | None = None,
+        min_sleep: float = 0.05,
+    ) -> None:
+        """
+        Poll until `stop` is set or no markets remain tracked.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set() and self._start_times:
+            for tick in self.poll_once():
+                on_tick(tick)
+
+            now = self._clock.now()
+            wake = self.next_wakeup(now)
+            delay = min_sleep
+            if wake is not None:
+                delay = max(min_sleep, (wake - now).total_seconds())
+            self._clock.wait(stop, delay)
+
+    async def run_async(
+        self,
+        put: Callable[[MarketTick], Awaitable[None]],
+        *,
+        stop: asyncio.Event | None = None,
+        min_sleep: float = 0.05,
+    ) -> None:
+        """
+        asyncio form of run(): due batches are fetched concurrently on the
+        running loop (`fetch_books` must be async, e.g.
+        AsyncBetfairClient.list_market_book_raw) instead of the thread pool, and each tick is awaited into `put`, so a
+        consumer that is full holds polling back. Waits for the next due
+        market, returning early once `stop` is set.
+        """
+        stop = stop or asyncio.Event()
+        while not stop.is_set() and self._start_times:
+            now = self._clock.now()
+            batches = self.due_batches(now)
+            if batches:
+                results = await asyncio.gather(
+                    *(self._timed_fetch_async(b) for b in batches), return_exceptions=True
+                )
+                for res in results:
+                    if isinstance(res, BaseException):
+                        if not isinstance(res, Exception):
+                            raise res
+                        print(f"poll scheduler: request failed: {res!r}")
+                        continue
+                    for tick in self._decode(*res, now):
+                        await put(tick)
+
+            now = self._clock.now()
+            wake = self.next_wakeup(now)
+            delay = min_sleep
+            if wake is not None:
+                delay = max(min_sleep, (wake - now).total_seconds())
+            try:
+                await asyncio.wait_for(stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class StubFault(Exception):
+    """Raise from a responder to answer with an APING-style error."""
+
+    def __init__(self, status: int, error_code: str = "UNEXPECTED_ERROR") -> None:
+        super().__init__(error_code)
+        self.status = status
+        self.error_code = error_code
+
+
+Responder = Callable[[str, Dict[str, Any]], Any]
+
+
+class LocalRestServer:
+    """
+    Local plain-HTTP/1.1 stand-in for the betting REST endpoint.
+
+    `responder(operation, params)` produces the JSON result for each call
+    (or raises StubFault). Connections are kept alive, and `connections`
+    counts how many the clients opened, so tests can check reuse.
+
+    Use `url` as RestConfig.url.
+    """
+
+    def __init__(self, responder: Responder, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.responder = responder
+        self.calls: List[Tuple[str, Dict[str, Any], Dict[str, str]]] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/exchange/betting/rest/v1.0/"
+
+    def start(self) -> "LocalRestServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, name="rest-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "LocalRestServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                operation = self.path.rstrip("/").rsplit("/", 1)[-1]
+                params = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with stub._lock:
+                    stub.calls.append((operation, params, dict(self.headers)))
+                try:
+                    status, payload = 200, stub.responder(operation, params)
+                except StubFault as f:
+                    status = f.status
+                    payload = {
+                        "faultcode": "Client",
+                        "faultstring": f.error_code,
+                        "detail": {"APINGException": {"errorCode": f.error_code}},
+                    }
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import itertools
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import Ladder, MarketId, RunnerBook, SelectionId
+from bfrepricer.ingest.betfair_adapter import market_flags
+
+
+class _RunnerCache:
+    """
+    Ladder state for one runner.
+
+    atb/atl are keyed by price (full depth, "price ladder" fields) and are
+    updated in place. batb/batl are keyed by level (best-offers fields,
+    level 0 = best). Size 0 removes the entry in both forms.
+    """
+
+    __slots__ = ("atb", "atl", "batb", "batl")
+
+    def __init__(self) -> None:
+        self.atb = Ladder.back()
+        self.atl = Ladder.lay()
+        self.batb: Dict[int, tuple[float, float]] = {}
+        self.batl: Dict[int, tuple[float, float]] = {}
+
+    def apply(self, rc: dict[str, Any]) -> None:
+        for key in ("atb", "atl"):
+            levels = rc.get(key)
+            if not levels:
+                continue
+            ladder: Ladder = getattr(self, key)
+            for price, size in levels:
+                ladder.update(price, size)
+
+        for key in ("batb", "batl"):
+            levels = rc.get(key)
+            if not levels:
+                continue
+            book: Dict[int, tuple[float, float]] = getattr(self, key)
+            for level, price, size in levels:
+                if size == 0:
+                    book.pop(level, None)
+                else:
+                    book[level] = (price, size)
+
+    def runner_book(self, sel: SelectionId) -> RunnerBook:
+        back = Ladder.back(self.batb.values()) if self.batb else self.atb.copy()
+        lay = Ladder.lay(self.batl.values()) if self.batl else self.atl.copy()
+        return RunnerBook(selection_id=sel, back=back, lay=lay)
+
+
+class _MarketCache:
+    __slots__ = ("status", "in_play", "runners", "removed")
+
+    def __init__(self) -> None:
+        self.status: str | None = None
+        self.in_play: bool | None = None
+        self.runners: Dict[SelectionId, _RunnerCache] = {}
+        # Selections already reported as REMOVED
+        self.removed: Set[SelectionId] = set()
+
+
+class MarketStreamCache:
+    """
+    Incremental market cache for the exchange stream protocol.
+
+    Applies `mcm` (market change) messages:
+    - `img: true` on a market change replaces the cached market
+    - `rc` runner changes are deltas on the cached ladders
+    - `marketDefinition` updates status / in-play; runners it lists as
+      REMOVED are dropped from the cache and reported once in `removed`
+    - `initialClk` / `clk` are retained so a reconnect can resume
+
+    Emits one MarketTick per market that changed in the message. The tick
+    carries only the runners that changed (MarketState merges partial runner
+    updates) plus the market's current status flags.
+    """
+
+    def __init__(self) -> None:
+        self._markets: Dict[MarketId, _MarketCache] = {}
+        self._seq = itertools.count(1)
+        self.initial_clk: str | None = None
+        self.clk: str | None = None
+
+    def market_ids(self) -> List[MarketId]:
+        return list(self._markets)
+
+    def apply(self, msg: dict[str, Any]) -> List[MarketTick]:
+        if msg.get("op") != "mcm":
+            return []
+
+        if msg.get("initialClk"):
+            self.initial_clk = msg["initialClk"]
+        if msg.get("clk"):
+            self.clk = msg["clk"]
+
+        changes = msg.get("mc")
+        if not changes:
+            # heartbeat / empty delta
+            return []
+
+        pt = msg.get("pt")
+        publish_time = (
+            datetime.fromtimestamp(pt / 1000.0, tz=timezone.utc)
+            if pt is not None
+            else datetime.now(timezone.utc)
+        )
+
+        ticks: List[MarketTick] = []
+        for mc in changes:
+            tick = self._apply_market_change(mc, publish_time)
+            if tick is not None:
+                ticks.append(tick)
+        return ticks
+
+    def _apply_market_change(self, mc: dict[str, Any], publish_time: datetime) -> MarketTick | None:
+        market_id = MarketId(str(mc["id"]))
+
+        market = self._markets.get(market_id)
+        if market is None or mc.get("img"):
+            market = _MarketCache()
+            self._markets[market_id] = market
+
+        defn = mc.get("marketDefinition")
+        removed: List[SelectionId] = []
+        if defn:
+            market.status = defn.get("status", market.status)
+            market.in_play = defn.get("inPlay", market.in_play)
+            for rd in defn.get("runners") or ():
+                if rd.get("status") == "REMOVED":
+                    sel = SelectionId(int(rd["id"]))
+                    if sel not in market.removed:
+                        market.removed.add(sel)
+                        market.runners.pop(sel, None)
+                        removed.append(sel)
+
+        changed: List[SelectionId] = []
+        for rc in mc.get("rc") or ():
+            sel = SelectionId(int(rc["id"]))
+            if sel in market.removed:
+                continue
+            runner = market.runners.get(sel)
+            if runner is None:
+                runner = _RunnerCache()
+                market.runners[sel] = runner
+            runner.apply(rc)
+            changed.append(sel)
+
+        if not defn and not changed and not mc.get("img"):
+            return None
+
+        if mc.get("img"):
+            changed = list(market.runners)
+
+        is_market_open, is_in_play, is_closed = market_flags(market.status, market.in_play)
+        if is_closed:
+            del self._markets[market_id]
+
+        runners = tuple(market.runners[sel].runner_book(sel) for sel in dict.fromkeys(changed))
+
+        return MarketTick(
+            market_id=market_id,
+            seq=next(self._seq),
+            publish_time=publish_time,
+            runners=runners,
+            is_market_open=is_market_open,
+            is_in_play=is_in_play,
+            is_closed=is_closed,
+            removed=tuple(removed),
+        )
@@ -1,24 +1,194 @@
-from typing import Iterable
+from __future__ import annotations
+
+import json
+import socket
+import ssl
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Sequence
+
 from bfrepricer.domain.events import MarketTick
 from bfrepricer.domain.types import MarketId
+from bfrepricer.ingest.fast_decode import loads
+from bfrepricer.ingest.stream_cache import MarketStreamCache
+
+CRLF = b"\r\n"
+
+
+class StreamProtocolError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class StreamAuth:
+    app_key: str
+    session_token: str
+
+
+class FrameSplitter:
+    """
+    Splits a byte stream of CRLF-delimited JSON messages into frames.
+
+    Partial messages are buffered until their terminator arrives.
+    """
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        start = max(0, len(self._buf) - 1)  # a terminator may straddle two reads
+        self._buf += data
+        if self._buf.find(CRLF, start) < 0:
+            return []
+
+        parts = bytes(self._buf).split(CRLF)
+        self._buf = bytearray(parts.pop())  # trailing partial (or b"")
+        return [p for p in parts if p]
+
+
+class FrameReader:
+    """Reads decoded JSON frames from a connected socket."""
+
+    def __init__(self, sock: socket.socket, *, bufsize: int = 64 * 1024) -> None:
+        self._sock = sock
+        self._bufsize = bufsize
+        self._splitter = FrameSplitter()
+        self._pending: List[bytes] = []
+
+    def read(self) -> dict[str, Any] | None:
+        """Next frame, or None once the peer has closed the connection."""
+        while not self._pending:
+            data = self._sock.recv(self._bufsize)
+            if not data:
+                return None
+            self._pending.extend(self._splitter.feed(data))
+        return loads(self._pending.pop(0))
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
 
 class StreamingClient:
     """
-    Stub for a streaming client. In production, this would wrap Betfair’s Streaming API.
+    Client for the exchange streaming API.
+
+    Protocol: connect -> `connection` message, send `authentication`,
+    send `marketSubscription`, then consume `mcm` messages which are applied
+    to a MarketStreamCache and surfaced as MarketTicks.
+
+    TLS is on by default; the loopback stand-in server is plain TCP.
     """
-    def __init__(self, auth) -> None:
+
+    def __init__(
+        self,
+        auth: StreamAuth,
+        *,
+        host: str = "stream-api.betfair.com",
+        port: int = 443,
+        use_ssl: bool = True,
+        timeout: float = 30.0,
+    ) -> None:
         self.auth = auth
         self.connected: bool = False
+        self.cache = MarketStreamCache()
+        self.connection_id: str | None = None
+
+        self._host = host
+        self._port = port
+        self._use_ssl = use_ssl
+        self._timeout = timeout
+        self._sock: socket.socket | None = None
+        self._reader: FrameReader | None = None
+        self._op_id = 0
+        self._backlog: List[MarketTick] = []
 
     def connect(self) -> None:
-        """Establish a session with the streaming endpoint."""
+        """Establish and authenticate a session with the streaming endpoint."""
+        sock = socket.create_connection((self._host, self._port), timeout=self._timeout)
+        if self._use_ssl:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self._host)
+
+        self._sock = sock
+        self._reader = FrameReader(sock)
+
+        hello = self._reader.read()
+        if not hello or hello.get("op") != "connection":
+            raise StreamProtocolError(f"expected connection message, got {hello!r}")
+        self.connection_id = hello.get("connectionId")
+
+        self._request({"op": "authentication", "appKey": self.auth.app_key, "session": self.auth.session_token})
         self.connected = True
 
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+        self.connected = False
+
+    def subscribe(
+        self,
+        market_ids: Sequence[MarketId],
+        *,
+        fields: Sequence[str] = ("EX_BEST_OFFERS", "EX_MARKET_DEF"),
+        ladder_levels: int = 3,
+    ) -> None:
+        if not self.connected:
+            raise RuntimeError("Streaming client is not connected.")
+
+        msg: dict[str, Any] = {
+            "op": "marketSubscription",
+            "marketFilter": {"marketIds": list(market_ids)},
+            "marketDataFilter": {"fields": list(fields), "ladderLevels": ladder_levels},
+        }
+        # Resume from the last clocks after a reconnect
+        if self.cache.initial_clk:
+            msg["initialClk"] = self.cache.initial_clk
+        if self.cache.clk:
+            msg["clk"] = self.cache.clk
+        self._request(msg)
+
+    def ticks(self) -> Iterator[MarketTick]:
+        """Yield MarketTicks for changed markets until the connection closes."""
+        assert self._reader is not None
+        while self._backlog:
+            yield self._backlog.pop(0)
+        for frame in self._reader:
+            op = frame.get("op")
+            if op == "status" and frame.get("statusCode") == "FAILURE":
+                raise StreamProtocolError(f"stream failure: {frame.get('errorCode')} {frame.get('errorMessage')}")
+            yield from self.cache.apply(frame)
+        self.connected = False
+
     def subscribe_to_market(self, market_id: MarketId) -> Iterable[MarketTick]:
         """
         Yield MarketTick objects for the given market until unsubscribed.
-        Not implemented here – wiring to the real data source is required.
         """
-        if not self.connected:
-            raise RuntimeError("Streaming client is not connected.")
-        raise NotImplementedError("subscribe_to_market must be implemented by a subclass.")
+        self.subscribe([market_id])
+        return self.ticks()
+
+    def _send(self, msg: dict[str, Any]) -> int:
+        assert self._sock is not None
+        self._op_id += 1
+        msg = {**msg, "id": self._op_id}
+        self._sock.sendall(json.dumps(msg, separators=(",", ":")).encode() + CRLF)
+        return self._op_id
+
+    def _request(self, msg: dict[str, Any]) -> dict[str, Any]:
+        """Send an op and wait for its status response; market data seen meanwhile is queued."""
+        assert self._reader is not None
+        op_id = self._send(msg)
+        while True:
+            frame = self._reader.read()
+            if frame is None:
+                raise StreamProtocolError(f"connection closed awaiting response to {msg['op']}")
+            if frame.get("op") == "status" and frame.get("id") == op_id:
+                if frame.get("statusCode") != "SUCCESS":
+                    raise StreamProtocolError(
+                        f"{msg['op']} failed: {frame.get('errorCode')} {frame.get('errorMessage')}"
+                    )
+                return frame
+            self._backlog.extend(self.cache.apply(frame))
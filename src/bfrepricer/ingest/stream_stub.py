@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+from pathlib import Path
+from typing import Any, List, Sequence
+
+from bfrepricer.ingest.stream_client import CRLF, FrameReader
+
+
+def load_frames(path: str | Path) -> List[dict[str, Any]]:
+    """Load recorded stream frames (one JSON message per line)."""
+    frames: List[dict[str, Any]] = []
+    with open(path, "rb") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                frames.append(json.loads(line))
+    return frames
+
+
+class LoopbackStreamServer:
+    """
+    Local plain-TCP stand-in for the streaming endpoint.
+
+    For each client: sends a `connection` message, accepts authentication
+    and one market subscription (answering with SUCCESS status), then replays
+    the recorded frames and closes the connection.
+
+    `app_key` / `session_token` (if set) must match, otherwise authentication
+    is answered with a FAILURE status. `chunk_size` splits the outgoing byte
+    stream into small writes to exercise frame reassembly on the client.
+    """
+
+    def __init__(
+        self,
+        frames: Sequence[dict[str, Any]],
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        app_key: str | None = None,
+        session_token: str | None = None,
+        chunk_size: int | None = None,
+    ) -> None:
+        self._frames = list(frames)
+        self._app_key = app_key
+        self._session_token = session_token
+        self._chunk_size = chunk_size
+
+        self._listener = socket.create_server((host, port))
+        self._listener.settimeout(0.05)  # lets the accept loop notice stop()
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self.subscriptions: List[dict[str, Any]] = []
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._listener.getsockname()[:2]
+        return host, port
+
+    def start(self) -> "LoopbackStreamServer":
+        self._thread = threading.Thread(target=self._serve, name="stream-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._listener.close()
+
+    def __enter__(self) -> "LoopbackStreamServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def _serve(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                conn, _addr = self._listener.accept()
+            except TimeoutError:
+                continue
+            except OSError:
+                return
+            conn.settimeout(None)
+            with conn:
+                try:
+                    self._handle(conn)
+                except OSError:
+                    pass
+
+    def _send(self, conn: socket.socket, msg: dict[str, Any]) -> None:
+        data = json.dumps(msg, separators=(",", ":")).encode() + CRLF
+        if not self._chunk_size:
+            conn.sendall(data)
+            return
+        for i in range(0, len(data), self._chunk_size):
+            conn.sendall(data[i : i + self._chunk_size])
+
+    def _handle(self, conn: socket.socket) -> None:
+        reader = FrameReader(conn)
+        self._send(conn, {"op": "connection", "connectionId": "stub-001"})
+
+        for frame in reader:
+            op = frame.get("op")
+            if op == "authentication":
+                ok = (self._app_key is None or frame.get("appKey") == self._app_key) and (
+                    self._session_token is None or frame.get("session") == self._session_token
+                )
+                status = {"op": "status", "id": frame.get("id"), "statusCode": "SUCCESS" if ok else "FAILURE"}
+                if not ok:
+                    status.update(errorCode="NO_SESSION", errorMessage="invalid credentials")
+                self._send(conn, status)
+                if not ok:
+                    return
+            elif op == "marketSubscription":
+                self.subscriptions.append(frame)
+                self._send(conn, {"op": "status", "id": frame.get("id"), "statusCode": "SUCCESS"})
+                for msg in self._frames:
+                    self._send(conn, msg)
+                return
+            else:
+                self._send(conn, {"op": "status", "id": frame.get("id"), "statusCode": "SUCCESS"})
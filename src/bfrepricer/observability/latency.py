@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+from typing import Any, Dict, Iterator, Tuple
+
+from bfrepricer.domain.types import MarketId
+
+# 2**6 (_HALF) sub-buckets per power of two: values are kept to within 1/64 (~1.6%)
+_SUB_BITS = 7
+_HALF = 1 << (_SUB_BITS - 1)
+# Largest trackable value, ~18 minutes in ns; anything above is clamped
+_MAX_VALUE = (1 << 40) - 1
+
+
+def _index(value: int) -> int:
+    bucket = value.bit_length() - _SUB_BITS
+    if bucket <= 0:
+        return value
+    return bucket * _HALF + (value >> bucket)
+
+
+def _value_at(index: int) -> int:
+    """Highest value that maps to `index`."""
+    if index < 2 * _HALF:
+        return index
+    bucket = index // _HALF - 1
+    sub = index - bucket * _HALF
+    return ((sub + 1) << bucket) - 1
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of non-negative integer latencies (nanoseconds).
+
+    Buckets are log-linear: exact below 128, then 64 sub-buckets per power
+    of two, so any recorded value is reported to within ~1.6% at every
+    scale. Counts are sparse (only touched buckets take memory), which keeps
+    a histogram per market affordable. record() is a few integer operations
+    and one dict update.
+
+    Single writer: record from one thread; snapshots from others are safe
+    because they copy the counts first.
+    """
+
+    __slots__ = ("_counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        if value < 0:
+            value = 0
+        elif value > _MAX_VALUE:
+            value = _MAX_VALUE
+        i = _index(value)
+        counts = self._counts
+        counts[i] = counts.get(i, 0) + 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if not other.count:
+            return
+        for i, n in dict(other._counts).items():
+            self._counts[i] = self._counts.get(i, 0) + n
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def reset(self) -> None:
+        self._counts.clear()
+        self.count = self.total = self.min = self.max = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def value_at_percentile(self, pct: float) -> int:
+        """Smallest recorded bucket value at or above `pct` percent of samples."""
+        counts = dict(self._counts)
+        n = sum(counts.values())
+        if not n:
+            return 0
+        rank = max(1, -(-n * pct // 100))  # ceil
+        seen = 0
+        for i in sorted(counts):
+            seen += counts[i]
+            if seen >= rank:
+                return min(_value_at(i), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """count plus mean / p50 / p99 / p999 / max in microseconds."""
+        return {
+            "count": self.count,
+            "mean_us": round(self.mean / 1e3, 3),
+            "p50_us": round(self.value_at_percentile(50) / 1e3, 3),
+            "p99_us": round(self.value_at_percentile(99) / 1e3, 3),
+            "p999_us": round(self.value_at_percentile(99.9) / 1e3, 3),
+            "max_us": round(self.max / 1e3, 3),
+        }
+
+
+class LatencyRecorder:
+    """
+    Named latency histograms for the tick pipeline, per stage and
+    (optionally) per stage and market.
+
+    Hot-path use is explicit timestamps rather than context managers:
+
+        t = perf_counter_ns()
+        ...stage...
+        t = rec.lap("apply", t, market_id)
+
+    lap() records now - t and returns now, so consecutive stages chain with
+    one clock read each. `time()` is a context-manager form for code where
+    the extra overhead does not matter.
+    """
+
+    def __init__(self, *, per_market: bool = True) -> None:
+        self._per_market = per_market
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._markets: Dict[Tuple[str, MarketId], LatencyHistogram] = {}
+
+    def record(self, stage: str, ns: int, market_id: MarketId | None = None) -> None:
+        h = self._stages.get(stage)
+        if h is None:
+            h = self._stages[stage] = LatencyHistogram()
+        h.record(ns)
+        if market_id is not None and self._per_market:
+            key = (stage, market_id)
+            hm = self._markets.get(key)
+            if hm is None:
+                hm = self._markets[key] = LatencyHistogram()
+            hm.record(ns)
+
+    def lap(self, stage: str, since: int, market_id: MarketId | None = None) -> int:
+        now = perf_counter_ns()
+        self.record(stage, now - since, market_id)
+        return now
+
+    @contextmanager
+    def time(self, stage: str, market_id: MarketId | None = None) -> Iterator[None]:
+        t = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.lap(stage, t, market_id)
+
+    def histogram(self, stage: str, market_id: MarketId | None = None) -> LatencyHistogram | None:
+        if market_id is None:
+            return self._stages.get(stage)
+        return self._markets.get((stage, market_id))
+
+    def forget(self, market_id: MarketId) -> None:
+        """Drop a market's histograms (closed / evicted), keeping the stage totals."""
+        for key in [k for k in list(self._markets) if k[1] == market_id]:
+            self._markets.pop(key, None)
+
+    def reset(self) -> None:
+        self._stages = {}
+        self._markets = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-ready summaries: {"stages": {stage: ...}, "markets": {market: {stage: ...}}}."""
+        markets: Dict[str, Dict[str, Any]] = {}
+        for (stage, market_id), h in list(self._markets.items()):
+            markets.setdefault(market_id, {})[stage] = h.summary()
+        return {
+            "stages": {stage: h.summary() for stage, h in list(self._stages.items())},
+            "markets": markets,
+        }
+
+    def format(self) -> str:
+        """Per-stage table for logs."""
+        lines = [f"{'stage':<16}{'count':>10}{'p50us':>10}{'p99us':>10}{'p999us':>10}{'maxus':>10}"]
+        for stage, s in self.snapshot()["stages"].items():
+            lines.append(
+                f"{stage:<16}{s['count']:>10}{s['p50_us']:>10.1f}{s['p99_us']:>10.1f}"
+                f"{s['p999_us']:>10.1f}{s['max_us']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+class StatsServer:
+    """
+    Local HTTP endpoint for a LatencyRecorder.
+
+    GET /latency returns the snapshot() JSON; /latency?markets=0 omits the
+    per-market breakdown. Runs on a daemon thread.
+    """
+
+    def __init__(self, recorder: LatencyRecorder, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.recorder = recorder
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/latency"
+
+    def start(self) -> "StatsServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.2}, name="latency-stats", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StatsServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        stats = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                path, _, query = self.path.partition("?")
+                if path.rstrip("/") != "/latency":
+                    self.send_error(404)
+                    return
+                snap = stats.recorder.snapshot()
+                if "markets=0" in query.split("&"):
+                    snap.pop("markets")
+                body = json.dumps(snap).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
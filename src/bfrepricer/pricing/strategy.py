@@ -1,63 +1,164 @@
 from __future__ import annotations
 
+import operator
 from dataclasses import dataclass
-from typing import Sequence
+from typing import Dict
 
+from bfrepricer.domain.regime import MarketRegime
+from bfrepricer.domain.ticks import spread_ticks
+from bfrepricer.domain.types import MarketId, RunnerBook, SelectionId
 from bfrepricer.execution.intent import IntentDecision, OrderIntent, Side
 from bfrepricer.state.market_state import MarketSnapshot
 
 
 @dataclass(frozen=True, slots=True)
 class StrategyConfig:
+    """
+    max_spread_ticks: best lay at most this many ladder ticks above best
+      back (off-ladder prices widen to the enclosing ticks); None to not
+      check. A whole number: 5 ticks is 0.10 in the 2-3 band and scales
+      with the band
+    max_spread: best lay at most this far above best back, in price; the
+      raw check max_spread_ticks used to be. None to not check
+    """
     min_size: float = 2.0
-    max_spread_ticks: float = 0.10  # rough sanity for UK horse odds
+    max_spread: float | None = None
+    max_spread_ticks: int | None = 5
     stake_size: float = 2.0
 
+    def __post_init__(self) -> None:
+        # Before ticks, max_spread_ticks held a price gap (0.10): fail loudly
+        # rather than read such a config as a cap of zero ticks
+        ticks = self.max_spread_ticks
+        if ticks is not None:
+            try:
+                operator.index(ticks)
+            except TypeError:
+                raise ValueError(
+                    f"max_spread_ticks must be a whole number of ticks, got {ticks!r}; use max_spread for a price gap"
+                ) from None
+            if ticks < 1:
+                raise ValueError(f"max_spread_ticks must be >= 1, got {ticks}")
+
+
+class _MarketEval:
+    """Per-market evaluation state: the snapshot last evaluated and per-runner results."""
+
+    __slots__ = ("seq", "regime", "order", "actionable")
+
+    def __init__(self, regime: MarketRegime) -> None:
+        self.seq = -1
+        self.regime = regime
+        # Runner order as first seen (matches snapshot runner order)
+        self.order: Dict[SelectionId, int] = {}
+        # Runners whose book currently yields an intent -> their spread; the
+        # intent itself is only built for the runner picked
+        self.actionable: Dict[SelectionId, float] = {}
+
 
 class TopOfBookMicroStrategy:
     """
-    Pure strategy: reads snapshot, returns intents.
+    Reads snapshots, returns intents.
 
     This is deliberately simple:
     - Only uses best_back / best_lay
     - Only emits a single small intent per tick (for now)
     - Good enough to validate the pipeline end-to-end
+
+    Evaluation is incremental per market. The strategy keeps each runner's
+    last result and, when a snapshot directly follows the one it last saw
+    (`snap.changed_since`), re-evaluates only `snap.changed`. A regime
+    change, a missed snapshot, a snapshot without history (changed_since
+    -1) or a new market triggers a full re-scan, so the decision is always
+    the one a full scan would give.
     """
 
     def __init__(self, config: StrategyConfig = StrategyConfig()) -> None:
         self._cfg = config
+        self._markets: Dict[MarketId, _MarketEval] = {}
 
     def decide(self, snap: MarketSnapshot) -> IntentDecision:
-        intents: list[OrderIntent] = []
+        me = self._markets.get(snap.market_id)
+        if me is None or me.regime != snap.regime or snap.changed_since < 0:
+            me = self._rescan(snap)
+        elif me.seq == snap.last_seq:
+            pass  # same book as last call
+        elif me.seq == snap.changed_since:
+            for sel_id in snap.changed:
+                rb = snap.runners.get(sel_id)
+                if sel_id not in me.order:
+                    me.order[sel_id] = len(me.order)
+                self._update(me, sel_id, rb)
+        else:
+            me = self._rescan(snap)
+        me.seq = snap.last_seq
 
-        # Pick first runner that has both sides of book
-        for sel_id, rb in snap.runners.items():
-            if rb.best_back is None or rb.best_lay is None:
-                continue
-
-            back = rb.best_back
-            lay = rb.best_lay
-
-            # basic sanity checks
-            if back.size < self._cfg.min_size or lay.size < self._cfg.min_size:
-                continue
-
-            spread = lay.price - back.price
-            if spread <= 0 or spread > self._cfg.max_spread_ticks:
-                continue
-
-            # naive "micro" intent: back at best_back (paper-safe)
-            intents.append(
-                OrderIntent(
-                    market_id=snap.market_id,
-                    selection_id=sel_id,
-                    side=Side.BACK,
-                    price=back.price,
-                    size=self._cfg.stake_size,
-                    reason=f"top-of-book back; spread={spread:.3f}",
-                )
-            )
-            break  # single-intent policy for now
+        intents: list[OrderIntent] = []
+        actionable = me.actionable
+        if actionable:
+            # Pick first runner (in book order) that has an intent; with most
+            # runners actionable the walk stops at the first one or two
+            for sel_id in me.order:
+                spread = actionable.get(sel_id)
+                if spread is not None:
+                    # single-intent policy for now
+                    intents.append(self._intent(snap, sel_id, spread))
+                    break
 
         notes = "no actionable intent" if not intents else "ok"
         return IntentDecision(intents=intents, notes=notes)
+
+    def forget(self, market_id: MarketId) -> None:
+        """Drop evaluation state for a market (closed / evicted)."""
+        self._markets.pop(market_id, None)
+
+    def _rescan(self, snap: MarketSnapshot) -> _MarketEval:
+        me = self._markets[snap.market_id] = _MarketEval(snap.regime)
+        for sel_id, rb in snap.runners.items():
+            me.order[sel_id] = len(me.order)
+            self._update(me, sel_id, rb)
+        return me
+
+    def _update(self, me: _MarketEval, sel_id: SelectionId, rb: RunnerBook | None) -> None:
+        spread = self._spread(rb) if rb is not None else None
+        if spread is None:
+            me.actionable.pop(sel_id, None)
+        else:
+            me.actionable[sel_id] = spread
+
+    def _spread(self, rb: RunnerBook) -> float | None:
+        """The runner's spread if its book is actionable (ticks with a tick cap), else None."""
+        # Ladder best_* rather than rb.best_back / best_lay: no PriceSize per check
+        back, lay = rb.back, rb.lay
+        back_price, lay_price = back.best_price, lay.best_price
+        if back_price is None or lay_price is None:
+            return None
+
+        # basic sanity checks
+        cfg = self._cfg
+        if back.best_size < cfg.min_size or lay.best_size < cfg.min_size:
+            return None
+
+        spread = lay_price - back_price
+        if spread <= 0 or (cfg.max_spread is not None and spread > cfg.max_spread):
+            return None
+        if cfg.max_spread_ticks is not None:
+            spread = spread_ticks(back_price, lay_price)
+            if spread > cfg.max_spread_ticks:
+                return None
+        return spread
+
+    def _intent(self, snap: MarketSnapshot, sel_id: SelectionId, spread: float) -> OrderIntent:
+        # naive "micro" intent: back at best_back (paper-safe)
+        if self._cfg.max_spread_ticks is not None:
+            reason = f"top-of-book back; spread={spread} ticks"
+        else:
+            reason = f"top-of-book back; spread={spread:.3f}"
+        return OrderIntent(
+            market_id=snap.market_id,
+            selection_id=sel_id,
+            side=Side.BACK,
+            price=snap.runners[sel_id].back.best_price,
+            size=self._cfg.stake_size,
+            reason=reason,
+        )
@@ -0,0 +1,490 @@
+"""
+Columnar tick archive, partitioned by date and market.
+
+Layout:
+    root/_index.json
+    root/date=YYYY-MM-DD/market=<market id>.bfc
+
+Each .bfc file is a sequence of row groups, appended as the market trades.
+A row group holds up to `row_group_ticks` ticks of one market as flat
+little-endian columns, each starting on an 8-byte boundary so a reader can
+cast slices of a memory-mapped file without copying:
+
+    header (_RG_HEAD): magic | kind | n_ticks | n_runners | n_back | n_lay
+                       | n_removed | first_seq | last_seq | min_time_us
+                       | max_time_us
+    tick columns:   seq (q) | time_us (q) | runner_off (q, n_ticks + 1)
+                    | removed_off (q, n_ticks + 1) | flags (B, padded)
+    runner columns: selection (q) | back_off (q, n_runners + 1)
+                    | lay_off (q, n_runners + 1)
+    removed column: removed selection (q, n_removed)
+    level columns:  back_price | back_size (d, n_back)
+                    | lay_price | lay_size (d, n_lay)
+
+Ladders are stored ascending, as in memory (see tick_log). Flags pack the
+three tri-state market flags two bits each. Withdrawn runners
+(MarketTick.removed) are listed per tick like the runners. A `final` row
+group holds the ClosedMarket snapshot as a single tick.
+
+The sidecar index maps market -> row groups (file, byte offset and length,
+seq and time range), so a query touches only the row groups it needs.
+It is rewritten atomically when a market closes and on flush/close; if it
+is lost or stale, `rebuild_index()` recovers it from the row group headers.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.regime import MarketRegime
+from bfrepricer.domain.types import Ladder, MarketId, RunnerBook, SelectionId
+from bfrepricer.replay.tick_log import _EPOCH, _to_us, _tri, _untri
+from bfrepricer.state.market_state import MarketSnapshot
+from bfrepricer.state.orchestrator import ClosedMarket, EvictedMarket
+
+RG_MAGIC = b"BFR2"  # v1 ("BFRG") row groups had no removed column
+INDEX_NAME = "_index.json"
+INDEX_VERSION = 2
+
+KIND_TICKS = 0
+KIND_FINAL = 1
+_KIND_NAMES = {KIND_TICKS: "ticks", KIND_FINAL: "final"}
+
+_RG_HEAD = struct.Struct("<4sB3xIIIII4xqqqq")
+_SWAP = sys.byteorder != "little"
+
+
+class ArchiveError(RuntimeError):
+    pass
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _body_length(n_ticks: int, n_runners: int, n_back: int, n_lay: int, n_removed: int) -> int:
+    return (
+        8 * (2 * n_ticks + 2 * (n_ticks + 1)) + _pad8(n_ticks)
+        + 8 * (3 * n_runners + 2) + 8 * n_removed + 16 * (n_back + n_lay)
+    )
+
+
+def _le(values: array) -> bytes:
+    if _SWAP:
+        values = values[:]
+        values.byteswap()
+    return values.tobytes()
+
+
+class _Columns:
+    """One market's row group being filled."""
+
+    __slots__ = (
+        "seq", "time_us", "runner_off", "removed_off", "flags", "selection", "back_off", "lay_off",
+        "removed", "back_price", "back_size", "lay_price", "lay_size",
+    )
+
+    def __init__(self) -> None:
+        self.seq = array("q")
+        self.time_us = array("q")
+        self.runner_off = array("q", [0])
+        self.removed_off = array("q", [0])
+        self.flags = array("B")
+        self.selection = array("q")
+        self.back_off = array("q", [0])
+        self.lay_off = array("q", [0])
+        self.removed = array("q")
+        self.back_price = array("d")
+        self.back_size = array("d")
+        self.lay_price = array("d")
+        self.lay_size = array("d")
+
+    def __len__(self) -> int:
+        return len(self.seq)
+
+    def append(
+        self, seq: int, time_us: int, flags: int, runners: Sequence[RunnerBook], removed: Sequence[SelectionId] = ()
+    ) -> None:
+        self.seq.append(seq)
+        self.time_us.append(time_us)
+        self.flags.append(flags)
+        for rb in runners:
+            self.selection.append(rb.selection_id)
+            self.back_price.extend(rb.back.prices)
+            self.back_size.extend(rb.back.sizes)
+            self.lay_price.extend(rb.lay.prices)
+            self.lay_size.extend(rb.lay.sizes)
+            self.back_off.append(len(self.back_price))
+            self.lay_off.append(len(self.lay_price))
+        self.runner_off.append(len(self.selection))
+        self.removed.extend(removed)
+        self.removed_off.append(len(self.removed))
+
+    def encode(self, kind: int) -> bytes:
+        n = len(self.seq)
+        flags = self.flags.tobytes()
+        parts = [
+            _RG_HEAD.pack(
+                RG_MAGIC, kind, n, len(self.selection), len(self.back_price), len(self.lay_price),
+                len(self.removed), self.seq[0], self.seq[-1], min(self.time_us), max(self.time_us),
+            ),
+            _le(self.seq), _le(self.time_us), _le(self.runner_off), _le(self.removed_off),
+            flags + b"\0" * (_pad8(n) - n),
+            _le(self.selection), _le(self.back_off), _le(self.lay_off), _le(self.removed),
+            _le(self.back_price), _le(self.back_size), _le(self.lay_price), _le(self.lay_size),
+        ]
+        return b"".join(parts)
+
+
+def _flags(tick: MarketTick) -> int:
+    return _tri(tick.is_market_open) | (_tri(tick.is_in_play) << 2) | (_tri(tick.is_closed) << 4)
+
+
+class ArchiveWriter:
+    """
+    Writes ticks into the archive.
+
+    Plug in as MarketOrchestrator(sinks=[writer], on_close=[writer.record_closed],
+    on_evict=[writer.record_evicted]): every tick is buffered per market and
+    written as a row group every `row_group_ticks` ticks; when the market
+    closes its remaining ticks and the final snapshot are written and the
+    index is saved. An evicted market's buffered ticks are written and its
+    per-market state dropped, so markets that never close do not keep
+    memory here either.
+
+    Only ticks that advance a market's seq are archived (the ones
+    MarketState would apply); repeats and out-of-order ticks are counted in
+    `skipped`. A market's ticks go to the partition of their publish date.
+    """
+
+    def __init__(self, root: str | Path, *, row_group_ticks: int = 512) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._row_group_ticks = row_group_ticks
+        self._index: Dict[str, List[Dict[str, Any]]] = _load_index(self.root)
+        self._pending: Dict[MarketId, _Columns] = {}
+        self._dates: Dict[MarketId, str] = {}
+        self._last_seq: Dict[MarketId, int] = {}
+        self.count = 0
+        self.skipped = 0
+
+    def record(self, tick: MarketTick) -> None:
+        mid = tick.market_id
+        if tick.seq <= self._last_seq.get(mid, -1):
+            self.skipped += 1
+            return
+        self._last_seq[mid] = tick.seq
+
+        date = tick.publish_time.date().isoformat()
+        cols = self._pending.get(mid)
+        if cols is not None and self._dates[mid] != date:
+            if len(cols):
+                self._write(mid, cols, KIND_TICKS)
+            cols = None
+        if cols is None:
+            cols = self._pending[mid] = _Columns()
+            self._dates[mid] = date
+        cols.append(tick.seq, _to_us(tick.publish_time), _flags(tick), tick.runners, tick.removed)
+        self.count += 1
+        if len(cols) >= self._row_group_ticks:
+            self._write(mid, cols, KIND_TICKS)
+            self._pending[mid] = _Columns()
+
+    def record_closed(self, closed: ClosedMarket) -> None:
+        mid = closed.market_id
+        snap = closed.snapshot
+        cols = self._pending.pop(mid, None)
+        if cols is not None and len(cols):
+            self._write(mid, cols, KIND_TICKS)
+        # The final snapshot goes with the closing tick's date partition
+        self._dates[mid] = snap.last_publish_time.date().isoformat()
+        final = _Columns()
+        final.append(snap.last_seq, _to_us(snap.last_publish_time), _tri(True) << 4, tuple(snap.runners.values()))
+        self._write(mid, final, KIND_FINAL)
+        self._dates.pop(mid, None)
+        self._last_seq.pop(mid, None)
+        self.save_index()
+
+    def record_evicted(self, ev: EvictedMarket) -> None:
+        """
+        on_evict handler: write the market's buffered ticks and forget it.
+
+        The index is saved with the next close or flush. If the market ticks
+        again it starts a new row group; ticks at or below the seq it was
+        evicted at are no longer recognised as repeats.
+        """
+        mid = ev.market_id
+        cols = self._pending.pop(mid, None)
+        if cols is not None and len(cols):
+            self._write(mid, cols, KIND_TICKS)
+        self._dates.pop(mid, None)
+        self._last_seq.pop(mid, None)
+
+    def flush(self) -> None:
+        """Write every buffered tick and save the index."""
+        for mid, cols in list(self._pending.items()):
+            if len(cols):
+                self._write(mid, cols, KIND_TICKS)
+                self._pending[mid] = _Columns()
+        self.save_index()
+
+    def close(self) -> None:
+        self.flush()
+        self._pending.clear()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def save_index(self) -> None:
+        tmp = self.root / (INDEX_NAME + ".tmp")
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "markets": self._index}))
+        os.replace(tmp, self.root / INDEX_NAME)
+
+    def _write(self, mid: MarketId, cols: _Columns, kind: int) -> None:
+        rel = f"date={self._dates[mid]}/market={mid}.bfc"
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = cols.encode(kind)
+        with open(path, "ab") as fh:
+            offset = fh.tell()
+            fh.write(data)
+        self._index.setdefault(mid, []).append(
+            _entry(rel, offset, len(data), kind, len(cols), cols.seq[0], cols.seq[-1], min(cols.time_us), max(cols.time_us))
+        )
+
+
+def _entry(
+    rel: str, offset: int, length: int, kind: int, ticks: int, first_seq: int, last_seq: int, t0: int, t1: int
+) -> Dict[str, Any]:
+    return {
+        "file": rel,
+        "offset": offset,
+        "length": length,
+        "kind": _KIND_NAMES[kind],
+        "ticks": ticks,
+        "seq": [first_seq, last_seq],
+        "time_us": [t0, t1],
+    }
+
+
+def _load_index(root: Path) -> Dict[str, List[Dict[str, Any]]]:
+    try:
+        doc = json.loads((root / INDEX_NAME).read_text())
+    except FileNotFoundError:
+        return {}
+    if doc.get("version") != INDEX_VERSION:
+        raise ArchiveError(f"{root}: unsupported index version {doc.get('version')}")
+    return doc["markets"]
+
+
+def rebuild_index(root: str | Path) -> int:
+    """Re-create the index from the row group headers; returns row groups found."""
+    root = Path(root)
+    index: Dict[str, List[Dict[str, Any]]] = {}
+    n = 0
+    for path in sorted(root.glob("date=*/market=*.bfc")):
+        rel = path.relative_to(root).as_posix()
+        mid = path.stem.removeprefix("market=")
+        data = path.read_bytes()
+        off = 0
+        while off + _RG_HEAD.size <= len(data):
+            magic, kind, nt, nr, nb, nl, nx, s0, s1, t0, t1 = _RG_HEAD.unpack_from(data, off)
+            length = _RG_HEAD.size + _body_length(nt, nr, nb, nl, nx)
+            if magic != RG_MAGIC or off + length > len(data):
+                break  # torn write at the end of the file
+            index.setdefault(mid, []).append(_entry(rel, off, length, kind, nt, s0, s1, t0, t1))
+            off += length
+            n += 1
+    for groups in index.values():
+        groups.sort(key=lambda e: (e["seq"][0], e["kind"] == "final"))
+    tmp = root / (INDEX_NAME + ".tmp")
+    tmp.write_text(json.dumps({"version": INDEX_VERSION, "markets": index}))
+    os.replace(tmp, root / INDEX_NAME)
+    return n
+
+
+class RowGroupView:
+    """
+    Columns of one row group over a memory-mapped file, without copying.
+
+    Integer columns are memoryviews cast to 'q'/'B'; ladders are built per
+    tick on demand.
+    """
+
+    __slots__ = (
+        "market_id", "kind", "seq", "time_us", "runner_off", "removed_off", "flags",
+        "selection", "back_off", "lay_off", "removed", "_buf", "_bp", "_bs", "_lp", "_ls",
+    )
+
+    def __init__(self, market_id: MarketId, buf: memoryview, offset: int) -> None:
+        magic, kind, nt, nr, nb, nl, nx, *_ = _RG_HEAD.unpack_from(buf, offset)
+        if magic != RG_MAGIC:
+            raise ArchiveError(f"{market_id}: no row group at offset {offset}")
+        self.market_id = market_id
+        self.kind = kind
+        self._buf = buf
+        off = offset + _RG_HEAD.size
+        self.seq, off = _ints(buf, off, nt)
+        self.time_us, off = _ints(buf, off, nt)
+        self.runner_off, off = _ints(buf, off, nt + 1)
+        self.removed_off, off = _ints(buf, off, nt + 1)
+        self.flags = buf[off : off + nt]
+        off += _pad8(nt)
+        self.selection, off = _ints(buf, off, nr)
+        self.back_off, off = _ints(buf, off, nr + 1)
+        self.lay_off, off = _ints(buf, off, nr + 1)
+        self.removed, off = _ints(buf, off, nx)
+        self._bp = off
+        self._bs = off + 8 * nb
+        self._lp = self._bs + 8 * nb
+        self._ls = self._lp + 8 * nl
+
+    def __len__(self) -> int:
+        return len(self.seq)
+
+    def span(self, start_us: int | None, end_us: int | None) -> range:
+        """Rows with start_us <= time_us < end_us (times are non-decreasing)."""
+        lo = 0 if start_us is None else bisect.bisect_left(self.time_us, start_us)
+        hi = len(self.seq) if end_us is None else bisect.bisect_left(self.time_us, end_us)
+        return range(lo, max(lo, hi))
+
+    def tick(self, i: int) -> MarketTick:
+        runners = []
+        back_off, lay_off, sel = self.back_off, self.lay_off, self.selection
+        for r in range(self.runner_off[i], self.runner_off[i + 1]):
+            b0, b1, l0, l1 = back_off[r], back_off[r + 1], lay_off[r], lay_off[r + 1]
+            runners.append(
+                RunnerBook(
+                    selection_id=SelectionId(sel[r]),
+                    back=Ladder.from_arrays(True, self._f64(self._bp, b0, b1), self._f64(self._bs, b0, b1)),
+                    lay=Ladder.from_arrays(False, self._f64(self._lp, l0, l1), self._f64(self._ls, l0, l1)),
+                )
+            )
+        flags = self.flags[i]
+        return MarketTick(
+            market_id=self.market_id,
+            seq=self.seq[i],
+            publish_time=_EPOCH + timedelta(microseconds=self.time_us[i]),
+            runners=tuple(runners),
+            is_market_open=_untri(flags & 0b11),
+            is_in_play=_untri((flags >> 2) & 0b11),
+            is_closed=_untri((flags >> 4) & 0b11),
+            removed=tuple(SelectionId(sel) for sel in self.removed[self.removed_off[i] : self.removed_off[i + 1]]),
+        )
+
+    def _f64(self, base: int, a: int, b: int) -> array:
+        values = array("d")
+        values.frombytes(self._buf[base + 8 * a : base + 8 * b])
+        if _SWAP:
+            values.byteswap()
+        return values
+
+
+def _ints(buf: memoryview, off: int, n: int) -> tuple[Sequence[int], int]:
+    end = off + 8 * n
+    if _SWAP:
+        values = array("q")
+        values.frombytes(buf[off:end])
+        values.byteswap()
+        return values, end
+    return buf[off:end].cast("q"), end
+
+
+class TickArchive:
+    """
+    Reads an archive through its index and memory-mapped row groups.
+
+    `read_market()` for one race touches only that market's files, and a
+    time window only the row groups whose range overlaps it.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self._index = _load_index(self.root)
+        self._maps: Dict[str, tuple[mmap.mmap, memoryview]] = {}
+
+    def market_ids(self) -> List[MarketId]:
+        return [MarketId(m) for m in self._index]
+
+    def row_groups(
+        self, market_id: MarketId, start: datetime | None = None, end: datetime | None = None, *, kind: str = "ticks"
+    ) -> Iterator[RowGroupView]:
+        """Row groups of `market_id` overlapping [start, end)."""
+        s = None if start is None else _to_us(start)
+        e = None if end is None else _to_us(end)
+        for entry in self._index.get(market_id, ()):
+            if entry["kind"] != kind:
+                continue
+            t0, t1 = entry["time_us"]
+            if (s is not None and t1 < s) or (e is not None and t0 >= e):
+                continue
+            yield RowGroupView(market_id, self._view(entry["file"]), entry["offset"])
+
+    def read_market(
+        self, market_id: MarketId, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[MarketTick]:
+        """A market's ticks with start <= publish_time < end, in seq order."""
+        s = None if start is None else _to_us(start)
+        e = None if end is None else _to_us(end)
+        for rg in self.row_groups(market_id, start, end):
+            for i in rg.span(s, e):
+                yield rg.tick(i)
+
+    def read_range(
+        self, start: datetime | None = None, end: datetime | None = None, *, market_ids: Sequence[MarketId] | None = None
+    ) -> Iterator[MarketTick]:
+        """Ticks of several markets in a time window, merged by publish time."""
+        mids = self.market_ids() if market_ids is None else market_ids
+        key: Callable[[MarketTick], Any] = lambda t: (t.publish_time, t.seq)
+        return heapq.merge(*(self.read_market(m, start, end) for m in mids), key=key)
+
+    def final_snapshot(self, market_id: MarketId) -> MarketSnapshot | None:
+        """The ClosedMarket snapshot written when the market closed, if any."""
+        for rg in self.row_groups(market_id, kind="final"):
+            tick = rg.tick(0)
+            return MarketSnapshot(
+                market_id=market_id,
+                last_seq=tick.seq,
+                last_publish_time=tick.publish_time,
+                regime=MarketRegime.CLOSED,
+                cooldown_until=None,
+                runners={rb.selection_id: rb for rb in tick.runners},
+            )
+        return None
+
+    def close(self) -> None:
+        for mm, view in self._maps.values():
+            try:
+                view.release()
+                mm.close()
+            except BufferError:  # row group views still alive; freed with them
+                pass
+        self._maps.clear()
+
+    def __enter__(self) -> "TickArchive":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _view(self, rel: str) -> memoryview:
+        cached = self._maps.get(rel)
+        if cached is None:
+            with open(self.root / rel, "rb") as fh:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            cached = self._maps[rel] = (mm, memoryview(mm))
+        return cached[1]
@@ -0,0 +1,185 @@
+"""
+Synthetic race-day market data, for load tests and benchmarks.
+
+A card of markets with staggered offs is polled the way the live runner
+sees it: every market starts with a full snapshot, updates slowly while the
+off is far away and faster as it approaches, with occasional bursts of
+rapid updates (a gamble, a non-runner). At the off each market turns
+in-play and later closes.
+
+Books are listMarketBook-shaped dicts at full depth on the exchange price
+grid, so they exercise the real decode path; `ticks()` decodes them the way
+PollScheduler does. Output is deterministic for a given seed.
+"""
+
+from __future__ import annotations
+
+import heapq
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Tuple
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.ticks import PRICES, ceil_tick
+from bfrepricer.domain.types import MarketId
+from bfrepricer.ingest.fast_decode import decode_book
+
+
+@dataclass(frozen=True)
+class SyntheticLoadConfig:
+    """
+    markets: markets on the card, offs `off_spacing` apart from
+      `first_off`; all are polled from `lead_time` before the first off
+    min_runners / max_runners: field size range (uniform)
+    depth: price levels per side
+    min_interval / max_interval: update interval near / far from the off;
+      in between it is time-to-off * `interval_slope`
+    burst_prob: chance an update starts a burst of `burst_updates` updates
+      `burst_interval` apart
+    move_prob: chance each runner's book changes on an update (a changed
+      runner moves its best price by at most one tick and re-draws sizes)
+    in_play_for: time from the off (in-play book) to the closing book
+    """
+    markets: int = 300
+    min_runners: int = 8
+    max_runners: int = 20
+    depth: int = 10
+    first_off: datetime = datetime(2026, 5, 2, 13, 0, tzinfo=timezone.utc)
+    off_spacing: timedelta = timedelta(minutes=1)
+    lead_time: timedelta = timedelta(hours=1)
+    min_interval: timedelta = timedelta(milliseconds=200)
+    max_interval: timedelta = timedelta(seconds=60)
+    interval_slope: float = 1 / 600
+    burst_prob: float = 0.02
+    burst_updates: int = 10
+    burst_interval: timedelta = timedelta(milliseconds=50)
+    move_prob: float = 0.3
+    in_play_for: timedelta = timedelta(minutes=2)
+    seed: int = 0
+
+
+class _SynthMarket:
+    __slots__ = ("market_id", "off", "idx", "runners", "burst", "phase")
+
+    def __init__(self, market_id: MarketId, off: datetime) -> None:
+        self.market_id = market_id
+        self.off = off
+        self.idx: Dict[int, int] = {}        # selection -> grid index of best back
+        self.runners: Dict[int, Dict[str, Any]] = {}  # selection -> last runner dict
+        self.burst = 0
+        self.phase = "pre"
+
+
+class SyntheticRaceDay:
+    """Deterministic generator of a race day's polled market books."""
+
+    def __init__(self, cfg: SyntheticLoadConfig = SyntheticLoadConfig()) -> None:
+        self.cfg = cfg
+        self.start = cfg.first_off - cfg.lead_time
+        self.start_times: Dict[MarketId, datetime] = {
+            MarketId(f"1.{200_000_000 + i}"): cfg.first_off + i * cfg.off_spacing for i in range(cfg.markets)
+        }
+
+    @property
+    def market_ids(self) -> Tuple[MarketId, ...]:
+        return tuple(self.start_times)
+
+    def books(self) -> Iterator[Tuple[datetime, Dict[str, Any]]]:
+        """(publish_time, listMarketBook dict) in time order, ending when every market has closed."""
+        cfg = self.cfg
+        rng = random.Random(cfg.seed)
+        markets = [_SynthMarket(mid, off) for mid, off in self.start_times.items()]
+        for m in markets:
+            self._field(rng, m)
+
+        # (due, market index); ties resolve by card order
+        heap: List[Tuple[datetime, int]] = [(self.start, i) for i in range(len(markets))]
+        while heap:
+            now, i = heapq.heappop(heap)
+            m = markets[i]
+            if m.phase == "closed":
+                yield now, {"marketId": m.market_id, "status": "CLOSED", "inplay": True, "runners": []}
+                continue
+            if m.phase == "in_play":
+                m.phase = "closed"
+                heapq.heappush(heap, (m.off + cfg.in_play_for, i))
+                yield now, self._book(m, in_play=True)
+                continue
+
+            if now > self.start:
+                self._move(rng, m)
+            yield now, self._book(m, in_play=False)
+            nxt = now + self._interval(rng, m, now)
+            if nxt >= m.off:
+                m.phase = "in_play"
+                nxt = m.off
+            heapq.heappush(heap, (nxt, i))
+
+    def ticks(self) -> Iterator[MarketTick]:
+        """books() decoded into MarketTicks with one global sequence, as PollScheduler does."""
+        for seq, (now, book) in enumerate(self.books(), start=1):
+            yield decode_book(book, seq=seq, publish_time=now)
+
+    # ---- model
+
+    def _interval(self, rng: random.Random, m: _SynthMarket, now: datetime) -> timedelta:
+        cfg = self.cfg
+        if m.burst:
+            m.burst -= 1
+            return cfg.burst_interval
+        if rng.random() < cfg.burst_prob:
+            m.burst = cfg.burst_updates - 1
+            return cfg.burst_interval
+        interval = (m.off - now) * cfg.interval_slope
+        return min(cfg.max_interval, max(cfg.min_interval, interval))
+
+    def _field(self, rng: random.Random, m: _SynthMarket) -> None:
+        cfg = self.cfg
+        n = rng.randint(cfg.min_runners, cfg.max_runners)
+        # Win chances with a realistic favourite / outsider spread, ~110% book
+        weights = [rng.gammavariate(0.8, 1.0) for _ in range(n)]
+        total = sum(weights) / 1.10
+        top = len(PRICES) - cfg.depth - 2
+        for k, w in enumerate(weights):
+            sel = 100_000 + k
+            m.idx[sel] = min(top, max(cfg.depth, ceil_tick(total / w)))
+            m.runners[sel] = self._runner(rng, sel, m.idx[sel])
+
+    def _move(self, rng: random.Random, m: _SynthMarket) -> None:
+        cfg = self.cfg
+        top = len(PRICES) - cfg.depth - 2
+        for sel, idx in m.idx.items():
+            if rng.random() >= cfg.move_prob:
+                continue
+            idx = min(top, max(cfg.depth, idx + rng.choice((-1, 0, 0, 1))))
+            m.idx[sel] = idx
+            m.runners[sel] = self._runner(rng, sel, idx)
+
+    def _runner(self, rng: random.Random, sel: int, idx: int) -> Dict[str, Any]:
+        depth = self.cfg.depth
+        # Usually a one-tick spread, sometimes two
+        lay0 = idx + (2 if rng.random() < 0.2 else 1)
+        return {
+            "selectionId": sel,
+            "status": "ACTIVE",
+            "ex": {
+                "availableToBack": [
+                    {"price": PRICES[idx - k], "size": round(rng.lognormvariate(3.0, 1.0), 2)} for k in range(depth)
+                ],
+                "availableToLay": [
+                    {"price": PRICES[lay0 + k], "size": round(rng.lognormvariate(3.0, 1.0), 2)}
+                    for k in range(depth)
+                    if lay0 + k < len(PRICES)
+                ],
+            },
+        }
+
+    @staticmethod
+    def _book(m: _SynthMarket, *, in_play: bool) -> Dict[str, Any]:
+        return {
+            "marketId": m.market_id,
+            "status": "OPEN",
+            "inplay": in_play,
+            "runners": list(m.runners.values()),
+        }
@@ -0,0 +1,217 @@
+"""
+Compact binary tick log.
+
+File:   MAGIC (4s) | version (B) | reserved (3x) | record*
+Record: length (u32) | payload
+Payload:
+    market_id_len (H) | market_id (utf-8) | seq (q) | publish_time_us (q)
+    | flags (B) | n_runners (H)
+    | per runner: selection_id (q) | n_back (H) | n_lay (H)
+                  | back prices | back sizes | lay prices | lay sizes  (f64 each)
+    [| n_removed (H) | removed selection_ids (q each)]
+
+Ladders are stored ascending (their in-memory order), so they are written
+and read as raw array buffers with no per-level work. Flags pack the
+three tri-state market flags (None / False / True) two bits each; bit 6
+marks a tick with removed runners, whose list trails the runners.
+
+The whole file may be gzip-compressed; readers detect it from the magic.
+"""
+
+from __future__ import annotations
+
+import gzip
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import Ladder, MarketId, RunnerBook, SelectionId
+
+MAGIC = b"BFRT"
+VERSION = 1
+
+_FILE_HEADER = struct.Struct("<4sB3x")
+_LEN = struct.Struct("<I")
+_TICK_HEAD = struct.Struct("<qqBH")
+_RUNNER_HEAD = struct.Struct("<qHH")
+_MID_LEN = struct.Struct("<H")
+_N_REMOVED = struct.Struct("<H")
+_SEL = struct.Struct("<q")
+_HAS_REMOVED = 1 << 6
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_GZIP_MAGIC = b"\x1f\x8b"
+_SWAP = sys.byteorder != "little"
+
+
+class TickLogError(RuntimeError):
+    pass
+
+
+def _tri(v: bool | None) -> int:
+    return 0 if v is None else (2 if v else 1)
+
+
+def _untri(v: int) -> bool | None:
+    return None if v == 0 else v == 2
+
+
+def _to_us(t: datetime) -> int:
+    d = t - _EPOCH
+    return (d.days * 86_400 + d.seconds) * 1_000_000 + d.microseconds
+
+
+def _f64(values: array) -> bytes:
+    if _SWAP:
+        values = values[:]
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_tick(tick: MarketTick) -> bytes:
+    mid = tick.market_id.encode()
+    flags = _tri(tick.is_market_open) | (_tri(tick.is_in_play) << 2) | (_tri(tick.is_closed) << 4)
+    if tick.removed:
+        flags |= _HAS_REMOVED
+    parts = [
+        _MID_LEN.pack(len(mid)),
+        mid,
+        _TICK_HEAD.pack(tick.seq, _to_us(tick.publish_time), flags, len(tick.runners)),
+    ]
+    for rb in tick.runners:
+        parts.append(_RUNNER_HEAD.pack(rb.selection_id, len(rb.back), len(rb.lay)))
+        parts.append(_f64(rb.back.prices))
+        parts.append(_f64(rb.back.sizes))
+        parts.append(_f64(rb.lay.prices))
+        parts.append(_f64(rb.lay.sizes))
+    if tick.removed:
+        parts.append(_N_REMOVED.pack(len(tick.removed)))
+        parts.extend(_SEL.pack(sel) for sel in tick.removed)
+    return b"".join(parts)
+
+
+def _read_f64(buf: memoryview, off: int, n: int) -> tuple[array, int]:
+    end = off + 8 * n
+    values = array("d")
+    values.frombytes(buf[off:end])
+    if _SWAP:
+        values.byteswap()
+    return values, end
+
+
+def decode_tick(payload: bytes | memoryview) -> MarketTick:
+    buf = memoryview(payload)
+    (n,) = _MID_LEN.unpack_from(buf, 0)
+    off = _MID_LEN.size
+    market_id = MarketId(bytes(buf[off : off + n]).decode())
+    off += n
+
+    seq, t_us, flags, n_runners = _TICK_HEAD.unpack_from(buf, off)
+    off += _TICK_HEAD.size
+
+    runners = []
+    for _ in range(n_runners):
+        sel, nb, nl = _RUNNER_HEAD.unpack_from(buf, off)
+        off += _RUNNER_HEAD.size
+        bp, off = _read_f64(buf, off, nb)
+        bs, off = _read_f64(buf, off, nb)
+        lp, off = _read_f64(buf, off, nl)
+        ls, off = _read_f64(buf, off, nl)
+        runners.append(
+            RunnerBook(
+                selection_id=SelectionId(sel),
+                back=Ladder.from_arrays(True, bp, bs),
+                lay=Ladder.from_arrays(False, lp, ls),
+            )
+        )
+
+    removed: tuple[SelectionId, ...] = ()
+    if flags & _HAS_REMOVED:
+        (n_removed,) = _N_REMOVED.unpack_from(buf, off)
+        off += _N_REMOVED.size
+        removed = tuple(SelectionId(sel) for (sel,) in _SEL.iter_unpack(buf[off : off + _SEL.size * n_removed]))
+
+    return MarketTick(
+        market_id=market_id,
+        seq=seq,
+        publish_time=_EPOCH + timedelta(microseconds=t_us),
+        runners=tuple(runners),
+        is_market_open=_untri(flags & 0b11),
+        is_in_play=_untri((flags >> 2) & 0b11),
+        is_closed=_untri((flags >> 4) & 0b11),
+        removed=removed,
+    )
+
+
+class TickRecorder:
+    """
+    Appends every tick to a length-prefixed binary log.
+
+    Plug into MarketOrchestrator(sinks=[recorder]). `compress=True` writes a
+    gzip stream: smaller files, slower replay.
+    """
+
+    def __init__(self, path: str | Path, *, compress: bool = False) -> None:
+        self.path = Path(path)
+        self._fh: BinaryIO = (
+            gzip.open(self.path, "wb", compresslevel=6) if compress else open(self.path, "wb")  # type: ignore[assignment]
+        )
+        self._fh.write(_FILE_HEADER.pack(MAGIC, VERSION))
+        self.count = 0
+
+    def record(self, tick: MarketTick) -> None:
+        payload = encode_tick(tick)
+        self._fh.write(_LEN.pack(len(payload)))
+        self._fh.write(payload)
+        self.count += 1
+
+    def flush(self) -> None:
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "TickRecorder":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _open_log(path: str | Path) -> BinaryIO:
+    with open(path, "rb") as fh:
+        head = fh.read(2)
+    if head == _GZIP_MAGIC:
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    return open(path, "rb", buffering=1 << 20)
+
+
+def read_ticks(path: str | Path) -> Iterator[MarketTick]:
+    """Decode ticks from a log written by TickRecorder, in recorded order."""
+    with _open_log(path) as fh:
+        header = fh.read(_FILE_HEADER.size)
+        if len(header) != _FILE_HEADER.size:
+            raise TickLogError(f"{path}: truncated header")
+        magic, version = _FILE_HEADER.unpack(header)
+        if magic != MAGIC:
+            raise TickLogError(f"{path}: not a tick log")
+        if version != VERSION:
+            raise TickLogError(f"{path}: unsupported version {version}")
+
+        read = fh.read
+        while True:
+            head = read(_LEN.size)
+            if not head:
+                return
+            if len(head) != _LEN.size:
+                raise TickLogError(f"{path}: truncated record header")
+            (n,) = _LEN.unpack(head)
+            payload = read(n)
+            if len(payload) != n:
+                raise TickLogError(f"{path}: truncated record")
+            yield decode_tick(payload)
+
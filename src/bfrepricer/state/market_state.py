@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, Mapping, Set
 
+from bfrepricer.domain.clock import SYSTEM_CLOCK, Clock
 from bfrepricer.domain.events import MarketTick
 from bfrepricer.domain.regime import MarketRegime
-from bfrepricer.domain.types import MarketId, RunnerBook, SelectionId, utc_now
+from bfrepricer.domain.types import MarketId, RunnerBook, SelectionId
 
 
 class StaleMarketData(RuntimeError):
@@ -17,6 +19,10 @@ class OutOfOrderTick(RuntimeError):
     pass
 
 
+class MarketMismatch(ValueError):
+    """A tick applied to the state of a different market."""
+
+
 class UnsafeMarketRegime(RuntimeError):
     pass
 
@@ -28,7 +34,27 @@ class MarketSnapshot:
     last_publish_time: datetime
     regime: MarketRegime
     cooldown_until: datetime | None
-    runners: Dict[SelectionId, RunnerBook]
+    runners: Mapping[SelectionId, RunnerBook]
+    # Selections updated by ticks applied since the previous snapshot, whose
+    # last_seq is `changed_since` (-1: no previous snapshot)
+    changed: frozenset[SelectionId] = frozenset()
+    changed_since: int = -1
+
+    def __reduce__(self):
+        # runners may be a read-only view of live state; pickle a plain copy
+        return (
+            MarketSnapshot,
+            (
+                self.market_id,
+                self.last_seq,
+                self.last_publish_time,
+                self.regime,
+                self.cooldown_until,
+                dict(self.runners),
+                self.changed,
+                self.changed_since,
+            ),
+        )
 
 
 class MarketState:
@@ -40,6 +66,19 @@ class MarketState:
     - Only OPEN may execute, and only after cooldown
     - IN_PLAY is irreversible and permanently disables execution
     - CLOSED is terminal: once closed, we stop mutating runner/regime state
+
+    Snapshots are cached per applied seq and share the runner dict read-only.
+    The dict is copied (copy-on-write) only when a tick mutates runners after
+    a snapshot has handed it out; RunnerBooks themselves are never copied.
+
+    Runners a tick lists as `removed` (non-runners) are deleted from the
+    book, so a market's state holds only the runners still in it.
+
+    Each snapshot carries the selections updated since the previous one
+    (`changed`). With a ChangeFilter upstream, ticks only carry runners whose
+    book actually moved, so this is exactly the set of dirty runners.
+    `changed_since` names the snapshot the set is relative to, so a consumer
+    that missed a snapshot can tell and fall back to a full scan.
     """
 
     def __init__(
@@ -47,19 +86,46 @@ class MarketState:
         market_id: MarketId,
         *,
         reopen_cooldown: timedelta = timedelta(seconds=2),
+        clock: Clock = SYSTEM_CLOCK,
     ) -> None:
         self._market_id = market_id
+        self._clock = clock
         self._last_seq: int = -1
         self._last_publish_time: datetime | None = None
         self._regime: MarketRegime = MarketRegime.UNKNOWN
         self._runners: Dict[SelectionId, RunnerBook] = {}
+        self._runners_shared = False
+        self._changed: Set[SelectionId] = set()
+        self._changed_since = -1
+        self._snapshot: MarketSnapshot | None = None
 
         self._reopen_cooldown = reopen_cooldown
         self._cooldown_until: datetime | None = None
 
+    @classmethod
+    def restore(
+        cls,
+        snap: MarketSnapshot,
+        *,
+        reopen_cooldown: timedelta = timedelta(seconds=2),
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> "MarketState":
+        """
+        Rebuild a state from a snapshot (e.g. one spilled when the market
+        was evicted). The next snapshot has no `changed_since`, so consumers
+        re-scan it.
+        """
+        state = cls(snap.market_id, reopen_cooldown=reopen_cooldown, clock=clock)
+        state._last_seq = snap.last_seq
+        state._last_publish_time = snap.last_publish_time
+        state._regime = snap.regime
+        state._cooldown_until = snap.cooldown_until
+        state._runners = dict(snap.runners)
+        return state
+
     def apply(self, tick: MarketTick) -> None:
         if tick.market_id != self._market_id:
-            raise ValueError("tick market_id mismatch")
+            raise MarketMismatch(f"tick market_id mismatch: {tick.market_id} != {self._market_id}")
 
         if tick.seq == self._last_seq:
             return
@@ -70,6 +136,7 @@ class MarketState:
         # Always advance seq/time for observability even if terminal
         self._last_seq = tick.seq
         self._last_publish_time = tick.publish_time
+        self._snapshot = None
 
         # CLOSED is terminal and irreversible
         if tick.is_closed is True:
@@ -97,14 +164,48 @@ class MarketState:
                 self._regime = MarketRegime.SUSPENDED
 
         # Merge runner updates (only if not terminal)
+        if not tick.runners and not tick.removed:
+            return
+        if self._runners_shared:
+            self._runners = dict(self._runners)
+            self._runners_shared = False
         for rb in tick.runners:
             self._runners[rb.selection_id] = rb
+            self._changed.add(rb.selection_id)
+        # Non-runners are dropped for good; consumers see them as changed
+        # runners that are no longer in the book
+        for sel in tick.removed:
+            if self._runners.pop(sel, None) is not None:
+                self._changed.add(sel)
+
+    def mark_seen(self, publish_time: datetime) -> None:
+        """
+        Record that the market was observed unchanged at `publish_time`.
+
+        Keeps freshness checks satisfied when identical books are dropped
+        before reaching apply(); seq, regime and runners are untouched.
+        """
+        if self._last_publish_time is None or publish_time > self._last_publish_time:
+            self._last_publish_time = publish_time
+            self._snapshot = None
+
+    @property
+    def regime(self) -> MarketRegime:
+        return self._regime
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    @property
+    def last_publish_time(self) -> datetime | None:
+        return self._last_publish_time
 
     def assert_fresh(self, *, max_age: timedelta) -> None:
         if self._last_publish_time is None:
             raise StaleMarketData("no ticks received")
 
-        age = utc_now() - self._last_publish_time
+        age = self._clock.now() - self._last_publish_time
         if age > max_age:
             raise StaleMarketData(f"stale data: {age}")
 
@@ -115,7 +216,7 @@ class MarketState:
         if self._cooldown_until is None:
             return True
 
-        now = now or utc_now()
+        now = now or self._clock.now()
         return now >= self._cooldown_until
 
     def assert_safe_to_execute(self, *, now: datetime | None = None) -> None:
@@ -125,12 +226,21 @@ class MarketState:
             )
 
     def snapshot(self) -> MarketSnapshot:
-        return MarketSnapshot(
+        if self._snapshot is not None:
+            return self._snapshot
+
+        self._runners_shared = True
+        self._snapshot = MarketSnapshot(
             market_id=self._market_id,
             last_seq=self._last_seq,
             last_publish_time=self._last_publish_time
             or datetime.fromtimestamp(0, tz=timezone.utc),
             regime=self._regime,
             cooldown_until=self._cooldown_until,
-            runners=dict(self._runners),
+            runners=MappingProxyType(self._runners),
+            changed=frozenset(self._changed),
+            changed_since=self._changed_since,
         )
+        self._changed.clear()
+        self._changed_since = self._last_seq
+        return self._snapshot
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Protocol, Sequence
 
+from bfrepricer.domain.clock import SYSTEM_CLOCK, Clock
 from bfrepricer.domain.events import MarketTick
 from bfrepricer.domain.regime import MarketRegime
 from bfrepricer.domain.types import MarketId
@@ -15,6 +17,50 @@ class ClosedMarket:
     snapshot: MarketSnapshot
 
 
+@dataclass(frozen=True, slots=True)
+class EvictedMarket:
+    """A market dropped from memory while still live; reason is "idle" or "capacity"."""
+    market_id: MarketId
+    snapshot: MarketSnapshot
+    reason: str
+
+
+class TickSink(Protocol):
+    """Observer fed every tick the orchestrator receives (recording, archiving)."""
+
+    def record(self, tick: MarketTick) -> None: ...
+
+
+class SnapshotStore(Protocol):
+    """Where evicted markets' snapshots go (e.g. state.spill.SnapshotSpill)."""
+
+    def spill(self, snap: MarketSnapshot) -> None: ...
+
+    def load(self, market_id: MarketId) -> MarketSnapshot | None: ...
+
+    def discard(self, market_id: MarketId) -> None: ...
+
+
+@dataclass(frozen=True)
+class LifecycleConfig:
+    """
+    idle_after: markets not ticked (or marked seen) for this long, by the
+      orchestrator clock, are evicted; None keeps them until they close
+    max_markets: hard cap on markets in memory; a new market beyond it
+      evicts the least recently ticked one; None for no cap
+    sweep_every: ticks between idle sweeps
+    """
+    idle_after: timedelta | None = None
+    max_markets: int | None = None
+    sweep_every: int = 1000
+
+    def __post_init__(self) -> None:
+        if self.max_markets is not None and self.max_markets < 1:
+            raise ValueError(f"max_markets must be >= 1, got {self.max_markets}")
+        if self.sweep_every < 1:
+            raise ValueError(f"sweep_every must be >= 1, got {self.sweep_every}")
+
+
 class MarketOrchestrator:
     """
     Owns lifecycle of MarketState objects.
@@ -23,14 +69,55 @@ class MarketOrchestrator:
     - MarketState is created on first tick
     - CLOSED markets are evicted immediately after closure
     - Final snapshot is returned for downstream handling (logging, persistence)
+      and passed to every `on_close` handler (e.g. ArchiveWriter.record_closed)
+    - Sinks see every tick before it is applied, including ticks the state
+      later rejects, so a recording replays the exact input sequence
+
+    Memory stays bounded for markets that never close (abandoned, voided, a
+    missed close tick) through `lifecycle`: markets idle for
+    `idle_after` are evicted every `sweep_every` ticks, and past
+    `max_markets` the least recently ticked market makes room for a new
+    one. Evicted markets go to every `on_evict` handler and, with a
+    `spill` store, their snapshot is written out and restored if the
+    market ticks again. A spilled CLOSED snapshot (SnapshotSpill as an
+    `on_close` handler) makes late ticks for that market no-ops.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        sinks: Sequence[TickSink] = (),
+        on_close: Sequence[Callable[[ClosedMarket], None]] = (),
+        on_evict: Sequence[Callable[[EvictedMarket], None]] = (),
+        lifecycle: LifecycleConfig = LifecycleConfig(),
+        spill: SnapshotStore | None = None,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        # Ordered least recently ticked first when a lifecycle policy is on
         self._markets: Dict[MarketId, MarketState] = {}
+        self._sinks = tuple(sinks)
+        self._on_close = tuple(on_close)
+        self._on_evict: List[Callable[[EvictedMarket], None]] = list(on_evict)
+        self._lifecycle = lifecycle
+        self._lru = lifecycle.idle_after is not None or lifecycle.max_markets is not None
+        self._spill = spill
+        self._clock = clock
+        self._until_sweep = lifecycle.sweep_every
+        self.evicted = 0
+
+    @property
+    def clock(self) -> Clock:
+        return self._clock
 
     def active_market_ids(self) -> Iterable[MarketId]:
         return self._markets.keys()
 
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def add_evict_handler(self, handler: Callable[[EvictedMarket], None]) -> None:
+        self._on_evict.append(handler)
+
     def apply(self, tick: MarketTick) -> ClosedMarket | None:
         """
         Apply a tick to its market.
@@ -39,23 +126,93 @@ class MarketOrchestrator:
             ClosedMarket if this tick caused the market to close,
             otherwise None.
         """
-        state = self._markets.get(tick.market_id)
+        for sink in self._sinks:
+            sink.record(tick)
+
+        mid = tick.market_id
+        state = self._markets.get(mid)
         if state is None:
-            state = MarketState(tick.market_id)
-            self._markets[tick.market_id] = state
+            state = self._create(mid)
+            if state is None:
+                return None  # late tick for a market that closed
+        elif self._lru:
+            self._markets[mid] = self._markets.pop(mid)
 
         state.apply(tick)
 
-        snap = state.snapshot()
-        if snap.regime == MarketRegime.CLOSED:
+        if state.regime == MarketRegime.CLOSED:
             # Evict immediately
-            del self._markets[tick.market_id]
-            return ClosedMarket(
-                market_id=tick.market_id,
-                snapshot=snap,
+            del self._markets[mid]
+            closed = ClosedMarket(
+                market_id=mid,
+                snapshot=state.snapshot(),
             )
+            for handler in self._on_close:
+                handler(closed)
+            return closed
 
+        if self._lifecycle.idle_after is not None:
+            self._until_sweep -= 1
+            if self._until_sweep <= 0:
+                self.evict_idle()
         return None
 
+    def _create(self, market_id: MarketId) -> MarketState | None:
+        state = None
+        if self._spill is not None:
+            snap = self._spill.load(market_id)
+            if snap is not None:
+                if snap.regime == MarketRegime.CLOSED:
+                    return None
+                self._spill.discard(market_id)
+                state = MarketState.restore(snap, clock=self._clock)
+        if state is None:
+            state = MarketState(market_id, clock=self._clock)
+
+        cap = self._lifecycle.max_markets
+        if cap is not None:
+            while self._markets and len(self._markets) >= cap:
+                self._evict(next(iter(self._markets)), "capacity")
+        self._markets[market_id] = state
+        return state
+
+    def _evict(self, market_id: MarketId, reason: str) -> EvictedMarket:
+        state = self._markets.pop(market_id)
+        ev = EvictedMarket(market_id=market_id, snapshot=state.snapshot(), reason=reason)
+        if self._spill is not None:
+            self._spill.spill(ev.snapshot)
+        self.evicted += 1
+        for handler in self._on_evict:
+            handler(ev)
+        return ev
+
+    def evict_idle(self, *, now: datetime | None = None) -> List[EvictedMarket]:
+        """
+        Evict markets idle for `idle_after` (by publish time). Runs from
+        apply() every `sweep_every` ticks; callable directly, e.g. on a
+        timer when ticks may stop altogether.
+        """
+        self._until_sweep = self._lifecycle.sweep_every
+        idle_after = self._lifecycle.idle_after
+        if idle_after is None:
+            return []
+        cutoff = (now or self._clock.now()) - idle_after
+        idle = []
+        # Least recently ticked first: stop at the first market still live
+        for mid, state in self._markets.items():
+            seen = state.last_publish_time
+            if seen is not None and seen > cutoff:
+                break
+            idle.append(mid)
+        return [self._evict(mid, "idle") for mid in idle]
+
+    def mark_seen(self, market_id: MarketId, publish_time: datetime) -> None:
+        """Freshness update for a market whose tick was dropped as unchanged."""
+        state = self._markets.get(market_id)
+        if state is not None:
+            state.mark_seen(publish_time)
+            if self._lru:
+                self._markets[market_id] = self._markets.pop(market_id)
+
     def get(self, market_id: MarketId) -> MarketState | None:
         return self._markets.get(market_id)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, List, Protocol, Sequence, TypeVar
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId
+from bfrepricer.execution.intent import OrderIntent
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.state.market_state import MarketMismatch, OutOfOrderTick
+from bfrepricer.state.orchestrator import ClosedMarket, MarketOrchestrator
+
+R = TypeVar("R")
+
+# How often a blocked collect() checks that the shard processes are alive
+_LIVENESS_POLL_S = 0.5
+
+
+def shard_for(market_id: MarketId, n_shards: int) -> int:
+    """
+    Stable market -> shard mapping.
+
+    crc32 rather than hash(): str hashing is salted per process, and the
+    router and every worker must agree on placement across restarts.
+    """
+    return zlib.crc32(market_id.encode()) % n_shards
+
+
+class ShardWorker(Protocol[R]):
+    def on_tick(self, tick: MarketTick) -> R: ...
+
+
+@dataclass(frozen=True, slots=True)
+class ShardResult:
+    market_id: MarketId
+    seq: int
+    closed: ClosedMarket | None = None
+    intents: tuple[OrderIntent, ...] = ()
+    notes: str = ""
+    error: str = ""  # set if the tick was rejected (e.g. out of order)
+
+
+@dataclass(frozen=True, slots=True)
+class ShardFailure:
+    """A tick whose worker.on_tick raised; the worker keeps running."""
+    market_id: MarketId
+    seq: int
+    error: str
+
+
+class ShardError(RuntimeError):
+    """
+    Raised by collect() when ticks failed in a worker, a shard process died
+    or results timed out. `results` holds what was collected regardless.
+    """
+
+    def __init__(self, message: str, *, failures: Sequence[ShardFailure] = (), results: Sequence[Any] = ()) -> None:
+        super().__init__(message)
+        self.failures = list(failures)
+        self.results = list(results)
+
+
+class StrategyWorker:
+    """
+    Default shard worker: owns the MarketStates of its shard and runs the
+    strategy for every executable market.
+    """
+
+    def __init__(self, strategy_factory: Callable[[], TopOfBookMicroStrategy] = TopOfBookMicroStrategy) -> None:
+        self._orch = MarketOrchestrator()
+        self._strat = strategy_factory()
+
+    def on_tick(self, tick: MarketTick) -> ShardResult:
+        try:
+            closed = self._orch.apply(tick)
+        except (OutOfOrderTick, MarketMismatch) as exc:
+            return ShardResult(market_id=tick.market_id, seq=tick.seq, error=str(exc))
+        if closed is not None:
+            self._strat.forget(tick.market_id)
+            return ShardResult(market_id=tick.market_id, seq=tick.seq, closed=closed)
+
+        state = self._orch.get(tick.market_id)
+        if state is None or not state.can_execute():
+            return ShardResult(market_id=tick.market_id, seq=tick.seq, notes="guard")
+
+        decision = self._strat.decide(state.snapshot())
+        return ShardResult(
+            market_id=tick.market_id,
+            seq=tick.seq,
+            intents=tuple(decision.intents),
+            notes=decision.notes,
+        )
+
+
+def _shard_main(worker_factory: Callable[[], ShardWorker[Any]], inbox: Any, outbox: Any) -> None:
+    worker = worker_factory()
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            return
+        results: List[Any] = []
+        for t in batch:
+            # One bad tick must not take the shard down (collect() would wait
+            # for its results forever)
+            try:
+                results.append(worker.on_tick(t))
+            except Exception as exc:
+                results.append(ShardFailure(t.market_id, t.seq, f"{type(exc).__name__}: {exc}"))
+        outbox.put(results)
+
+
+class ShardedOrchestrator(Generic[R]):
+    """
+    Hash-partitions markets across N worker processes.
+
+    Each worker builds its own state (MarketOrchestrator, strategy, ...) via
+    `worker_factory`, so a market's ticks are always applied by the same
+    process and shards never share state. The parent routes ticks to shards
+    in batches (one queue message per batch amortises pickling and IPC) and
+    collects one result per tick.
+
+    Ordering: results for a given market come back in submission order;
+    results for different shards interleave arbitrarily.
+
+    Failures: a tick whose worker raises is reported by collect() as a
+    ShardError (after every in-flight batch has been received), and so is a
+    shard process that dies or results that take longer than
+    `result_timeout` seconds.
+
+    `worker_factory` must be picklable (a top-level callable or
+    functools.partial) when the spawn start method is used.
+    """
+
+    def __init__(
+        self,
+        n_shards: int,
+        worker_factory: Callable[[], ShardWorker[R]] = StrategyWorker,  # type: ignore[assignment]
+        *,
+        batch_size: int = 256,
+        result_timeout: float = 60.0,
+        mp_context: Any = None,
+    ) -> None:
+        if n_shards < 1:
+            raise ValueError("n_shards must be >= 1")
+        ctx = mp_context or mp.get_context()
+
+        self._n = n_shards
+        self._batch_size = batch_size
+        self._result_timeout = result_timeout
+        self._inboxes = [ctx.Queue() for _ in range(n_shards)]
+        self._outbox = ctx.Queue()
+        self._buffers: List[List[MarketTick]] = [[] for _ in range(n_shards)]
+        self._in_flight = 0  # batches sent but not yet collected
+        self._procs = [
+            ctx.Process(
+                target=_shard_main,
+                args=(worker_factory, self._inboxes[i], self._outbox),
+                name=f"shard-{i}",
+                daemon=True,
+            )
+            for i in range(n_shards)
+        ]
+        for p in self._procs:
+            p.start()
+
+    @property
+    def n_shards(self) -> int:
+        return self._n
+
+    def submit(self, tick: MarketTick) -> None:
+        i = shard_for(tick.market_id, self._n)
+        buf = self._buffers[i]
+        buf.append(tick)
+        if len(buf) >= self._batch_size:
+            self._send(i)
+
+    def flush(self) -> None:
+        for i in range(self._n):
+            if self._buffers[i]:
+                self._send(i)
+
+    def collect(self, *, block: bool = True, timeout: float | None = None) -> List[R]:
+        """
+        Results for every batch sent so far (flushes pending ticks first).
+        With block=False, returns only what is already available. `timeout`
+        (default: `result_timeout`) bounds the wait for each batch.
+
+        Raises ShardError if any tick failed in its worker, a shard process
+        died, or a batch timed out.
+        """
+        self.flush()
+        timeout = self._result_timeout if timeout is None else timeout
+        out: List[R] = []
+        failures: List[ShardFailure] = []
+        while self._in_flight:
+            if not block and self._outbox.empty():
+                break
+            batch = self._get(timeout, out, failures)
+            self._in_flight -= 1
+            for r in batch:
+                if isinstance(r, ShardFailure):
+                    failures.append(r)
+                else:
+                    out.append(r)
+        if failures:
+            raise ShardError(
+                f"{len(failures)} tick(s) failed in shard workers: {failures[0].error}",
+                failures=failures,
+                results=out,
+            )
+        return out
+
+    def _get(self, timeout: float, out: List[R], failures: List[ShardFailure]) -> List[Any]:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._outbox.get(timeout=max(0.0, min(_LIVENESS_POLL_S, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+            dead = [p.name for p in self._procs if not p.is_alive()]
+            if dead:
+                raise ShardError(f"shard process(es) died: {', '.join(dead)}", failures=failures, results=out)
+            if time.monotonic() >= deadline:
+                raise ShardError(f"no shard results within {timeout}s", failures=failures, results=out)
+
+    def apply_many(self, ticks: Sequence[MarketTick]) -> List[R]:
+        for t in ticks:
+            self.submit(t)
+        return self.collect()
+
+    def close(self) -> None:
+        for q in self._inboxes:
+            q.put(None)
+        for p in self._procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+
+    def __enter__(self) -> "ShardedOrchestrator[R]":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _send(self, i: int) -> None:
+        self._inboxes[i].put(self._buffers[i])
+        self._buffers[i] = []
+        self._in_flight += 1
@@ -0,0 +1,107 @@
+"""
+On-disk store for snapshots of markets dropped from memory.
+
+MarketOrchestrator spills a market's final snapshot here when it evicts the
+market (idle, or over its cap) and restores the state from it if the market
+ticks again, so eviction costs disk, not correctness. As an `on_close`
+handler it also keeps closed markets' final snapshots, which stops a late
+tick for a closed market from re-creating its state. Those are only needed
+while late ticks can still arrive: with `closed_ttl` they are deleted that
+many seconds after the close, and `prune()` clears whatever a previous run
+left behind.
+
+One pickle file per market under `root`; writes go through a temporary
+file and a rename, so a crash never leaves a partial snapshot behind.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import time
+from pathlib import Path
+from collections import deque
+from typing import Deque, Iterator, Tuple
+
+from bfrepricer.domain.types import MarketId
+from bfrepricer.state.market_state import MarketSnapshot
+from bfrepricer.state.orchestrator import ClosedMarket
+
+_SUFFIX = ".snap"
+
+
+class SnapshotSpill:
+    def __init__(self, root: str | Path, *, closed_ttl: float | None = None) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._closed_ttl = closed_ttl
+        # (expiry time, market) of closed snapshots, oldest first
+        self._closed: Deque[Tuple[float, MarketId]] = deque()
+        self.spilled = 0
+        self.restored = 0
+        self.expired = 0
+
+    def _path(self, market_id: MarketId) -> Path:
+        return self.root / f"{market_id}{_SUFFIX}"
+
+    def spill(self, snap: MarketSnapshot) -> None:
+        path = self._path(snap.market_id)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(snap, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.spilled += 1
+
+    def record_closed(self, closed: ClosedMarket) -> None:
+        """on_close handler form of spill(); also expires older closed snapshots."""
+        self.expire_closed()
+        self.spill(closed.snapshot)
+        if self._closed_ttl is not None:
+            self._closed.append((time.time() + self._closed_ttl, closed.market_id))
+
+    def expire_closed(self, *, now: float | None = None) -> int:
+        """
+        Delete closed snapshots older than `closed_ttl`; returns how many.
+        Runs on every close; callable directly, e.g. on a timer when
+        markets stop closing.
+        """
+        now = time.time() if now is None else now
+        n = 0
+        while self._closed and self._closed[0][0] <= now:
+            _, market_id = self._closed.popleft()
+            self.discard(market_id)
+            n += 1
+        self.expired += n
+        return n
+
+    def __contains__(self, market_id: object) -> bool:
+        return isinstance(market_id, str) and self._path(MarketId(market_id)).exists()
+
+    def load(self, market_id: MarketId) -> MarketSnapshot | None:
+        try:
+            with open(self._path(market_id), "rb") as f:
+                snap = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        self.restored += 1
+        return snap
+
+    def discard(self, market_id: MarketId) -> None:
+        self._path(market_id).unlink(missing_ok=True)
+
+    def market_ids(self) -> Iterator[MarketId]:
+        for path in self.root.glob(f"*{_SUFFIX}"):
+            yield MarketId(path.name[: -len(_SUFFIX)])
+
+    def prune(self, older_than: float) -> int:
+        """Delete snapshots spilled more than `older_than` seconds ago; returns how many."""
+        cutoff = time.time() - older_than
+        n = 0
+        for path in self.root.glob(f"*{_SUFFIX}"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    n += 1
+            except FileNotFoundError:
+                pass
+        return n
@@ -0,0 +1,101 @@
+import itertools
+from datetime import datetime, timedelta, timezone
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.regime import MarketRegime
+from bfrepricer.domain.types import Ladder, MarketId, RunnerBook, SelectionId
+from bfrepricer.replay.archive import INDEX_NAME, ArchiveWriter, TickArchive, rebuild_index
+from bfrepricer.replay.synthetic import SyntheticLoadConfig, SyntheticRaceDay
+from bfrepricer.state.orchestrator import LifecycleConfig, MarketOrchestrator
+
+T0 = datetime(2026, 5, 2, 23, 59, 58, tzinfo=timezone.utc)
+MID = MarketId("1.234")
+
+
+def mk_tick(seq, secs, **flags):
+    rb = RunnerBook(
+        selection_id=SelectionId(11),
+        back=Ladder.back([(2.0, 10.0 + seq), (1.99, 5.5)]),
+        lay=Ladder.lay([(2.02, 12.0)]),
+    )
+    empty = RunnerBook(SelectionId(22), None, None)
+    flags.setdefault("is_market_open", True)
+    return MarketTick(MID, seq, T0 + timedelta(seconds=secs), (rb, empty), **flags)
+
+
+def test_roundtrip_across_row_groups_and_date_partitions(tmp_path):
+    ticks = [mk_tick(seq, seq) for seq in range(1, 8)]  # crosses midnight at seq 2 -> 3
+    ticks[4] = mk_tick(5, 5, removed=(SelectionId(33), SelectionId(44)))
+    closing = mk_tick(8, 9, is_market_open=False, is_closed=True)
+
+    with ArchiveWriter(tmp_path, row_group_ticks=2) as writer:
+        orch = MarketOrchestrator(sinks=[writer], on_close=[writer.record_closed])
+        for t in ticks:
+            orch.apply(t)
+        orch.apply(ticks[-1])  # repeat: not archived
+        orch.apply(closing)
+
+    assert writer.skipped == 1
+    assert sorted(p.parent.name for p in tmp_path.glob("date=*/*.bfc")) == ["date=2026-05-02", "date=2026-05-03"]
+
+    with TickArchive(tmp_path) as archive:
+        assert archive.market_ids() == [MID]
+        assert list(archive.read_market(MID)) == ticks + [closing]
+
+        window = list(archive.read_market(MID, T0 + timedelta(seconds=3), T0 + timedelta(seconds=6)))
+        assert [t.seq for t in window] == [3, 4, 5]
+        # Only the overlapping row groups are opened
+        assert len(list(archive.row_groups(MID, T0 + timedelta(seconds=3), T0 + timedelta(seconds=6)))) == 2
+
+        final = archive.final_snapshot(MID)
+        assert final.regime is MarketRegime.CLOSED and final.last_seq == 8
+        assert final.runners[SelectionId(11)].back == ticks[-1].runners[0].back
+
+
+def test_index_is_rebuilt_from_row_group_headers(tmp_path):
+    with ArchiveWriter(tmp_path, row_group_ticks=3) as writer:
+        for seq in range(1, 8):
+            writer.record(mk_tick(seq, seq))
+    expected = list(TickArchive(tmp_path).read_market(MID))
+
+    (tmp_path / INDEX_NAME).unlink()
+    with open(next(tmp_path.glob("date=2026-05-03/*.bfc")), "ab") as fh:
+        fh.write(b"BFRG\0torn")
+    assert rebuild_index(tmp_path) == 3  # 1-2 | 3-5 | 6-7
+
+    assert list(TickArchive(tmp_path).read_market(MID)) == expected
+
+
+def test_synthetic_card_reads_back_per_market_and_merged(tmp_path):
+    day = SyntheticRaceDay(SyntheticLoadConfig(markets=5, lead_time=timedelta(minutes=2), depth=3))
+    ticks = list(itertools.islice(day.ticks(), 400))
+
+    with ArchiveWriter(tmp_path, row_group_ticks=16) as writer:
+        for t in ticks:
+            writer.record(t)
+
+    mid = day.market_ids[0]
+    with TickArchive(tmp_path) as archive:
+        assert list(archive.read_market(mid)) == [t for t in ticks if t.market_id == mid]
+        merged = list(archive.read_range())
+        assert sorted(t.seq for t in merged) == [t.seq for t in ticks]
+        assert all(a.publish_time <= b.publish_time for a, b in zip(merged, merged[1:]))
+
+
+def test_evicted_markets_are_written_and_forgotten(tmp_path):
+    with ArchiveWriter(tmp_path) as writer:
+        orch = MarketOrchestrator(
+            lifecycle=LifecycleConfig(max_markets=1),
+            sinks=[writer],
+            on_evict=[writer.record_evicted],
+        )
+        orch.apply(mk_tick(1, 0))
+        orch.apply(mk_tick(2, 1))
+        orch.apply(MarketTick(MarketId("1.9"), 1, T0, ()))  # evicts MID
+
+        assert MID not in writer._pending and MID not in writer._last_seq and MID not in writer._dates
+        orch.apply(mk_tick(3, 1))  # back again: a new row group
+
+    with TickArchive(tmp_path) as archive:
+        assert [t.seq for t in archive.read_market(MID)] == [1, 2, 3]
+        assert len(list(archive.row_groups(MID))) == 2
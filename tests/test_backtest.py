@@ -0,0 +1,169 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bfrepricer.app.pipeline import TradingPipeline  # noqa: E402
+from bfrepricer.backtest.columns import TickColumns  # noqa: E402
+from bfrepricer.backtest.engine import entry_candidates, run_backtest  # noqa: E402
+from bfrepricer.backtest.sweep import SweepTable, Uniform, grid, make_point, random_search, run_sweep  # noqa: E402
+from bfrepricer.domain.clock import SimulatedClock  # noqa: E402
+from bfrepricer.domain.events import MarketTick  # noqa: E402
+from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId  # noqa: E402
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig  # noqa: E402
+from bfrepricer.execution.mark_to_market import mark_to_market  # noqa: E402
+from bfrepricer.execution.risk import RiskConfig, RiskGate  # noqa: E402
+from bfrepricer.pricing.strategy import StrategyConfig, TopOfBookMicroStrategy  # noqa: E402
+from bfrepricer.replay.driver import replay  # noqa: E402
+from bfrepricer.state.orchestrator import MarketOrchestrator  # noqa: E402
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+
+
+def random_day(seed, n_markets=3, n_ticks=200, n_runners=5):
+    rnd = random.Random(seed)
+    mids = [MarketId(f"1.{i}") for i in range(n_markets)]
+    mid_px = {(m, s): rnd.uniform(1.5, 6.0) for m in mids for s in range(n_runners)}
+    ticks, seq = [], 0
+    for k in range(n_ticks):
+        for m in mids:
+            seq += 1
+            runners = []
+            for s in range(n_runners):
+                if k and rnd.random() < 0.5:
+                    continue  # partial update
+                mid_px[m, s] = max(1.05, mid_px[m, s] + rnd.choice([-0.04, -0.02, 0.0, 0.02, 0.04]))
+                back = round(mid_px[m, s], 2)
+                lay = round(back + rnd.choice([0.01, 0.02, 0.04, 0.2]), 2)
+                runners.append(
+                    RunnerBook(
+                        SelectionId(s),
+                        PriceSize(back, rnd.choice([1.0, 3.0, 10.0])),
+                        PriceSize(lay, rnd.choice([1.0, 3.0, 10.0])) if rnd.random() > 0.05 else None,
+                    )
+                )
+            flags = {"is_market_open": rnd.random() > 0.05}
+            if k == n_ticks - 1 and m == mids[0]:
+                flags = {"is_closed": True}
+            ticks.append(MarketTick(m, seq, T0 + timedelta(seconds=0.7 * k), tuple(runners), **flags))
+    return ticks
+
+
+def pipeline_pnl(ticks, cols, sc, cc, rc):
+    clock = SimulatedClock()
+    p = TradingPipeline(
+        orch=MarketOrchestrator(clock=clock),
+        strat=TopOfBookMicroStrategy(sc),
+        close_rule=CloseRule(cc),
+        risk=RiskGate(rc),
+    )
+    replay(ticks, p, clock=clock)
+
+    last_row = {}
+    for i in range(len(cols)):
+        last_row[cols.market_ids[cols.market[i]], int(cols.selection[i])] = i
+
+    realized = unrealized = 0.0
+    for (m, s), pos in p.engine.positions.items():
+        realized += pos.realized_pnl
+        lay = cols.lay_price[last_row[m, s]]
+        unrealized += mark_to_market(pos, best_back=None, best_lay=None if math.isnan(lay) else PriceSize(lay, 1.0))
+    return realized, unrealized
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize(
+    "sc,cc,rc",
+    [
+        (StrategyConfig(), CloseRuleConfig(), RiskConfig()),
+        (StrategyConfig(min_size=3.0, max_spread=0.05), CloseRuleConfig(0.06, 0.04), RiskConfig(max_abs_pos_per_market=4.0)),
+        (StrategyConfig(max_spread=0.10, max_spread_ticks=None), CloseRuleConfig(take_profit_ticks=3, stop_loss_ticks=2), RiskConfig()),
+        (StrategyConfig(), CloseRuleConfig(stop_loss_delta=0.05, take_profit_ticks=4), RiskConfig(max_abs_pos_per_market=4.0)),
+        (StrategyConfig(stake_size=5.0), CloseRuleConfig(0.2, 0.02), RiskConfig(max_order_size=3.0, max_abs_pos_per_market=6.0)),
+    ],
+)
+def test_backtest_matches_pipeline_replay(seed, sc, cc, rc):
+    ticks = random_day(seed)
+    cols = TickColumns.from_ticks(ticks)
+
+    res = run_backtest(cols, sc, cc, rc)
+    realized, unrealized = pipeline_pnl(ticks, cols, sc, cc, rc)
+
+    assert res.n_trades > 0
+    assert res.realized_pnl == pytest.approx(realized, abs=1e-9)
+    assert res.unrealized_pnl == pytest.approx(unrealized, abs=1e-9)
+    assert sum(res.pnl_by_market().values()) == pytest.approx(res.total_pnl)
+
+
+def test_columns_expand_snapshots_and_candidates_pick_first_runner():
+    book = (
+        RunnerBook(SelectionId(1), PriceSize(2.0, 10.0), PriceSize(2.02, 10.0)),
+        RunnerBook(SelectionId(2), PriceSize(3.0, 10.0), PriceSize(3.05, 10.0)),
+    )
+    ticks = [
+        MarketTick(MarketId("1.1"), 1, T0, book, is_market_open=True),
+        MarketTick(MarketId("1.1"), 2, T0 + timedelta(seconds=5), (), is_market_open=True),
+    ]
+    cols = TickColumns.from_ticks(ticks)
+
+    assert len(cols) == 4
+    assert cols.tradable.tolist() == [False, False, True, True]  # reopen cooldown
+    assert entry_candidates(cols, StrategyConfig()).tolist() == [False, False, True, False]
+
+
+def test_oversized_stake_trades_nothing():
+    cols = TickColumns.from_ticks(random_day(0, n_ticks=20))
+    res = run_backtest(cols, StrategyConfig(stake_size=5.0), risk=RiskConfig(max_order_size=5.0, max_abs_pos_per_selection=4.0))
+    assert res.n_trades == 0
+    assert res.total_pnl == 0.0
+
+
+def test_grid_and_random_search_build_configs():
+    points = list(grid({"strategy.stake_size": [1.0, 2.0], "close.take_profit_delta": [0.1, 0.2, 0.3]}))
+    assert len(points) == 6
+    assert points[1].strategy.stake_size == 1.0 and points[1].close.take_profit_delta == 0.2
+    assert points[1].params == (("strategy.stake_size", 1.0), ("close.take_profit_delta", 0.2))
+
+    rnd = list(random_search({"risk.max_abs_pos_per_market": Uniform(2.0, 4.0)}, 5, seed=1))
+    assert len(rnd) == 5
+    assert all(2.0 <= p.risk.max_abs_pos_per_market <= 4.0 for p in rnd)
+
+    with pytest.raises(ValueError):
+        make_point({"close.no_such_field": 1.0})
+    with pytest.raises(ValueError):
+        list(grid({"engine.size": [1.0]}))
+
+
+def test_columns_round_trip_through_memory_maps(tmp_path):
+    cols = TickColumns.from_ticks(random_day(0, n_ticks=30))
+    loaded = TickColumns.load(cols.save(tmp_path))
+
+    assert loaded.market_ids == cols.market_ids
+    assert isinstance(loaded.back_price, np.memmap)
+    np.testing.assert_array_equal(loaded.lay_price, cols.lay_price)
+    np.testing.assert_array_equal(loaded.tradable, cols.tradable)
+
+
+def test_process_pool_sweep_matches_direct_backtests(tmp_path):
+    cols = TickColumns.from_ticks(random_day(1, n_ticks=80))
+    cols.save(tmp_path)
+    points = list(grid({"close.take_profit_delta": [0.02, 0.06, 0.2], "risk.max_abs_pos_per_market": [2.0, 30.0]}))
+
+    table = SweepTable()
+    for r in run_sweep(tmp_path, points, max_workers=2, chunksize=2):
+        table.add(r)
+
+    assert sorted(r.index for r in table.ranked()) == list(range(len(points)))
+    for r in table.ranked():
+        p = points[r.index]
+        expected = run_backtest(cols, p.strategy, p.close, p.risk)
+        assert r.n_trades == expected.n_trades
+        assert r.total_pnl == pytest.approx(expected.total_pnl)
+
+    totals = [r.total_pnl for r in table.ranked()]
+    assert totals == sorted(totals, reverse=True)
+    assert "close.take_profit_delta=" in table.format(top=3)
+    assert len(table.format(top=3).splitlines()) == 4
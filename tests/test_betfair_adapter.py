@@ -46,3 +46,37 @@ def test_inplay_true_maps_to_is_in_play():
     book = {"marketId": "1.234", "status": "OPEN", "inplay": True, "runners": []}
     tick = market_tick_from_book(book, seq=4)
     assert tick.is_in_play is True
+
+
+def test_full_depth_ladder_is_kept():
+    book = {
+        "marketId": "1.234",
+        "status": "OPEN",
+        "runners": [
+            {
+                "selectionId": 11,
+                "ex": {
+                    "availableToBack": [{"price": 2.0, "size": 10.0}, {"price": 1.99, "size": 5.0}],
+                    "availableToLay": [{"price": 2.02, "size": 12.0}, {"price": 2.04, "size": 3.0}],
+                },
+            }
+        ],
+    }
+
+    rb = market_tick_from_book(book, seq=1).runners[0]
+    assert [(ps.price, ps.size) for ps in rb.back.levels()] == [(2.0, 10.0), (1.99, 5.0)]
+    assert [(ps.price, ps.size) for ps in rb.lay.levels()] == [(2.02, 12.0), (2.04, 3.0)]
+
+
+def test_removed_runner_is_reported_not_booked():
+    book = {
+        "marketId": "1.234",
+        "status": "OPEN",
+        "runners": [
+            {"selectionId": 11, "status": "ACTIVE", "ex": {"availableToBack": [{"price": 2.0, "size": 10.0}]}},
+            {"selectionId": 22, "status": "REMOVED", "ex": {}},
+        ],
+    }
+    tick = market_tick_from_book(book, seq=1)
+    assert [rb.selection_id for rb in tick.runners] == [11]
+    assert tick.removed == (22,)
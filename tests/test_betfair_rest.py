@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from bfrepricer.domain.types import MarketId
+from bfrepricer.ingest.betfair_rest import AsyncBetfairClient, BetfairApiError, BetfairClient, RestConfig
+from bfrepricer.ingest.poll_scheduler import PollConfig, PollScheduler
+from bfrepricer.ingest.rest_stub import LocalRestServer, StubFault
+
+
+def books(op, params):
+    return [{"marketId": m, "status": "OPEN", "runners": []} for m in params["marketIds"]]
+
+
+def cfg(server, **kw):
+    kw.setdefault("backoff_base", 0.001)
+    return RestConfig(url=server.url, **kw)
+
+
+def test_sync_client_reuses_one_keep_alive_connection():
+    with LocalRestServer(books) as server, BetfairClient("app", "tok", cfg(server)) as bf:
+        for i in range(10):
+            assert bf.list_market_book([f"1.{i}"])[0]["marketId"] == f"1.{i}"
+
+    assert server.connections == 1
+    op, params, headers = server.calls[0]
+    assert op == "listMarketBook"
+    assert params["priceProjection"] == {"priceData": ["EX_BEST_OFFERS"]}
+    assert headers["X-Application"] == "app" and headers["X-Authentication"] == "tok"
+
+
+def test_identical_in_flight_calls_are_coalesced():
+    def slow(op, params):
+        time.sleep(0.1)
+        return books(op, params)
+
+    async def go(server):
+        client = AsyncBetfairClient("app", "tok", cfg(server))
+        same = [client.list_market_book(["1.1", "1.2"]) for _ in range(5)]
+        results = await asyncio.gather(*same, client.list_market_book(["1.3"]))
+        await client.aclose()
+        return client, results
+
+    with LocalRestServer(slow) as server:
+        client, results = asyncio.run(go(server))
+
+    assert len(server.calls) == 2
+    assert client.coalesced == 4
+    assert all(r == results[0] for r in results[:5])
+    assert results[5][0]["marketId"] == "1.3"
+
+
+def test_concurrency_is_bounded_by_the_pool():
+    lock = threading.Lock()
+    active = peak = 0
+
+    def tracked(op, params):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return books(op, params)
+
+    async def go(server):
+        client = AsyncBetfairClient("app", "tok", cfg(server, max_connections=2))
+        await asyncio.gather(*(client.list_market_book([f"1.{i}"]) for i in range(6)))
+        await client.aclose()
+
+    with LocalRestServer(tracked) as server:
+        asyncio.run(go(server))
+
+    assert len(server.calls) == 6
+    assert peak == 2
+    assert server.connections == 2
+
+
+def test_transient_errors_are_retried_and_permanent_ones_are_not():
+    failures = iter([StubFault(503, "SERVICE_BUSY"), StubFault(500)])
+
+    def flaky(op, params):
+        if op == "listMarketCatalogue":
+            raise StubFault(400, "INVALID_INPUT_DATA")
+        fault = next(failures, None)
+        if fault:
+            raise fault
+        return books(op, params)
+
+    with LocalRestServer(flaky) as server, BetfairClient("app", "tok", cfg(server)) as bf:
+        assert bf.list_market_book(["1.1"])[0]["marketId"] == "1.1"
+        assert bf.client.retries == 2
+
+        with pytest.raises(BetfairApiError) as err:
+            bf.list_market_catalogue(filter={}, max_results=10)
+        assert err.value.error_code == "INVALID_INPUT_DATA"
+        assert not err.value.retryable
+        assert bf.client.retries == 2
+
+
+def test_exhausted_retry_budget_fails_fast():
+    def down(op, params):
+        raise StubFault(503, "SERVICE_BUSY")
+
+    with LocalRestServer(down) as server, BetfairClient(
+        "app", "tok", cfg(server, max_attempts=5, retry_budget_ratio=0.0, retry_budget_min=3)
+    ) as bf:
+        for _ in range(3):
+            with pytest.raises(BetfairApiError):
+                bf.list_market_book(["1.1"])
+
+    # 3 tokens in the budget: first call retries 3 times, later calls once each
+    assert len(server.calls) == 4 + 1 + 1
+    assert bf.client.budget.available < 1
+
+
+def test_poll_scheduler_fetches_through_the_client():
+    with LocalRestServer(books) as server, BetfairClient("app", "tok", cfg(server)) as bf:
+        sched = PollScheduler(bf.list_market_book_raw, PollConfig())
+        for i in range(3):
+            sched.track(MarketId(f"1.{i}"))
+        try:
+            ticks = sched.poll_once()
+        finally:
+            sched.close()
+
+    assert [t.market_id for t in ticks] == ["1.0", "1.1", "1.2"]
+    assert server.connections == 1
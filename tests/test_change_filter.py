@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta, timezone
+
+from bfrepricer.app.pipeline import TradingPipeline
+from bfrepricer.domain.clock import SimulatedClock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+from bfrepricer.ingest.change_filter import ChangeFilter
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.state.market_state import MarketState
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+MID = MarketId("1.1")
+
+
+def rb(sel, back, lay):
+    return RunnerBook(SelectionId(sel), PriceSize(back, 10.0), PriceSize(lay, 12.0))
+
+
+def mk_tick(seq, secs, runners, **flags):
+    flags.setdefault("is_market_open", True)
+    return MarketTick(MID, seq, T0 + timedelta(seconds=secs), tuple(runners), **flags)
+
+
+def test_identical_book_is_dropped_and_partial_change_is_trimmed():
+    f = ChangeFilter()
+    first = mk_tick(1, 0, [rb(11, 2.0, 2.02), rb(22, 5.0, 5.2)])
+    assert f.filter(first) is first
+
+    # New objects, same content
+    assert f.filter(mk_tick(2, 1, [rb(11, 2.0, 2.02), rb(22, 5.0, 5.2)])) is None
+
+    out = f.filter(mk_tick(3, 2, [rb(11, 2.0, 2.02), rb(22, 5.1, 5.2)]))
+    assert out is not None and out.seq == 3
+    assert [r.selection_id for r in out.runners] == [22]
+    assert (f.passed, f.dropped) == (2, 1)
+
+
+def test_flag_change_passes_and_close_and_stale_seq_always_pass():
+    f = ChangeFilter()
+    f.filter(mk_tick(1, 0, [rb(11, 2.0, 2.02)]))
+
+    suspended = f.filter(mk_tick(2, 1, [rb(11, 2.0, 2.02)], is_market_open=False))
+    assert suspended is not None and suspended.runners == ()
+
+    stale = mk_tick(2, 2, [rb(11, 2.0, 2.02)], is_market_open=False)
+    assert f.filter(stale) is stale
+
+    closing = mk_tick(3, 3, [rb(11, 2.0, 2.02)], is_market_open=False, is_closed=True)
+    assert f.filter(closing) is closing
+    # Market forgotten on close: the next tick is treated as new
+    assert f.filter(mk_tick(4, 4, [rb(11, 2.0, 2.02)])) is not None
+
+
+def test_state_reports_changed_selections_per_snapshot():
+    orch = MarketOrchestrator()
+    orch.apply(mk_tick(1, 0, [rb(11, 2.0, 2.02), rb(22, 5.0, 5.2)]))
+    state = orch.get(MID)
+    assert state.snapshot().changed == {11, 22}
+
+    orch.apply(mk_tick(2, 1, [rb(22, 5.1, 5.2)]))
+    orch.apply(mk_tick(3, 2, []))
+    assert state.snapshot().changed == {22}
+    assert state.snapshot().changed == {22}  # cached per seq
+
+    orch.mark_seen(MID, T0 + timedelta(seconds=5))
+    snap = state.snapshot()
+    assert snap.changed == frozenset()
+    assert snap.last_seq == 3
+    assert snap.last_publish_time == T0 + timedelta(seconds=5)
+
+
+def test_pipeline_skips_unchanged_ticks_but_acts_when_cooldown_expires():
+    clock = SimulatedClock(T0)
+    p = TradingPipeline(
+        orch=MarketOrchestrator(clock=clock),
+        strat=TopOfBookMicroStrategy(),
+        close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.1, stop_loss_delta=0.1)),
+        risk=RiskGate(RiskConfig()),
+        change_filter=ChangeFilter(),
+    )
+
+    def step(seq, secs):
+        t = mk_tick(seq, secs, [rb(11, 2.0, 2.02)])
+        return p.on_tick(t, now=clock.advance_to(t.publish_time))
+
+    assert step(1, 0).blocked           # opens, reopen cooldown
+    assert step(2, 1).unchanged         # same book, still cooling down
+    out = step(3, 3)                    # same book, cooldown over: evaluated
+    assert not out.unchanged and len(out.intents) == 1
+    assert step(4, 4).unchanged
+    assert p.orch.get(MID).snapshot().last_publish_time == T0 + timedelta(seconds=4)
+
+
+def test_withdrawn_runner_passes_once_and_leaves_the_book():
+    f = ChangeFilter()
+    state = MarketState(MID)
+    for t in (
+        mk_tick(1, 0, [rb(11, 2.0, 2.02), rb(22, 5.0, 5.2)]),
+        mk_tick(2, 1, [rb(11, 2.0, 2.02)], removed=(SelectionId(22),)),
+    ):
+        state.apply(f.filter(t))
+    snap = state.snapshot()
+    assert set(snap.runners) == {11}
+    assert snap.changed == {11, 22}
+
+    # Every later poll still lists the non-runner: nothing new
+    assert f.filter(mk_tick(3, 2, [rb(11, 2.0, 2.02)], removed=(SelectionId(22),))) is None
+
+
+def test_unchanged_book_after_a_fill_still_runs_the_close_rule():
+    def run(change_filter):
+        clock = SimulatedClock(T0)
+        p = TradingPipeline(
+            orch=MarketOrchestrator(clock=clock),
+            strat=TopOfBookMicroStrategy(),
+            close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.02)),
+            risk=RiskGate(RiskConfig()),
+            change_filter=change_filter,
+        )
+        outs = []
+        for seq, secs in enumerate([3, 4, 5, 6], start=1):
+            t = mk_tick(seq, secs, [rb(11, 2.0, 2.02)])
+            outs.append(p.on_tick(t, now=clock.advance_to(t.publish_time + timedelta(seconds=3))))
+        return [(len(o.intents), len(o.close_intents)) for o in outs]
+
+    # The take profit fires on the first repeat either way; the filtered
+    # pipeline does not re-enter on a book it has already traded
+    assert run(None) == [(1, 0), (0, 1), (1, 0), (0, 1)]
+    assert run(ChangeFilter()) == [(1, 0), (0, 1), (0, 0), (0, 0)]
@@ -0,0 +1,65 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bfrepricer.domain.clock import SimulatedClock, SteppedClock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId, RunnerBook, SelectionId
+from bfrepricer.state.market_state import MarketState, StaleMarketData
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+
+
+def tick(mid, seq, t, is_open=True):
+    return MarketTick(mid, seq, t, (RunnerBook(SelectionId(1), None, None),), is_market_open=is_open)
+
+
+def test_simulated_clock_moves_only_forward():
+    clock = SimulatedClock(T0)
+    clock.sleep(2.5)
+    assert clock.now() == T0 + timedelta(seconds=2.5)
+    assert clock.monotonic() == 2.5
+    assert clock.advance_to(T0) == T0 + timedelta(seconds=2.5)
+    with pytest.raises(ValueError):
+        clock.set(T0)
+
+    stop = threading.Event()
+    assert clock.wait(stop, 1.0) is False
+    stop.set()
+    assert clock.wait(stop, 1.0) is True
+    assert clock.now() == T0 + timedelta(seconds=3.5)
+
+
+def test_stepped_clock_advances_per_read():
+    clock = SteppedClock(T0, step=timedelta(milliseconds=10))
+    assert clock.now() == T0
+    assert clock.now() == T0 + timedelta(milliseconds=10)
+
+
+def test_cooldown_and_freshness_follow_injected_clock():
+    clock = SimulatedClock(T0)
+    mid = MarketId("1.1")
+    s = MarketState(mid, reopen_cooldown=timedelta(seconds=2), clock=clock)
+
+    s.apply(tick(mid, 1, clock.now()))
+    assert s.can_execute() is False
+    s.assert_fresh(max_age=timedelta(seconds=5))
+
+    clock.advance(2)
+    assert s.can_execute() is True
+
+    clock.advance(10)
+    with pytest.raises(StaleMarketData):
+        s.assert_fresh(max_age=timedelta(seconds=5))
+
+
+def test_orchestrator_passes_clock_to_new_states():
+    clock = SimulatedClock(T0)
+    orch = MarketOrchestrator(clock=clock)
+    mid = MarketId("1.1")
+    orch.apply(tick(mid, 1, clock.now()))
+    assert orch.get(mid).can_execute() is False
+    clock.advance(5)
+    assert orch.get(mid).can_execute() is True
@@ -43,3 +43,43 @@ def test_take_profit_closes_short():
     assert len(intents) == 1
     assert intents[0].side.value == "BACK"
     assert intents[0].size == 2.0
+
+
+def test_selections_restrict_the_check():
+    rule = CloseRule(CloseRuleConfig(take_profit_delta=0.1, stop_loss_delta=0.1))
+    mid = MarketId("1.1")
+
+    positions = {
+        (mid, SelectionId(11)): Position(size=2.0, avg_price=3.0, realized_pnl=0.0),
+        (mid, SelectionId(22)): Position(size=2.0, avg_price=3.0, realized_pnl=0.0),
+        (MarketId("1.2"), SelectionId(11)): Position(size=2.0, avg_price=3.0, realized_pnl=0.0),
+    }
+    runners = {
+        sel: RunnerBook(selection_id=sel, best_back=PriceSize(3.08, 10), best_lay=PriceSize(3.12, 10))
+        for sel in (SelectionId(11), SelectionId(22))
+    }
+
+    assert len(rule.decide_closes(market_id=mid, runners=runners, positions=positions)) == 2
+    intents = rule.decide_closes(market_id=mid, runners=runners, positions=positions, selections={SelectionId(22)})
+    assert [i.selection_id for i in intents] == [22]
+    assert rule.decide_closes(market_id=mid, runners=runners, positions=positions, selections=set()) == []
+
+
+def test_tick_thresholds_scale_with_the_ladder():
+    rule = CloseRule(CloseRuleConfig(take_profit_ticks=2, stop_loss_ticks=3))
+    mid = MarketId("1.1")
+    sel = SelectionId(11)
+
+    def closes(avg, lay):
+        positions = {(mid, sel): Position(size=2.0, avg_price=avg, realized_pnl=0.0)}
+        runners = {sel: RunnerBook(selection_id=sel, best_back=PriceSize(lay - 0.01, 10), best_lay=PriceSize(lay, 10))}
+        return [i.reason for i in rule.decide_closes(market_id=mid, runners=runners, positions=positions)]
+
+    # +0.04 is two ticks at 2.0 but less than one at 4.0; +0.2 is two ticks at 4.0
+    assert closes(2.0, 2.04) == ["close_rule: take_profit edge=0.040 (2 ticks)"]
+    assert closes(4.0, 4.04) == []
+    assert closes(4.0, 4.2) == ["close_rule: take_profit edge=0.200 (2 ticks)"]
+    assert closes(4.0, 3.85) == ["close_rule: stop_loss edge=-0.150 (-3 ticks)"]
+    # An off-ladder average entry counts from its nearest tick
+    assert closes(2.013, 2.04) == []
+    assert closes(2.013, 2.06) == ["close_rule: take_profit edge=0.047 (2 ticks)"]
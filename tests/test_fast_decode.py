@@ -0,0 +1,67 @@
+import itertools
+import json
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from bfrepricer.ingest.betfair_adapter import market_tick_from_book
+from bfrepricer.ingest.fast_decode import decode_book, decode_market_books
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+
+
+def recorded_books(seed, n_markets=20):
+    rnd = random.Random(seed)
+    books = []
+    for i in range(n_markets):
+        runners = []
+        for s in range(rnd.randint(0, 12)):
+            mid = rnd.uniform(1.5, 30.0)
+            atb = [{"price": round(mid - 0.1 * k, 2), "size": round(rnd.uniform(0.5, 900), 2)} for k in range(rnd.randint(0, 3))]
+            atl = [{"price": round(mid + 0.1 * (k + 1), 2), "size": round(rnd.uniform(0.5, 900), 2)} for k in range(rnd.randint(0, 3))]
+            runner = {"selectionId": 1000 + s, "handicap": 0.0, "status": "REMOVED" if rnd.random() < 0.05 else "ACTIVE", "ex": {"availableToBack": atb, "availableToLay": atl, "tradedVolume": []}}
+            if rnd.random() < 0.05:
+                del runner["ex"]
+            runners.append(runner)
+        books.append(
+            {
+                "marketId": f"1.{200 + i}",
+                "status": rnd.choice(["OPEN", "OPEN", "OPEN", "SUSPENDED", "CLOSED", "INACTIVE"]),
+                "inplay": rnd.random() < 0.3,
+                "betDelay": 0,
+                "runners": runners,
+            }
+        )
+    return books
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_raw_decode_matches_adapter(seed):
+    books = recorded_books(seed)
+    raw = json.dumps(books).encode()
+
+    fast = decode_market_books(raw, seqs=itertools.count(1), publish_time=T0)
+    slow = [market_tick_from_book(b, seq=n, publish_time=T0) for n, b in enumerate(books, 1)]
+
+    assert fast == slow
+
+
+@pytest.mark.parametrize(
+    "atb,atl",
+    [
+        # unordered, duplicated, zero-size and integer levels take the general path
+        ([{"price": 2.0, "size": 5}, {"price": 2.2, "size": 1}], [{"price": 2.5, "size": 3}, {"price": 2.4, "size": 2}]),
+        ([{"price": 2.0, "size": 5}, {"price": 2.0, "size": 7}], [{"price": 3, "size": 0}, {"price": 4, "size": 1}]),
+        ([{"price": "2.0", "size": "5"}], []),
+    ],
+)
+def test_irregular_ladders_decode_like_adapter(atb, atl):
+    book = {"marketId": "1.1", "status": "OPEN", "runners": [{"selectionId": 7, "ex": {"availableToBack": atb, "availableToLay": atl}}]}
+    assert decode_book(book, seq=1, publish_time=T0) == market_tick_from_book(book, seq=1, publish_time=T0)
+
+
+def test_invalid_prices_are_rejected_in_bulk():
+    book = {"marketId": "1.1", "status": "OPEN", "runners": [{"selectionId": 7, "ex": {"availableToBack": [{"price": 1.0, "size": 2.0}]}}]}
+    with pytest.raises(ValueError):
+        decode_book(book, seq=1)
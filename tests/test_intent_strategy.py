@@ -1,5 +1,7 @@
 from datetime import timedelta, timezone, datetime
 
+import pytest
+
 from bfrepricer.domain.regime import MarketRegime
 from bfrepricer.domain.types import MarketId, SelectionId, PriceSize, RunnerBook
 from bfrepricer.execution.intent import Side
@@ -28,7 +30,7 @@ def snapshot_with_runner(back_p, back_s, lay_p, lay_s):
 
 def test_emits_intent_when_book_is_sane():
     snap = snapshot_with_runner(2.0, 10.0, 2.02, 12.0)
-    strat = TopOfBookMicroStrategy(StrategyConfig(min_size=2.0, max_spread_ticks=0.10, stake_size=2.0))
+    strat = TopOfBookMicroStrategy(StrategyConfig(min_size=2.0, stake_size=2.0))
     decision = strat.decide(snap)
     assert len(decision.intents) == 1
     intent = decision.intents[0]
@@ -36,13 +38,37 @@ def test_emits_intent_when_book_is_sane():
     assert intent.side == Side.BACK
     assert intent.price == 2.0
     assert intent.size == 2.0
+    assert intent.reason == "top-of-book back; spread=1 ticks"
+
+    raw = StrategyConfig(max_spread=0.10, max_spread_ticks=None)
+    assert TopOfBookMicroStrategy(raw).decide(snap).intents[0].reason == "top-of-book back; spread=0.020"
 
 
 def test_no_intent_when_spread_too_wide():
     snap = snapshot_with_runner(2.0, 10.0, 2.5, 12.0)
-    strat = TopOfBookMicroStrategy(StrategyConfig(max_spread_ticks=0.10))
+    strat = TopOfBookMicroStrategy(StrategyConfig())
     decision = strat.decide(snap)
     assert len(decision.intents) == 0
+    assert len(TopOfBookMicroStrategy(StrategyConfig(max_spread=0.10, max_spread_ticks=None)).decide(snap).intents) == 0
+    assert len(TopOfBookMicroStrategy(StrategyConfig(max_spread_ticks=10)).decide(snap).intents) == 0
+    assert len(TopOfBookMicroStrategy(StrategyConfig(max_spread_ticks=25)).decide(snap).intents) == 1
+
+
+@pytest.mark.parametrize("ticks", [0.10, 2.0, 0])
+def test_tick_cap_rejects_price_gaps_and_empty_caps(ticks):
+    with pytest.raises(ValueError, match="max_spread_ticks"):
+        StrategyConfig(max_spread_ticks=ticks)
+
+
+def test_spread_counts_ladder_ticks_and_widens_off_ladder_prices():
+    # 4.0 -> 4.1 is one tick; an off-ladder 4.05 lay counts as 4.1
+    for lay in (4.1, 4.05):
+        snap = snapshot_with_runner(4.0, 10.0, lay, 12.0)
+        decision = TopOfBookMicroStrategy(StrategyConfig(max_spread_ticks=1)).decide(snap)
+        assert decision.intents[0].reason == "top-of-book back; spread=1 ticks"
+    # 4.0 -> 4.2 is two ticks (the same raw gap is ten ticks at 2.0)
+    snap = snapshot_with_runner(4.0, 10.0, 4.2, 12.0)
+    assert len(TopOfBookMicroStrategy(StrategyConfig(max_spread_ticks=1)).decide(snap).intents) == 0
 
 
 def test_no_intent_when_sizes_too_small():
@@ -50,3 +76,38 @@ def test_no_intent_when_sizes_too_small():
     strat = TopOfBookMicroStrategy(StrategyConfig(min_size=2.0))
     decision = strat.decide(snap)
     assert len(decision.intents) == 0
+
+
+def test_incremental_decide_matches_full_scan():
+    from bfrepricer.domain.events import MarketTick
+    from bfrepricer.state.market_state import MarketState
+
+    mid = MarketId("1.1")
+    t0 = datetime.now(timezone.utc)
+
+    def rb(sel, back, lay):
+        return RunnerBook(selection_id=SelectionId(sel), best_back=PriceSize(back, 10.0), best_lay=PriceSize(lay, 10.0))
+
+    state = MarketState(mid)
+    incremental = TopOfBookMicroStrategy()
+    steps = [
+        (rb(11, 2.0, 2.5), rb(22, 3.0, 3.05), rb(33, 4.0, 4.05)),  # 22 actionable
+        (rb(22, 3.0, 3.5),),                                        # 22 widens -> 33
+        (rb(11, 2.0, 2.02),),                                       # 11 tightens -> 11
+        (rb(11, 2.0, 2.5), rb(33, 4.0, 4.5)),                       # nothing actionable
+        (rb(44, 6.0, 6.1),),                                        # new runner
+    ]
+    for seq, runners in enumerate(steps, start=1):
+        state.apply(MarketTick(mid, seq, t0, runners, is_market_open=True))
+        snap = state.snapshot()
+        assert snap.changed == {r.selection_id for r in runners}
+        got = incremental.decide(snap)
+        want = TopOfBookMicroStrategy().decide(snap)
+        assert [i.selection_id for i in got.intents] == [i.selection_id for i in want.intents]
+        assert got.notes == want.notes
+
+    # A missed snapshot falls back to a full re-scan
+    state.apply(MarketTick(mid, 6, t0, (rb(22, 3.0, 3.05),)))
+    state.snapshot()
+    state.apply(MarketTick(mid, 7, t0, (rb(44, 6.0, 6.5),)))
+    assert [i.selection_id for i in incremental.decide(state.snapshot()).intents] == [22]
@@ -0,0 +1,75 @@
+import pickle
+
+import pytest
+
+from bfrepricer.domain.types import Ladder, PriceSize, RunnerBook, SelectionId
+
+
+def test_back_best_is_highest_and_lay_best_is_lowest():
+    back = Ladder.back([(1.99, 5.0), (2.0, 10.0), (1.98, 1.0)])
+    lay = Ladder.lay([(2.04, 3.0), (2.02, 12.0)])
+
+    assert back.best() == PriceSize(2.0, 10.0)
+    assert lay.best() == PriceSize(2.02, 12.0)
+    assert [ps.price for ps in back.levels()] == [2.0, 1.99, 1.98]
+    assert [ps.price for ps in lay.levels(depth=1)] == [2.02]
+
+
+def test_update_inserts_replaces_and_removes_levels():
+    back = Ladder.back([(2.0, 10.0)])
+    back.update(2.02, 4.0)
+    assert back.best_price == 2.02
+    back.update(2.02, 6.0)
+    assert back.best_size == 6.0
+    assert len(back) == 2
+    back.update(2.02, 0)
+    assert back.best() == PriceSize(2.0, 10.0)
+    back.update(9.9, 0)  # removing a missing level is a no-op
+    assert len(back) == 1
+    assert back.size_at(2.0) == 10.0
+    assert back.size_at(3.0) == 0.0
+
+
+def test_invalid_levels_are_rejected():
+    with pytest.raises(ValueError):
+        Ladder.back([(1.0, 2.0)])
+    with pytest.raises(ValueError):
+        Ladder.lay([(2.0, -1.0)])
+    with pytest.raises(ValueError):
+        Ladder.lay().update(2.0, -1.0)
+
+
+def test_copy_is_independent():
+    lay = Ladder.lay([(2.02, 12.0)])
+    snap = lay.copy()
+    lay.update(2.0, 1.0)
+    assert snap.best_price == 2.02
+    assert snap != lay
+
+
+def test_runner_book_keeps_top_of_book_properties():
+    legacy = RunnerBook(SelectionId(1), PriceSize(2.0, 10.0), None)
+    assert legacy.best_back == PriceSize(2.0, 10.0)
+    assert legacy.best_lay is None
+
+    full = RunnerBook(
+        selection_id=SelectionId(1),
+        back=Ladder.back([(2.0, 10.0), (1.99, 3.0)]),
+        lay=Ladder.lay(),
+    )
+    assert full.best_back == legacy.best_back
+    assert len(full.back) == 2
+    assert pickle.loads(pickle.dumps(full)) == full
+
+    with pytest.raises(ValueError):
+        RunnerBook(SelectionId(1), PriceSize(2.0, 1.0), back=Ladder.back())
+
+
+def test_runner_book_is_hashable_by_content():
+    top = RunnerBook(selection_id=SelectionId(1), best_back=PriceSize(2.0, 5.0), best_lay=PriceSize(2.02, 5.0))
+    same = RunnerBook(SelectionId(1), back=Ladder.back([(2.0, 5.0)]), lay=Ladder.lay([(2.02, 5.0)]))
+    deeper = RunnerBook(SelectionId(1), back=Ladder.back([(2.0, 5.0), (1.99, 1.0)]), lay=Ladder.lay([(2.02, 5.0)]))
+
+    assert hash(top) == hash(same)
+    assert {top, same, deeper} == {top, deeper}
+    assert len({top, same, deeper}) == 2
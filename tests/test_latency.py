@@ -0,0 +1,108 @@
+import json
+import urllib.request
+from datetime import datetime, timedelta, timezone
+
+from bfrepricer.app.pipeline import TradingPipeline
+from bfrepricer.domain.clock import SimulatedClock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+from bfrepricer.observability.latency import LatencyHistogram, LatencyRecorder, StatsServer
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+MID = MarketId("1.1")
+
+
+def mk_tick(seq, secs, **flags):
+    flags.setdefault("is_market_open", True)
+    runners = (RunnerBook(SelectionId(11), PriceSize(2.0, 10.0), PriceSize(2.02, 12.0)),)
+    return MarketTick(MID, seq, T0 + timedelta(seconds=secs), runners, **flags)
+
+
+def test_histogram_percentiles_are_within_bucket_precision():
+    h = LatencyHistogram()
+    for v in range(1, 100_001):
+        h.record(v * 1_000)  # 1us .. 100ms
+
+    assert h.count == 100_000
+    assert h.min == 1_000 and h.max == 100_000_000
+    for pct, exact in ((50, 50_000_000), (99, 99_000_000), (99.9, 99_900_000)):
+        got = h.value_at_percentile(pct)
+        assert exact <= got <= exact * 1.02
+    assert h.value_at_percentile(100) == h.max
+    # Sparse: a few hundred buckets cover five decades
+    assert len(h._counts) < 1_000
+
+    small = LatencyHistogram()
+    for v in (0, 5, 127, -3):
+        small.record(v)
+    assert small.value_at_percentile(50) == 0
+    assert small.value_at_percentile(75) == 5
+    assert small.max == 127
+
+    small.merge(h)
+    assert small.count == 100_004 and small.min == 0 and small.max == 100_000_000
+
+
+def test_recorder_per_market_and_forget():
+    rec = LatencyRecorder()
+    rec.record("apply", 2_000, MID)
+    rec.record("apply", 4_000, MarketId("1.2"))
+    with rec.time("report"):
+        pass
+
+    snap = rec.snapshot()
+    assert snap["stages"]["apply"]["count"] == 2
+    assert snap["stages"]["report"]["count"] == 1
+    assert snap["markets"][MID]["apply"]["max_us"] == 2.0
+
+    rec.forget(MID)
+    assert rec.histogram("apply", MID) is None
+    assert rec.histogram("apply").count == 2
+    assert "apply" in rec.format()
+
+
+def test_pipeline_records_stages_and_tick_to_intent():
+    clock = SimulatedClock(T0)
+    rec = LatencyRecorder()
+    p = TradingPipeline(
+        orch=MarketOrchestrator(clock=clock),
+        strat=TopOfBookMicroStrategy(),
+        close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.1, stop_loss_delta=0.1)),
+        risk=RiskGate(RiskConfig()),
+        latency=rec,
+    )
+
+    def step(seq, secs, **flags):
+        t = mk_tick(seq, secs, **flags)
+        return p.on_tick(t, now=clock.advance_to(t.publish_time))
+
+    assert step(1, 0).blocked
+    assert step(2, 3).intents
+
+    counts = {stage: s["count"] for stage, s in rec.snapshot()["stages"].items()}
+    assert counts["tick"] == 2 and counts["apply"] == 2
+    for stage in ("close_rule", "strategy", "risk", "execute", "tick_to_intent"):
+        assert counts[stage] == 1
+    assert rec.histogram("tick_to_intent", MID).max <= rec.histogram("tick", MID).max
+
+    step(3, 4, is_market_open=False, is_closed=True)
+    assert rec.histogram("tick", MID) is None
+    assert rec.histogram("tick").count == 3
+
+
+def test_stats_server_serves_json_snapshot():
+    rec = LatencyRecorder()
+    rec.record("fetch", 1_500_000, MID)
+    with StatsServer(rec) as server:
+        with urllib.request.urlopen(server.url, timeout=5) as resp:
+            body = json.loads(resp.read())
+        with urllib.request.urlopen(server.url + "?markets=0", timeout=5) as resp:
+            trimmed = json.loads(resp.read())
+
+    assert body["stages"]["fetch"]["p50_us"] >= 1500.0
+    assert body["markets"][MID]["fetch"]["count"] == 1
+    assert "markets" not in trimmed
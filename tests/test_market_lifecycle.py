@@ -0,0 +1,127 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bfrepricer.app.pipeline import TradingPipeline
+from bfrepricer.app.runtime import _merge
+from bfrepricer.domain.clock import SimulatedClock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.regime import MarketRegime
+from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+from bfrepricer.ingest.change_filter import ChangeFilter
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.state.market_state import MarketState, OutOfOrderTick
+from bfrepricer.state.orchestrator import LifecycleConfig, MarketOrchestrator
+from bfrepricer.state.spill import SnapshotSpill
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+
+
+def rb(sel, back=2.0):
+    return RunnerBook(SelectionId(sel), PriceSize(back, 10.0), PriceSize(back + 0.02, 12.0))
+
+
+def mk(mid, seq, secs, runners=(), **flags):
+    flags.setdefault("is_market_open", True)
+    return MarketTick(MarketId(mid), seq, T0 + timedelta(seconds=secs), tuple(runners), **flags)
+
+
+def test_idle_markets_are_spilled_and_restored_when_they_tick_again(tmp_path):
+    clock = SimulatedClock(T0)
+    spill = SnapshotSpill(tmp_path)
+    evicted = []
+    orch = MarketOrchestrator(
+        lifecycle=LifecycleConfig(idle_after=timedelta(minutes=10), sweep_every=1),
+        spill=spill,
+        on_evict=[evicted.append],
+        clock=clock,
+    )
+    orch.apply(mk("1.1", 1, 0, [rb(11), rb(22)]))
+    for k in range(2, 20):
+        orch.apply(mk("1.2", k, 60 * k, [rb(33, 3.0)]))
+        clock.advance_to(T0 + timedelta(seconds=60 * k))
+
+    assert list(orch.active_market_ids()) == ["1.2"]
+    assert [(e.market_id, e.reason) for e in evicted] == [("1.1", "idle")]
+    assert "1.1" in spill and "1.2" not in spill
+
+    # A partial update after the wake keeps the runners held before eviction
+    orch.apply(mk("1.1", 30, 1200, [rb(22, 2.1)]))
+    snap = orch.get(MarketId("1.1")).snapshot()
+    assert {s: r.best_back.price for s, r in snap.runners.items()} == {11: 2.0, 22: 2.1}
+    assert snap.changed_since == -1  # consumers re-scan a restored market
+    assert "1.1" not in spill
+    with pytest.raises(OutOfOrderTick):
+        orch.apply(mk("1.1", 3, 1201))
+
+
+def test_capacity_evicts_least_recently_ticked_market():
+    evicted = []
+    orch = MarketOrchestrator(lifecycle=LifecycleConfig(max_markets=2), on_evict=[evicted.append])
+    orch.apply(mk("1.1", 1, 0, [rb(11)]))
+    orch.apply(mk("1.2", 2, 1, [rb(11)]))
+    orch.apply(mk("1.1", 3, 2, [rb(11)]))  # 1.2 is now the oldest
+    orch.apply(mk("1.3", 4, 3, [rb(11)]))
+
+    assert sorted(orch.active_market_ids()) == ["1.1", "1.3"]
+    assert [(e.market_id, e.reason) for e in evicted] == [("1.2", "capacity")]
+    assert evicted[0].snapshot.last_seq == 2
+
+
+@pytest.mark.parametrize("kwargs", [{"max_markets": 0}, {"max_markets": -1}, {"sweep_every": 0}])
+def test_lifecycle_config_rejects_empty_caps(kwargs):
+    with pytest.raises(ValueError):
+        LifecycleConfig(**kwargs)
+
+
+def test_spilled_close_turns_late_ticks_into_no_ops(tmp_path):
+    spill = SnapshotSpill(tmp_path)
+    orch = MarketOrchestrator(spill=spill, on_close=[spill.record_closed])
+    orch.apply(mk("1.1", 1, 0, [rb(11)]))
+    assert orch.apply(mk("1.1", 2, 1, is_closed=True)) is not None
+
+    assert orch.apply(mk("1.1", 3, 2, [rb(11)])) is None
+    assert len(orch) == 0
+    assert spill.load(MarketId("1.1")).regime == MarketRegime.CLOSED
+
+
+def test_closed_snapshots_expire_after_their_ttl(tmp_path):
+    spill = SnapshotSpill(tmp_path, closed_ttl=60.0)
+    orch = MarketOrchestrator(spill=spill, on_close=[spill.record_closed])
+    for mid in ("1.1", "1.2"):
+        orch.apply(mk(mid, 1, 0, [rb(11)]))
+        orch.apply(mk(mid, 2, 1, is_closed=True))
+    assert spill.expire_closed() == 0
+    assert "1.1" in spill and "1.2" in spill
+
+    assert spill.expire_closed(now=time.time() + 61) == 2
+    assert list(spill.market_ids()) == [] and spill.expired == 2
+
+
+def test_removed_runners_are_pruned_and_pipeline_forgets_evicted_markets():
+    state = MarketState(MarketId("1.1"))
+    state.apply(mk("1.1", 1, 0, [rb(11), rb(22)]))
+    state.apply(mk("1.1", 2, 1, removed=(SelectionId(22), SelectionId(99))))
+    assert set(state.snapshot().runners) == {11}
+
+    # Conflating a withdrawal keeps it, unless the runner is booked again
+    merged = _merge(mk("1.1", 1, 0, [rb(11), rb(22)], removed=(SelectionId(33),)), mk("1.1", 2, 1, [rb(33)], removed=(SelectionId(11),)))
+    assert ([r.selection_id for r in merged.runners], merged.removed) == ([22, 33], (11,))
+
+    clock = SimulatedClock(T0)
+    pipeline = TradingPipeline(
+        orch=MarketOrchestrator(lifecycle=LifecycleConfig(max_markets=1), clock=clock),
+        strat=TopOfBookMicroStrategy(),
+        close_rule=CloseRule(CloseRuleConfig()),
+        risk=RiskGate(RiskConfig()),
+        change_filter=ChangeFilter(),
+    )
+    pipeline.on_tick(mk("1.1", 1, 0, [rb(11)]))
+    pipeline.on_tick(mk("1.2", 2, 0, [rb(11)]))
+    # 1.1 was evicted: the same book again is news, not a repeat
+    out = pipeline.on_tick(mk("1.1", 3, 0, [rb(11)]))
+    assert not out.unchanged
+    assert list(pipeline.orch.active_market_ids()) == ["1.1"]
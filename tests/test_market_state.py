@@ -72,3 +72,31 @@ def test_runner_updates_merge():
     snap = s.snapshot()
     assert SelectionId(11) in snap.runners
     assert SelectionId(22) in snap.runners
+
+
+def test_snapshot_is_cached_until_next_tick_and_copy_on_write():
+    mid = MarketId("1.234")
+    s = MarketState(mid)
+    s.apply(mk_tick(mid, 1))
+
+    snap1 = s.snapshot()
+    assert s.snapshot() is snap1
+    with pytest.raises(TypeError):
+        snap1.runners[SelectionId(99)] = None  # read-only view
+
+    s.apply(
+        MarketTick(
+            market_id=mid,
+            seq=2,
+            publish_time=utc_now(),
+            runners=(RunnerBook(SelectionId(22), None, None),),
+            is_market_open=True,
+        )
+    )
+    snap2 = s.snapshot()
+    assert snap2 is not snap1
+    assert snap2.last_seq == 2
+    assert SelectionId(22) in snap2.runners
+    # Earlier snapshot is unaffected by the later mutation, unchanged runners are shared
+    assert SelectionId(22) not in snap1.runners
+    assert snap2.runners[SelectionId(11)] is snap1.runners[SelectionId(11)]
@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bfrepricer.app.pipeline import TradingPipeline
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import Ladder, MarketId, RunnerBook, SelectionId
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.exchange_sim import SimulatedExchange
+from bfrepricer.execution.intent import OrderIntent, Side
+from bfrepricer.execution.orders import ExecutionConfig, OrderExecutor, OrderStatus
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+MID = MarketId("1.1")
+
+
+def book_tick(seq, *, back, lay, sel=11, **flags):
+    rb = RunnerBook(SelectionId(sel), back=Ladder.back(back), lay=Ladder.lay(lay))
+    return MarketTick(MID, seq, T0, (rb,), **flags)
+
+
+class Recorder:
+    def __init__(self):
+        self.fills = []
+        self.closes = []
+
+    def on_fill(self, order, size, price):
+        self.fills.append((order.ref, size, price))
+
+    def on_close(self, order, size):
+        self.closes.append((order.ref, size))
+
+
+def intent(side=Side.BACK, price=2.0, size=2.0, sel=11, mid=MID):
+    return OrderIntent(mid, SelectionId(sel), side, price=price, size=size, reason="t")
+
+
+def test_batches_by_market_at_instruction_limit():
+    sim = SimulatedExchange()
+    ex = OrderExecutor(sim, ExecutionConfig(max_place_instructions=3))
+    ex.submit([intent(sel=s) for s in range(7)])
+    ex.submit([intent(mid=MarketId("1.2"))])
+    assert sim.calls == {}  # nothing sent until flush
+    ex.flush()
+    assert sim.calls["placeOrders"] == 4  # 3 + 3 + 1 for 1.1, 1 for 1.2
+    assert all(o.status is OrderStatus.EXECUTABLE and o.bet_id for o in ex.open_orders())
+
+
+def test_immediate_partial_then_resting_fill_via_poll():
+    sim = SimulatedExchange()
+    rec = Recorder()
+    ex = OrderExecutor(sim, listener=rec)
+    sim.on_tick(book_tick(1, back=[(2.02, 1.5), (2.0, 5.0)], lay=[(2.04, 5.0)]))
+
+    (o,) = ex.submit([intent(price=2.02, size=2.0)])
+    ex.flush()
+    assert rec.fills == [(o.ref, 1.5, 2.02)]
+    assert o.status is OrderStatus.EXECUTABLE and o.size_remaining == pytest.approx(0.5)
+
+    sim.on_tick(book_tick(2, back=[(2.04, 3.0)], lay=[(2.06, 5.0)]))
+    ex.poll()
+    assert rec.fills[-1][1] == pytest.approx(0.5)
+    assert rec.fills[-1][2] == pytest.approx(2.04)  # price improvement
+    assert o.status is OrderStatus.EXECUTION_COMPLETE
+    assert o.avg_price_matched == pytest.approx((1.5 * 2.02 + 0.5 * 2.04) / 2.0)
+    assert ex.open_orders() == [] and rec.closes == []
+
+
+def test_cancel_replace_and_lapse_report_closures():
+    sim = SimulatedExchange()
+    rec = Recorder()
+    ex = OrderExecutor(sim, listener=rec)
+    sim.on_tick(book_tick(1, back=[(2.0, 5.0)], lay=[(2.02, 5.0)]))
+
+    a, b, c = ex.submit([intent(price=3.0), intent(price=3.0, sel=22), intent(price=3.0, sel=33)])
+    ex.flush()
+    ex.cancel(a, size_reduction=0.5)
+    ex.cancel(b)
+    ex.replace(c, 2.0)
+    ex.flush()
+    assert sim.calls["cancelOrders"] == 1 and sim.calls["replaceOrders"] == 1
+    assert (a.ref, 0.5) in rec.closes and (b.ref, 2.0) in rec.closes
+    assert b.status is OrderStatus.EXECUTION_COMPLETE
+    assert len(c.bet_ids) == 2 and c.price == 2.0 and c.status is OrderStatus.EXECUTABLE  # no book for sel 33
+
+    sim.on_tick(book_tick(2, back=[(2.0, 5.0)], lay=[(2.02, 5.0)], is_in_play=True))
+    ex.poll()
+    assert (a.ref, 1.5) in rec.closes and (c.ref, 2.0) in rec.closes
+    assert ex.open_orders() == []
+
+
+class Flaky(SimulatedExchange):
+    fail_next = True
+
+    def place_orders(self, market_id, instructions, customer_ref):
+        report = super().place_orders(market_id, instructions, customer_ref)
+        if self.fail_next:
+            self.fail_next = False
+            raise ConnectionError("lost response")
+        return report
+
+
+def test_failed_place_is_resent_with_same_customer_ref():
+    sim = Flaky()
+    ex = OrderExecutor(sim)
+    (o,) = ex.submit([intent()])
+    with pytest.raises(ConnectionError):
+        ex.flush()
+    assert o.status is OrderStatus.PENDING
+    ex.flush()
+    assert o.status is OrderStatus.EXECUTABLE
+    assert len(sim.list_current_orders(["1", "2"])["currentOrders"]) == 1  # de-duplicated
+
+
+def test_pipeline_fills_through_executor_and_keeps_ledger_in_step():
+    sim = SimulatedExchange()
+    p = TradingPipeline(
+        orch=MarketOrchestrator(),
+        strat=TopOfBookMicroStrategy(),
+        close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.5, stop_loss_delta=0.5)),
+        risk=RiskGate(RiskConfig()),
+        executor=OrderExecutor(sim),
+    )
+    p.orch.apply(book_tick(1, back=[(2.0, 1.0)], lay=[(2.02, 3.0)], is_market_open=True))
+    later = T0 + timedelta(seconds=10)  # past the reopen cooldown
+
+    t = book_tick(2, back=[(2.0, 3.0)], lay=[(2.02, 3.0)], is_market_open=True)
+    sim.on_tick(book_tick(2, back=[(2.0, 1.0)], lay=[(2.02, 3.0)]))  # only 1.0 on the exchange
+    out = p.on_tick(t, now=later)
+    assert len(out.intents) == 1
+    assert p.engine.positions[(MID, 11)].size == 1.0
+    assert p.risk.exposure(MID, SelectionId(11)) == 2.0  # 1 filled + 1 resting
+
+    # Resting order suppresses a second entry
+    assert p.on_tick(book_tick(3, back=[(2.0, 4.0)], lay=[(2.02, 3.0)], is_market_open=True), now=later).intents == ()
+
+    sim.on_tick(book_tick(3, back=[(2.0, 4.0)], lay=[(2.02, 3.0)]))
+    p.executor.poll()
+    assert p.engine.positions[(MID, 11)].size == 2.0
+    assert p.risk.in_flight(MID, SelectionId(11)) == 0.0
+
+
+def test_partial_fills_leave_no_in_flight_residue_in_the_pipeline():
+    sim = SimulatedExchange()
+    p = TradingPipeline(
+        orch=MarketOrchestrator(),
+        strat=TopOfBookMicroStrategy(),
+        close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.5, stop_loss_delta=0.5)),
+        risk=RiskGate(RiskConfig()),
+        executor=OrderExecutor(sim),
+    )
+    sel = SelectionId(11)
+    (lay,) = p.risk.reserve_intents([intent(Side.LAY, price=2.02, size=0.7)])
+    (order,) = p.executor.submit([lay])
+    p.executor.flush()
+    for seq in (1, 2):  # 0.1 on offer each update: two partial fills
+        sim.on_tick(book_tick(seq, back=[(2.0, 5.0)], lay=[(2.02, 0.1)]))
+        p.executor.poll()
+    p.executor.cancel(order)  # the rest is released: 0.7 - 0.1 - 0.1 leaves float residue
+    p.executor.flush()
+
+    assert not order.is_open
+    assert p.engine.positions[(MID, sel)].size == pytest.approx(-0.2)
+    assert p.risk.in_flight(MID, sel) == 0.0
+
+    # The position can be closed again: nothing is considered in flight
+    p.orch.apply(book_tick(1, back=[(2.0, 5.0)], lay=[(2.02, 5.0)], is_market_open=True))
+    later = T0 + timedelta(seconds=10)
+    out = p.on_tick(book_tick(2, back=[(1.4, 5.0)], lay=[(1.42, 5.0)], is_market_open=True), now=later)
+    assert [(i.side, i.size) for i in out.close_intents] == [(Side.BACK, pytest.approx(0.2))]
@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bfrepricer.app.pipeline import TradingPipeline
+from bfrepricer.domain.clock import SimulatedClock
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import Ladder, MarketId, RunnerBook, SelectionId
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.intent import OrderIntent, Side
+from bfrepricer.execution.orders import OrderExecutor, OrderStatus
+from bfrepricer.execution.paper_matching import PaperMatchingConfig, QueueMatchingSimulator
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.replay.driver import replay
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+MID = MarketId("1.1")
+NO_LATENCY = PaperMatchingConfig(place_latency=timedelta(0), cancel_latency=timedelta(0), trade_fraction=1.0)
+
+
+class Ticks:
+    def __init__(self):
+        self.seq = 0
+
+    def __call__(self, secs, *, back, lay, **flags):
+        self.seq += 1
+        rb = RunnerBook(SelectionId(11), back=Ladder.back(back), lay=Ladder.lay(lay))
+        return MarketTick(MID, self.seq, T0 + timedelta(seconds=secs), (rb,), **flags)
+
+
+def setup(cfg):
+    clock = SimulatedClock(T0)
+    sim = QueueMatchingSimulator(cfg, clock=clock)
+    return clock, sim, OrderExecutor(sim)
+
+
+def back_at(price, size):
+    return OrderIntent(MID, SelectionId(11), Side.BACK, price=price, size=size, reason="t")
+
+
+def test_resting_back_waits_for_queue_ahead_then_fills_on_trade_through():
+    clock, sim, ex = setup(NO_LATENCY)
+    tick = Ticks()
+    sim.record(tick(0, back=[(2.9, 5.0)], lay=[(3.0, 10.0), (3.05, 8.0)]))
+
+    (o,) = ex.submit([back_at(3.0, 2.0)])
+    ex.flush()
+    assert o.size_matched == 0  # rests behind 10 at 3.0
+
+    sim.record(tick(1, back=[(2.9, 5.0)], lay=[(3.0, 4.0), (3.05, 8.0)]))
+    ex.poll()
+    assert o.size_matched == 0  # 6 traded, 4 still ahead
+
+    sim.record(tick(2, back=[(2.9, 5.0)], lay=[(3.05, 8.0)]))
+    ex.poll()
+    assert o.size_matched == 2.0 and o.status is OrderStatus.EXECUTION_COMPLETE
+
+
+def test_size_added_behind_and_partial_fill_from_traded_volume():
+    clock, sim, ex = setup(NO_LATENCY)
+    tick = Ticks()
+    sim.record(tick(0, back=[(2.9, 5.0)], lay=[(3.0, 1.0)]))
+    (o,) = ex.submit([back_at(3.0, 4.0)])
+    ex.flush()
+
+    sim.record(tick(1, back=[(2.9, 5.0)], lay=[(3.0, 6.0)]))  # 5 joins behind us
+    sim.record(tick(2, back=[(2.9, 5.0)], lay=[(3.0, 3.0)]))  # 3 traded: 1 ahead, then 2 of ours
+    ex.poll()
+    assert o.size_matched == pytest.approx(2.0)
+    assert o.status is OrderStatus.EXECUTABLE
+
+
+def test_cancellations_thin_the_queue_when_not_all_shrink_is_traded():
+    cfg = PaperMatchingConfig(place_latency=timedelta(0), cancel_latency=timedelta(0), trade_fraction=0.0)
+    clock, sim, ex = setup(cfg)
+    tick = Ticks()
+    sim.record(tick(0, back=[(2.9, 5.0)], lay=[(3.0, 10.0)]))
+    (o,) = ex.submit([back_at(3.0, 2.0)])
+    ex.flush()
+    sim.record(tick(1, back=[(2.9, 5.0)], lay=[(3.0, 5.0)]))
+    ex.poll()
+    assert o.size_matched == 0
+    assert sim._bets[o.bet_id].ahead == pytest.approx(5.0)
+
+
+def test_placement_and_cancel_latency():
+    cfg = PaperMatchingConfig(place_latency=timedelta(seconds=1), cancel_latency=timedelta(seconds=1))
+    clock, sim, ex = setup(cfg)
+    tick = Ticks()
+    sim.record(tick(0, back=[(3.0, 1.0)], lay=[(3.05, 10.0)]))
+
+    (o,) = ex.submit([back_at(3.0, 2.0)])  # marketable, but not on the book yet
+    ex.flush()
+    assert o.size_matched == 0
+
+    sim.record(tick(0.5, back=[(3.0, 1.0)], lay=[(3.05, 10.0)]))
+    ex.poll()
+    assert o.size_matched == 0
+    clock.advance_to(T0 + timedelta(seconds=1))
+    sim.record(tick(1, back=[(3.0, 1.0)], lay=[(3.05, 10.0)]))
+    ex.poll()
+    assert o.size_matched == 1.0  # took what was available at 3.0
+
+    ex.cancel(o)
+    ex.flush()
+    assert o.is_open  # acknowledged, not yet effective
+    sim.record(tick(1.5, back=[(3.0, 4.0)], lay=[(3.05, 10.0)]))  # still matchable in the window
+    clock.advance_to(T0 + timedelta(seconds=2))
+    ex.poll()
+    assert o.size_matched == 2.0 and o.status is OrderStatus.EXECUTION_COMPLETE
+
+
+def test_replay_with_queue_simulator_as_sink():
+    clock = SimulatedClock(T0)
+    sim = QueueMatchingSimulator(PaperMatchingConfig(place_latency=timedelta(seconds=1)), clock=clock)
+    p = TradingPipeline(
+        orch=MarketOrchestrator(sinks=[sim], clock=clock),
+        strat=TopOfBookMicroStrategy(),
+        close_rule=CloseRule(CloseRuleConfig(take_profit_delta=1.0, stop_loss_delta=1.0)),
+        risk=RiskGate(RiskConfig()),
+        executor=OrderExecutor(sim),
+    )
+    tick = Ticks()
+    ticks = [
+        tick(0, back=[(2.0, 10.0)], lay=[(2.02, 12.0)], is_market_open=True),
+        tick(3, back=[(2.0, 10.0)], lay=[(2.02, 12.0)], is_market_open=True),   # entry sent
+        tick(3.5, back=[(2.0, 11.0)], lay=[(2.02, 12.0)], is_market_open=True),  # not on the book yet
+        tick(4.5, back=[(2.0, 1.5)], lay=[(2.02, 12.0)], is_market_open=True),   # arrives, takes 1.5
+    ]
+    stats = replay(ticks, p, clock=clock)
+    assert stats.intents == 1
+    assert p.engine.positions[(MID, 11)].size == 1.5
+    assert p.risk.exposure(MID, SelectionId(11)) == 2.0
+
+
+def test_delayed_partial_cancel_is_reported_when_it_takes_effect():
+    cfg = PaperMatchingConfig(place_latency=timedelta(0), cancel_latency=timedelta(seconds=1))
+    clock, sim, ex = setup(cfg)
+    closes = []
+
+    class Listener:
+        def on_fill(self, order, size, price):
+            pass
+
+        def on_close(self, order, size):
+            closes.append(size)
+
+    ex.listener = Listener()
+    tick = Ticks()
+    sim.record(tick(0, back=[(2.9, 5.0)], lay=[(3.0, 5.0)]))
+    (o,) = ex.submit([back_at(3.0, 2.0)])  # rests behind 5.0
+    ex.flush()
+
+    ex.cancel(o, size_reduction=0.5)
+    ex.flush()
+    ex.poll()
+    assert closes == []  # acknowledged, not yet effective
+
+    clock.advance_to(T0 + timedelta(seconds=1))
+    ex.poll()
+    ex.poll()  # reported once
+    assert closes == [0.5]
+    assert o.is_open and o.size_remaining == pytest.approx(1.5)
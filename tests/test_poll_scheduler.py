@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from bfrepricer.domain.clock import SimulatedClock
+from bfrepricer.domain.types import MarketId, utc_now
+from bfrepricer.ingest.poll_scheduler import PollConfig, PollScheduler
+from bfrepricer.observability.latency import LatencyRecorder
+
+
+def book(mid, status="OPEN"):
+    return {"marketId": mid, "status": status, "runners": []}
+
+
+def test_due_markets_are_batched_under_weight_limit():
+    cfg = PollConfig(weight_per_market=5, max_weight_per_request=200, max_burst=100)
+    sched = PollScheduler(lambda ids: [], cfg)
+    now = utc_now()
+    for i in range(100):
+        sched.track(MarketId(f"1.{i}"), now + timedelta(minutes=10))
+
+    batches = sched.due_batches(now)
+    assert [len(b) for b in batches] == [40, 40, 20]
+
+    # Everything was rescheduled, nothing due until the band interval passes
+    assert sched.due_batches(now) == []
+
+
+def test_markets_near_the_off_poll_more_often():
+    sched = PollScheduler(lambda ids: [], PollConfig())
+    now = utc_now()
+    near, far = MarketId("1.1"), MarketId("1.2")
+    sched.track(near, now + timedelta(minutes=2))
+    sched.track(far, now + timedelta(hours=5))
+
+    assert sched.interval_for(near, now) < sched.interval_for(far, now)
+
+    sched.due_batches(now)
+    batches = sched.due_batches(now + timedelta(seconds=2))
+    assert batches == [[near]]
+
+
+def test_request_budget_defers_remaining_markets():
+    cfg = PollConfig(weight_per_market=100, max_weight_per_request=200, max_burst=1, max_requests_per_second=1.0)
+    sched = PollScheduler(lambda ids: [], cfg)
+    now = utc_now()
+    ids = [MarketId(f"1.{i}") for i in range(4)]
+    for m in ids:
+        sched.track(m, now + timedelta(minutes=1))
+
+    assert sched.due_batches(now) == [ids[:2]]
+    assert sched.due_batches(now) == []
+    assert sched.due_batches(now + timedelta(seconds=1)) == [ids[2:]]
+
+
+def test_poll_once_returns_ticks_and_untracks_closed():
+    calls = []
+
+    def fetch(ids):
+        calls.append(list(ids))
+        return [book("1.1"), book("1.2", status="CLOSED"), book("9.9")]
+
+    rec = LatencyRecorder()
+    sched = PollScheduler(fetch, PollConfig(), latency=rec)
+    sched.track(MarketId("1.1"))
+    sched.track(MarketId("1.2"))
+    try:
+        ticks = sched.poll_once()
+    finally:
+        sched.close()
+
+    assert rec.histogram("fetch").count == 1
+    assert rec.histogram("decode").count == 3
+    assert calls == [["1.1", "1.2"]]
+    assert [t.market_id for t in ticks] == ["1.1", "1.2"]
+    assert ticks[0].seq < ticks[1].seq
+    assert list(sched.tracked_market_ids()) == ["1.1"]
+
+
+def test_run_loop_on_simulated_clock_polls_until_closed():
+    clock = SimulatedClock(utc_now())
+    polls = []
+
+    def fetch(ids):
+        polls.append(clock.now())
+        return [book("1.1", status="CLOSED" if len(polls) == 5 else "OPEN")]
+
+    sched = PollScheduler(fetch, PollConfig(), clock=clock)
+    sched.track(MarketId("1.1"), clock.now() + timedelta(minutes=2))
+    seen = []
+    try:
+        sched.run(seen.append)
+    finally:
+        sched.close()
+
+    assert len(seen) == 5
+    assert seen[-1].is_closed is True
+    # 1 s cadence near the off, without any real sleeping
+    assert polls[-1] - polls[0] == timedelta(seconds=4)
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId  # noqa: E402
+from bfrepricer.execution.intent import Side  # noqa: E402
+from bfrepricer.execution.mark_to_market import mark_to_market  # noqa: E402
+from bfrepricer.execution.portfolio import PortfolioMarker  # noqa: E402
+from bfrepricer.execution.position_book import PositionBook  # noqa: E402
+
+
+def _rb(sel: int, back: float | None, lay: float | None) -> RunnerBook:
+    return RunnerBook(
+        SelectionId(sel),
+        PriceSize(back, 10.0) if back is not None else None,
+        PriceSize(lay, 10.0) if lay is not None else None,
+    )
+
+
+def test_bulk_marks_match_mark_to_market_per_position_and_market():
+    book = PositionBook()
+    m1, m2 = MarketId("1.1"), MarketId("1.2")
+    book.apply_fill(m1, SelectionId(11), Side.BACK, 3.0, 2.0)  # long, marks on lay
+    book.apply_fill(m1, SelectionId(22), Side.LAY, 3.0, 2.0)   # short, marks on back
+    book.apply_fill(m2, SelectionId(11), Side.BACK, 5.0, 1.0)  # no lay price
+    marker = PortfolioMarker(book)
+    marker.update_market(m1, [_rb(11, 3.1, 3.2), _rb(22, 2.8, 2.9), _rb(33, 9.0, 9.5)])
+    marker.update_market(m2, [_rb(11, 4.0, None)])
+    marker.update_market(MarketId("9.9"), [_rb(11, 2.0, 2.1)])  # no positions: ignored
+
+    marks = marker.mark()
+    assert marks.unrealized[book.slot((m1, SelectionId(11)))] == pytest.approx(0.4)
+    assert marks.unrealized[book.slot((m1, SelectionId(22)))] == pytest.approx(0.4)
+    assert marks.unrealized[book.slot((m2, SelectionId(11)))] == 0.0
+    assert marks.per_market() == pytest.approx({m1: 0.8, m2: 0.0})
+    assert marks.total == pytest.approx(0.8)
+    assert not marks.unrealized.flags.writeable
+
+    marker.forget_market(m1)  # closed: fails closed like mark_to_market without prices
+    assert marker.mark_changed().total == 0.0
+
+
+def test_incremental_marks_track_full_marks():
+    rnd = random.Random(3)
+    book = PositionBook()
+    marker = PortfolioMarker(book)
+    prices = [1.5, 2.0, 2.5, 3.4, 8.0]
+    books = {}
+    for step in range(300):
+        mid, sel = MarketId(f"1.{rnd.randrange(6)}"), rnd.randrange(5)
+        if rnd.random() < 0.3:
+            book.apply_fill(mid, SelectionId(sel), rnd.choice([Side.BACK, Side.LAY]), rnd.choice(prices), 2.0)
+        rb = _rb(sel, rnd.choice(prices + [None]), rnd.choice(prices + [None]))
+        books[(mid, sel)] = rb
+        removed = [SelectionId(sel)] if rnd.random() < 0.05 else []
+        if removed:
+            books.pop((mid, sel))
+        marker.update_market(mid, [rb] if not removed else [], removed)
+
+        marks = marker.mark_changed()
+        for key, pos in book.items():
+            rb = books.get(key)
+            expected = mark_to_market(
+                pos.to_position(),
+                best_back=rb.best_back if rb else None,
+                best_lay=rb.best_lay if rb else None,
+            )
+            assert marks.unrealized[pos.slot] == pytest.approx(expected)
+        assert marks.total == pytest.approx(marker.mark().total)
+        if step % 50 == 0:
+            assert len(marker.mark_changed().changed) == 0  # nothing moved since
+
+
+def test_marker_follows_fills_without_copying_the_ledger(monkeypatch):
+    book = PositionBook()
+    m = MarketId("1.1")
+    book.apply_fill(m, SelectionId(11), Side.BACK, 3.0, 2.0)  # before the marker: seeded
+    marker = PortfolioMarker(book)
+    monkeypatch.setattr(PositionBook, "columns", lambda self: pytest.fail("ledger copied"))
+
+    marker.update_market(m, [_rb(11, 3.1, 3.2)])
+    assert marker.mark_changed().total == pytest.approx(0.4)
+
+    book.apply_fill(m, SelectionId(22), Side.LAY, 3.0, 2.0)  # new slot
+    book.apply_fill(m, SelectionId(11), Side.LAY, 3.2, 1.0)  # partly closed
+    marker.update_market(m, [_rb(22, 2.8, 2.9)])
+    marks = marker.mark_changed()
+    assert sorted(marks.changed.tolist()) == [0, 1]
+    assert marks.unrealized.tolist() == pytest.approx([0.2, 0.4])
+    assert marks.total == pytest.approx(marker.mark().total)
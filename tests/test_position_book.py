@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from bfrepricer.domain.types import MarketId, SelectionId
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.intent import OrderIntent, Side
+from bfrepricer.execution.position import Position
+from bfrepricer.execution.position_book import PositionBook
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+
+
+def test_book_indexes_by_market_and_tracks_exposure():
+    book = PositionBook()
+    m1, m2 = MarketId("1.1"), MarketId("1.2")
+    book.apply_fill(m1, SelectionId(11), Side.BACK, 2.0, 2.0)
+    book.apply_fill(m1, SelectionId(22), Side.LAY, 3.0, 1.5)
+    book.apply_fill(m2, SelectionId(11), Side.BACK, 4.0, 5.0)
+
+    assert len(book) == 3
+    assert set(book) == {(m1, 11), (m1, 22), (m2, 11)}
+    assert book[(m1, 22)].size == -1.5
+    assert book.get((m2, 22)) is None and (m2, 22) not in book
+    assert dict(book.market(m1)).keys() == {11, 22}
+    assert book.market(MarketId("9.9")) == {}
+    assert book.market_abs(m1) == 3.5
+    assert book.market_abs(m2) == 5.0
+
+    book.apply_fill(m1, SelectionId(11), Side.LAY, 2.2, 2.0)  # flat
+    assert book[(m1, 11)].size == 0.0
+    assert book.market_abs(m1) == 1.5
+
+
+def test_risk_uses_book_totals_without_mutating_it():
+    book = PositionBook()
+    mid = MarketId("1.1")
+    book.apply_fill(mid, SelectionId(11), Side.BACK, 2.0, 4.0)
+    book.apply_fill(MarketId("1.2"), SelectionId(11), Side.BACK, 2.0, 9.0)  # other market, ignored
+
+    gate = RiskGate(RiskConfig(max_abs_pos_per_selection=10.0, max_abs_pos_per_market=7.0, max_order_size=2.0))
+    intents = [
+        OrderIntent(mid, SelectionId(22), Side.BACK, price=3.0, size=2.0, reason="a"),
+        OrderIntent(mid, SelectionId(33), Side.BACK, price=3.0, size=2.0, reason="b"),  # would reach 8
+        OrderIntent(mid, SelectionId(11), Side.LAY, price=2.0, size=2.0, reason="c"),   # reduce, allowed
+    ]
+    out = gate.filter_intents(intents=intents, positions=book)
+    assert [i.reason for i in out] == ["a | risk:ok", "c | risk:allow_reduce"]
+    assert len(book) == 2 and book.market_abs(mid) == 4.0
+
+    rule = CloseRule(CloseRuleConfig())
+    assert rule.decide_closes(market_id=MarketId("1.3"), runners={}, positions=book) == []
+
+
+def test_ledger_columns_views_and_totals():
+    book = PositionBook()
+    m1, m2 = MarketId("1.1"), MarketId("1.2")
+    view = book.apply_fill(m1, SelectionId(11), Side.BACK, 2.0, 2.0)
+    book.apply_fill(m2, SelectionId(22), Side.LAY, 4.0, 3.0)
+    book.apply_fill(m1, SelectionId(11), Side.LAY, 2.5, 1.0)  # reduce: +0.5 realized
+
+    # Views are live and read like the Position they replace
+    assert view is book[(m1, 11)]
+    assert view == Position(size=1.0, avg_price=2.0, realized_pnl=0.5)
+    assert view.to_position() == Position(1.0, 2.0, 0.5)
+    with pytest.raises(AttributeError):
+        view.size = 3.0
+
+    size, avg, realized, market, selection = book.columns()
+    assert (list(size), list(avg), list(realized)) == ([1.0, -3.0], [2.0, 4.0], [0.5, 0.0])
+    assert [book.market_ids[c] for c in market] == [m1, m2]
+    assert list(selection) == [11, 22]
+    assert book.slot((m2, SelectionId(22))) == 1 and book.slot((m2, SelectionId(11))) is None
+
+    assert book.total_realized() == 0.5
+    assert book.total_abs() == 4.0 == book.market_abs(m1) + book.market_abs(m2)
+
+    # Columns are copies: the ledger keeps growing underneath them
+    book.apply_fill(m2, SelectionId(33), Side.BACK, 6.0, 1.0)
+    assert len(size) == 2 and len(book) == 3
+
+
+def test_ledger_fills_match_position_arithmetic():
+    rnd = random.Random(7)
+    book, ref = PositionBook(), {}
+    for _ in range(500):
+        key = (MarketId(f"1.{rnd.randrange(3)}"), SelectionId(rnd.randrange(4)))
+        side, price, size = rnd.choice([Side.BACK, Side.LAY]), rnd.choice([1.5, 2.0, 3.4, 8.0]), rnd.choice([1.0, 2.0, 2.5])
+        book.apply_fill(*key, side, price, size)
+        ref.setdefault(key, Position()).apply_fill(side, price, size)
+    assert {k: v.to_position() for k, v in book.items()} == ref
+    assert book.total_realized() == pytest.approx(sum(p.realized_pnl for p in ref.values()))
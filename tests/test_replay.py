@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bfrepricer.app.pipeline import TradingPipeline
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.replay.driver import replay
+from bfrepricer.replay.tick_log import TickRecorder, read_ticks
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+
+
+def mk_tick(seq, secs, *, back, lay, **flags):
+    rb = RunnerBook(SelectionId(11), PriceSize(back, 10.0), PriceSize(lay, 12.0))
+    return MarketTick(MarketId("1.1"), seq, T0 + timedelta(seconds=secs), (rb,), **flags)
+
+
+def pipeline():
+    return TradingPipeline(
+        orch=MarketOrchestrator(),
+        strat=TopOfBookMicroStrategy(),
+        close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.1, stop_loss_delta=0.1)),
+        risk=RiskGate(RiskConfig()),
+    )
+
+
+TICKS = [
+    mk_tick(1, 0, back=2.0, lay=2.02, is_market_open=True),   # opens, cooldown until +2s
+    mk_tick(2, 1, back=2.0, lay=2.02, is_market_open=True),   # still cooling down
+    mk_tick(3, 3, back=2.0, lay=2.02, is_market_open=True),   # entry
+    mk_tick(4, 4, back=2.2, lay=2.22, is_market_open=True),   # take profit
+    mk_tick(2, 5, back=2.2, lay=2.22, is_market_open=True),   # out of order, rejected
+    mk_tick(5, 6, back=2.2, lay=2.22, is_closed=True),
+]
+
+
+def test_replay_uses_virtual_time_and_is_deterministic(tmp_path):
+    path = tmp_path / "day.bin"
+    with TickRecorder(path) as rec:
+        for t in TICKS:
+            rec.record(t)
+
+    p1, p2 = pipeline(), pipeline()
+    s1 = replay(read_ticks(path), p1)
+    s2 = replay(read_ticks(path), p2)
+
+    assert (s1.ticks, s1.blocked, s1.intents, s1.close_intents, s1.rejected, s1.closed) == (6, 2, 1, 1, 1, 1)
+    assert (s2.ticks, s2.intents, s2.close_intents) == (s1.ticks, s1.intents, s1.close_intents)
+    assert p1.engine.snapshot() == p2.engine.snapshot()
+    assert p1.engine.snapshot()["1.1:11"]["size"] == 0.0
+    assert p1.engine.snapshot()["1.1:11"]["realized_pnl"] > 0
+
+
+def test_replay_does_not_swallow_pipeline_errors():
+    class Broken(TopOfBookMicroStrategy):
+        def decide(self, snap):
+            raise ValueError("strategy bug")
+
+    p = pipeline()
+    p.strat = Broken()
+    with pytest.raises(ValueError, match="strategy bug"):
+        replay(TICKS, p)
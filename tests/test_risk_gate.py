@@ -40,3 +40,61 @@ def test_clamps_order_size():
     filtered = gate.filter_intents(intents=intents, positions=dict(positions))
     assert len(filtered) == 1
     assert filtered[0].size == 1.5
+
+
+def test_ledger_reserves_commits_and_releases():
+    gate = RiskGate(RiskConfig(max_abs_pos_per_selection=4.0, max_abs_pos_per_market=6.0, max_order_size=2.0))
+    mid = MarketId("1.1")
+    a = OrderIntent(mid, SelectionId(11), Side.BACK, price=3.0, size=2.0, reason="a")
+    b = OrderIntent(mid, SelectionId(22), Side.BACK, price=3.0, size=5.0, reason="b")
+
+    accepted = gate.reserve_intents([a, a, a])  # third would breach selection cap
+    assert [(i.size, i.reason) for i in accepted] == [(2.0, "a | risk:ok")] * 2
+    assert gate.exposure(mid, SelectionId(11)) == 4.0
+
+    # In-flight size counts toward the market cap
+    (clamped,) = gate.reserve_intents([b])
+    assert clamped.size == 2.0 and clamped.reason == "b | risk:ok"
+    assert gate.reserve_intents([b]) == []
+    assert gate.market_exposure(mid) == 6.0  # 4 + 2 reserved
+
+    gate.commit(a)
+    gate.commit(a, size=1.0)     # partial fill
+    gate.release(a, size=1.0)    # remainder lapses
+    gate.release(clamped)        # rejected
+    assert gate.exposure(mid, SelectionId(11)) == 3.0
+    assert gate.exposure(mid, SelectionId(22)) == 0.0
+    assert gate.market_exposure(mid) == 3.0
+
+    # Reducing is always allowed
+    close = OrderIntent(mid, SelectionId(11), Side.LAY, price=3.0, size=2.0, reason="close")
+    assert gate.reserve(close) == 2.0
+    gate.commit(close)
+    assert gate.exposure(mid, SelectionId(11)) == 1.0
+
+
+def test_ledger_sync_seeds_from_positions():
+    gate = RiskGate(RiskConfig(max_abs_pos_per_selection=10.0, max_abs_pos_per_market=6.0, max_order_size=2.0))
+    mid = MarketId("1.1")
+    gate.sync({
+        (mid, SelectionId(11)): Position(size=3.0, avg_price=3.0),
+        (mid, SelectionId(22)): Position(size=-2.0, avg_price=3.0),
+    })
+    assert gate.market_exposure(mid) == 5.0
+    assert gate.reserve(OrderIntent(mid, SelectionId(33), Side.BACK, price=3.0, size=2.0, reason="x")) == 0.0
+    assert gate.reserve(OrderIntent(mid, SelectionId(33), Side.BACK, price=3.0, size=1.0, reason="x")) == 1.0
+
+
+def test_ledger_treats_float_residue_as_zero():
+    gate = RiskGate(RiskConfig())
+    mid = MarketId("1.1")
+    lay = OrderIntent(mid, SelectionId(11), Side.LAY, price=3.0, size=0.3, reason="close")
+    assert gate.reserve(lay) == 0.3
+    for _ in range(3):
+        gate.commit(lay, size=0.1)
+    assert gate.in_flight(mid, SelectionId(11)) == 0.0
+    back = OrderIntent(mid, SelectionId(11), Side.BACK, price=3.0, size=0.1, reason="entry")
+    for _ in range(3):
+        gate.reserve(back)
+        gate.commit(back)
+    assert gate.exposure(mid, SelectionId(11)) == 0.0
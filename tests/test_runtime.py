@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bfrepricer.app.pipeline import TradingPipeline
+from bfrepricer.app.runtime import LatestTickQueue, RuntimeConfig, TradingRuntime, iter_feed, poll_feed
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId, utc_now
+from bfrepricer.execution.close_rule import CloseRule, CloseRuleConfig
+from bfrepricer.execution.risk import RiskConfig, RiskGate
+from bfrepricer.ingest.poll_scheduler import PollBand, PollConfig, PollScheduler
+from bfrepricer.pricing.strategy import TopOfBookMicroStrategy
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+T0 = datetime(2026, 5, 2, 14, 0, tzinfo=timezone.utc)
+A, B = MarketId("1.1"), MarketId("1.2")
+
+
+def rb(sel, back, lay=None):
+    return RunnerBook(SelectionId(sel), PriceSize(back, 10.0), PriceSize(lay or back + 0.02, 12.0))
+
+
+def mk(mid, seq, runners, **flags):
+    flags.setdefault("is_market_open", True)
+    return MarketTick(mid, seq, T0 + timedelta(seconds=seq), tuple(runners), **flags)
+
+
+def pipeline():
+    return TradingPipeline(
+        orch=MarketOrchestrator(),
+        strat=TopOfBookMicroStrategy(),
+        close_rule=CloseRule(CloseRuleConfig(take_profit_delta=0.1, stop_loss_delta=0.1)),
+        risk=RiskGate(RiskConfig()),
+    )
+
+
+def test_queue_keeps_latest_per_market_but_not_across_status_changes():
+    async def go():
+        q = LatestTickQueue()
+        await q.put(mk(A, 1, [rb(11, 2.0), rb(22, 5.0)]))
+        await q.put(mk(B, 2, [rb(33, 3.0)]))
+        await q.put(mk(A, 3, [rb(22, 5.1)]))
+        await q.put(mk(A, 4, [], is_market_open=False))
+        q.close()
+        return q, [t async for t in _drain(q)]
+
+    q, out = asyncio.run(go())
+    assert [(t.market_id, t.seq) for t in out] == [(A, 3), (A, 4), (B, 2)]
+    merged = {r.selection_id: r.best_back.price for r in out[0].runners}
+    assert merged == {11: 2.0, 22: 5.1}
+    assert out[1].is_market_open is False
+    assert (q.puts, q.conflated, q.high_water) == (4, 1, 2)
+
+
+async def _drain(q):
+    while (t := await q.get()) is not None:
+        yield t
+
+
+def test_queue_bound_holds_producers_back_for_new_markets_only():
+    async def go():
+        q = LatestTickQueue(maxsize=1)
+        await q.put(mk(A, 1, [rb(11, 2.0)]))
+        await q.put(mk(A, 2, [rb(11, 2.1)]))  # same market: never waits
+
+        blocked = asyncio.create_task(q.put(mk(B, 3, [rb(33, 3.0)])))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        assert (await q.get()).seq == 2
+        await asyncio.wait_for(blocked, 1)
+        return (await q.get()).market_id
+
+    assert asyncio.run(go()) == B
+
+
+def test_runtime_decides_every_tick_and_reports_after():
+    ticks = [mk(A, 1, [rb(11, 2.0)]), mk(A, 5, [rb(11, 2.0)]), mk(A, 6, [], is_closed=True, is_market_open=False)]
+    reported = []
+    rt = TradingRuntime(pipeline(), report=reported.append)
+
+    asyncio.run(rt.run([iter_feed(ticks)]))
+
+    assert rt.processed == 3
+    assert [o.tick.seq for o in reported] == [1, 5, 6]
+    assert len(reported[0].intents) == 1
+    assert reported[1].intents == ()           # position already open
+    assert reported[2].closed is not None
+
+
+def test_outcome_handlers_see_every_tick_even_when_reports_are_dropped():
+    ticks = [mk(A, seq, [rb(11, 2.0 + seq / 100)]) for seq in range(1, 30)]
+    seen = []
+    p = pipeline()
+    p.on_outcome = [seen.append]
+    rt = TradingRuntime(p, RuntimeConfig(report_buffer=1), report=lambda out: None)
+
+    asyncio.run(rt.run([iter_feed(ticks)]))
+
+    assert [o.tick.seq for o in seen] == list(range(1, 30))
+
+
+def test_runtime_polls_async_until_markets_close_and_feed_errors_are_raised():
+    polls = {"1.1": 0, "1.2": 0}
+
+    async def fetch(ids):
+        await asyncio.sleep(0)
+        out = []
+        for m in ids:
+            polls[m] += 1
+            out.append({"marketId": m, "status": "CLOSED" if polls[m] == 3 else "OPEN", "runners": []})
+        return out
+
+    cfg = PollConfig(bands=(PollBand(timedelta(days=1), timedelta(milliseconds=1)),), max_burst=100, max_requests_per_second=1e6)
+    sched = PollScheduler(fetch, cfg)
+    for m in polls:
+        sched.track(MarketId(m), utc_now() + timedelta(minutes=5))
+    closed = []
+    rt = TradingRuntime(pipeline(), RuntimeConfig(max_pending_markets=1), report=lambda o: o.closed and closed.append(o))
+    try:
+        asyncio.run(asyncio.wait_for(rt.run([poll_feed(sched, min_sleep=0.001)]), 5))
+    finally:
+        sched.close()
+    assert polls == {"1.1": 3, "1.2": 3}
+    assert sorted(o.tick.market_id for o in closed) == ["1.1", "1.2"]
+
+    async def broken(queue, stop):
+        raise RuntimeError("feed down")
+
+    with pytest.raises(RuntimeError, match="feed down"):
+        asyncio.run(TradingRuntime(pipeline()).run([broken]))
+
+
+def test_stop_ends_the_run_with_feeds_still_live():
+    async def endless(queue, stop):
+        seq = 0
+        while not stop.is_set():
+            seq += 1
+            await queue.put(mk(A, seq, [rb(11, 2.0 + (seq % 5) / 100)]))
+            await asyncio.sleep(0)
+
+    async def go():
+        stop = asyncio.Event()
+        rt = TradingRuntime(pipeline())
+        asyncio.get_running_loop().call_later(0.05, stop.set)
+        await asyncio.wait_for(rt.run([endless], stop=stop), 2)
+        return rt
+
+    rt = asyncio.run(go())
+    assert rt.processed > 0
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import pytest
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.regime import MarketRegime
+from bfrepricer.domain.types import MarketId, PriceSize, RunnerBook, SelectionId, utc_now
+from bfrepricer.state.sharding import ShardedOrchestrator, ShardError, shard_for
+
+
+def tick(mid, seq, *, is_open=None, is_closed=None, t=None):
+    rb = RunnerBook(SelectionId(11), PriceSize(2.0, 10.0), PriceSize(2.02, 12.0))
+    return MarketTick(
+        market_id=MarketId(mid),
+        seq=seq,
+        publish_time=t or utc_now(),
+        runners=(rb,),
+        is_market_open=is_open,
+        is_closed=is_closed,
+    )
+
+
+def test_shard_for_is_stable_and_in_range():
+    ids = [MarketId(f"1.{i}") for i in range(200)]
+    shards = [shard_for(m, 4) for m in ids]
+    assert shards == [shard_for(m, 4) for m in ids]
+    assert set(shards) == {0, 1, 2, 3}
+
+
+def test_workers_own_markets_and_return_results_per_tick():
+    t0 = utc_now() - timedelta(minutes=1)  # past the reopen cooldown
+    mids = [f"1.{i}" for i in range(6)]
+    ticks = [tick(m, 1, is_open=True, t=t0) for m in mids]
+    ticks += [tick(m, 2, is_open=True) for m in mids]
+    ticks.append(tick(mids[0], 3, is_closed=True))
+
+    with ShardedOrchestrator(2, batch_size=4) as orch:
+        results = orch.apply_many(ticks)
+
+    assert len(results) == len(ticks)
+
+    by_market = {}
+    for r in results:
+        by_market.setdefault(r.market_id, []).append(r)
+    for m in mids:
+        assert [r.seq for r in by_market[m]] == sorted(r.seq for r in by_market[m])
+        assert all(len(r.intents) == 1 for r in by_market[m] if r.seq in (1, 2))
+
+    closed = by_market[mids[0]][-1].closed
+    assert closed is not None
+    assert closed.snapshot.regime == MarketRegime.CLOSED
+    assert SelectionId(11) in closed.snapshot.runners
+
+
+class _Exploding:
+    def on_tick(self, tick):
+        if tick.seq == 2:
+            raise ValueError("boom")
+        return tick.seq
+
+
+def test_rejected_and_failing_ticks_come_back_instead_of_hanging():
+    with ShardedOrchestrator(1, result_timeout=10.0) as orch:
+        results = orch.apply_many([tick("1.1", 5), tick("1.1", 3), tick("1.1", 6)])
+    assert [r.seq for r in results] == [5, 3, 6]
+    assert "tick.seq=3" in results[1].error
+    assert not results[0].error and not results[2].error
+
+    with ShardedOrchestrator(1, _Exploding, result_timeout=10.0) as orch:
+        with pytest.raises(ShardError) as err:
+            orch.apply_many([tick("1.1", 1), tick("1.1", 2), tick("1.1", 3)])
+        assert err.value.results == [1, 3]
+        assert [(f.seq, f.error) for f in err.value.failures] == [(2, "ValueError: boom")]
+        assert orch.apply_many([tick("1.1", 4)]) == [4]  # the shard survived
+
+
+def test_collect_reports_a_dead_shard():
+    with ShardedOrchestrator(1, result_timeout=10.0) as orch:
+        orch._procs[0].terminate()
+        orch._procs[0].join()
+        with pytest.raises(ShardError, match="died"):
+            orch.apply_many([tick("1.1", 1)])
@@ -0,0 +1,88 @@
+from bfrepricer.ingest.stream_cache import MarketStreamCache
+
+
+def mcm(mc, *, pt=1_700_000_000_000, **extra):
+    return {"op": "mcm", "pt": pt, "mc": mc, **extra}
+
+
+IMAGE = mcm(
+    [
+        {
+            "id": "1.1",
+            "img": True,
+            "marketDefinition": {"status": "OPEN", "inPlay": False},
+            "rc": [
+                {"id": 11, "atb": [[2.0, 10.0], [1.99, 5.0]], "atl": [[2.02, 12.0], [2.04, 3.0]]},
+                {"id": 22, "atb": [[5.0, 4.0]], "atl": [[5.2, 6.0]]},
+            ],
+        }
+    ],
+    initialClk="AAA",
+    clk="BBB",
+)
+
+
+def test_image_emits_all_runners_and_stores_clocks():
+    cache = MarketStreamCache()
+    ticks = cache.apply(IMAGE)
+
+    assert len(ticks) == 1
+    t = ticks[0]
+    assert t.market_id == "1.1"
+    assert t.is_market_open is True
+    assert {rb.selection_id for rb in t.runners} == {11, 22}
+    rb = next(r for r in t.runners if r.selection_id == 11)
+    assert rb.best_back.price == 2.0
+    assert rb.best_lay.price == 2.02
+    assert cache.initial_clk == "AAA"
+    assert cache.clk == "BBB"
+
+
+def test_delta_updates_only_changed_runners_and_removes_levels():
+    cache = MarketStreamCache()
+    cache.apply(IMAGE)
+
+    ticks = cache.apply(mcm([{"id": "1.1", "rc": [{"id": 11, "atb": [[2.0, 0]]}]}], clk="CCC"))
+    assert len(ticks) == 1
+    (rb,) = ticks[0].runners
+    assert rb.selection_id == 11
+    assert rb.best_back.price == 1.99  # best level removed, next level is best
+    assert rb.best_lay.price == 2.02
+    assert cache.clk == "CCC"
+    assert cache.initial_clk == "AAA"
+
+
+def test_heartbeat_emits_nothing():
+    cache = MarketStreamCache()
+    cache.apply(IMAGE)
+    first = cache.apply(mcm([{"id": "1.1", "rc": [{"id": 22, "atl": [[5.1, 1.0]]}]}]))
+    assert cache.apply({"op": "mcm", "ct": "HEARTBEAT", "clk": "DDD"}) == []
+    assert cache.clk == "DDD"
+    assert first[0].seq > 0
+
+
+def test_img_replaces_market_and_closed_definition_evicts():
+    cache = MarketStreamCache()
+    cache.apply(IMAGE)
+
+    ticks = cache.apply(mcm([{"id": "1.1", "img": True, "rc": [{"id": 33, "batb": [[0, 3.0, 2.0]]}]}]))
+    assert [rb.selection_id for rb in ticks[0].runners] == [33]
+    assert ticks[0].runners[0].best_back.price == 3.0
+
+    ticks = cache.apply(mcm([{"id": "1.1", "marketDefinition": {"status": "CLOSED"}}]))
+    assert ticks[0].is_closed is True
+    assert cache.market_ids() == []
+
+
+def test_removed_runner_is_dropped_and_reported_once():
+    cache = MarketStreamCache()
+    cache.apply(IMAGE)
+    defn = {"status": "OPEN", "inPlay": False, "runners": [{"id": 11, "status": "ACTIVE"}, {"id": 22, "status": "REMOVED"}]}
+
+    (t,) = cache.apply(mcm([{"id": "1.1", "marketDefinition": defn, "rc": [{"id": 22, "atb": [[5.1, 1.0]]}]}]))
+    assert t.removed == (22,)
+    assert t.runners == ()
+
+    (t,) = cache.apply(mcm([{"id": "1.1", "marketDefinition": defn, "rc": [{"id": 11, "atb": [[2.0, 3.0]]}]}]))
+    assert t.removed == ()
+    assert [rb.selection_id for rb in t.runners] == [11]
@@ -0,0 +1,59 @@
+import pytest
+
+from bfrepricer.domain.types import MarketId
+from bfrepricer.ingest.stream_client import FrameSplitter, StreamAuth, StreamingClient, StreamProtocolError
+from bfrepricer.ingest.stream_stub import LoopbackStreamServer
+
+
+def test_splitter_reassembles_frames_across_reads():
+    sp = FrameSplitter()
+    assert sp.feed(b'{"a":1}\r') == []
+    assert sp.feed(b'\n{"b"') == [b'{"a":1}']
+    assert sp.feed(b':2}\r\n{"c":3}\r\n') == [b'{"b":2}', b'{"c":3}']
+    assert sp.feed(b"") == []
+
+
+FRAMES = [
+    {
+        "op": "mcm",
+        "pt": 1_700_000_000_000,
+        "initialClk": "A",
+        "clk": "B",
+        "mc": [
+            {
+                "id": "1.1",
+                "img": True,
+                "marketDefinition": {"status": "OPEN", "inPlay": False},
+                "rc": [{"id": 11, "atb": [[2.0, 10.0]], "atl": [[2.02, 12.0]]}],
+            }
+        ],
+    },
+    {"op": "mcm", "ct": "HEARTBEAT", "clk": "C"},
+    {"op": "mcm", "pt": 1_700_000_000_500, "clk": "D", "mc": [{"id": "1.1", "rc": [{"id": 11, "atl": [[2.02, 0], [2.04, 7.0]]}]}]},
+]
+
+
+def test_loopback_replay_end_to_end():
+    with LoopbackStreamServer(FRAMES, app_key="k", session_token="s", chunk_size=7) as srv:
+        host, port = srv.address
+        client = StreamingClient(StreamAuth("k", "s"), host=host, port=port, use_ssl=False, timeout=5)
+        client.connect()
+        try:
+            ticks = list(client.subscribe_to_market(MarketId("1.1")))
+        finally:
+            client.close()
+
+    assert srv.subscriptions[0]["marketFilter"] == {"marketIds": ["1.1"]}
+    assert [t.seq for t in ticks] == [1, 2]
+    assert ticks[1].runners[0].best_lay.price == 2.04
+    assert ticks[1].publish_time > ticks[0].publish_time
+    assert client.cache.clk == "D"
+
+
+def test_bad_credentials_fail_authentication():
+    with LoopbackStreamServer(FRAMES, app_key="k", session_token="s") as srv:
+        host, port = srv.address
+        client = StreamingClient(StreamAuth("k", "wrong"), host=host, port=port, use_ssl=False, timeout=5)
+        with pytest.raises(StreamProtocolError):
+            client.connect()
+        client.close()
@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from bfrepricer.domain.events import MarketTick
+from bfrepricer.domain.types import Ladder, MarketId, RunnerBook, SelectionId
+from bfrepricer.replay.tick_log import TickLogError, TickRecorder, read_ticks
+from bfrepricer.state.orchestrator import MarketOrchestrator
+
+
+def mk_tick(seq, **flags):
+    rb = RunnerBook(
+        selection_id=SelectionId(11),
+        back=Ladder.back([(2.0, 10.0), (1.99, 5.5)]),
+        lay=Ladder.lay([(2.02, 12.0)]),
+    )
+    empty = RunnerBook(SelectionId(22), None, None)
+    return MarketTick(
+        market_id=MarketId("1.234"),
+        seq=seq,
+        publish_time=datetime(2026, 5, 2, 14, 30, 0, 123456, tzinfo=timezone.utc),
+        runners=(rb, empty),
+        **flags,
+    )
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_roundtrip_preserves_ticks(tmp_path, compress):
+    ticks = [
+        mk_tick(1, is_market_open=True),
+        mk_tick(2, is_market_open=False, is_in_play=True),
+        mk_tick(3, is_market_open=True, removed=(SelectionId(33), SelectionId(44))),
+        mk_tick(4, is_closed=True),
+    ]
+    path = tmp_path / "ticks.bin"
+    with TickRecorder(path, compress=compress) as rec:
+        for t in ticks:
+            rec.record(t)
+
+    assert list(read_ticks(path)) == ticks
+
+
+def test_orchestrator_sink_records_every_tick(tmp_path):
+    path = tmp_path / "ticks.bin"
+    with TickRecorder(path) as rec:
+        orch = MarketOrchestrator(sinks=[rec])
+        orch.apply(mk_tick(1, is_market_open=True))
+        orch.apply(mk_tick(2, is_closed=True))
+
+    assert [t.seq for t in read_ticks(path)] == [1, 2]
+
+
+def test_rejects_foreign_and_truncated_files(tmp_path):
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"nope")
+    with pytest.raises(TickLogError):
+        list(read_ticks(bad))
+
+    path = tmp_path / "ticks.bin"
+    with TickRecorder(path) as rec:
+        rec.record(mk_tick(1))
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(TickLogError):
+        list(read_ticks(path))
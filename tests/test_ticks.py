@@ -0,0 +1,92 @@
+from array import array
+
+import pytest
+
+from bfrepricer.domain import ticks
+from bfrepricer.domain.ticks import (
+    FLOOR_TICK_BY_CENT,
+    PRICES,
+    ceil_tick,
+    floor_tick,
+    is_valid_price,
+    nearest_tick,
+    price_at,
+    round_price,
+    round_prices,
+    shift_price,
+    shift_prices,
+    spread_ticks,
+    tick_distance,
+    tick_distances,
+    tick_index,
+    tick_indices,
+)
+
+
+def test_ladder_covers_every_exchange_price():
+    assert len(PRICES) == 350
+    assert (PRICES[0], PRICES[-1]) == (1.01, 1000.0)
+    assert list(PRICES) == sorted(set(PRICES))
+    for p in (1.5, 2.0, 2.02, 3.05, 4.1, 6.2, 10.5, 21.0, 32.0, 55.0, 110.0):
+        assert is_valid_price(p)
+    for p in (1.0, 2.01, 3.01, 4.05, 6.1, 10.2, 21.5, 31.0, 52.0, 105.0, 1010.0):
+        assert not is_valid_price(p)
+    assert len(FLOOR_TICK_BY_CENT) == 100_001
+
+
+def test_index_round_trip_and_off_ladder_lookups():
+    for i, p in enumerate(PRICES):
+        assert tick_index(p) == i and price_at(i) == p
+    # Float noise from arithmetic still finds the tick
+    assert tick_index(1.1 + 0.2) == tick_index(1.3)
+    with pytest.raises(ValueError):
+        tick_index(4.05)
+    with pytest.raises(IndexError):
+        price_at(len(PRICES))
+
+    assert PRICES[floor_tick(4.05)] == 4.0
+    assert PRICES[ceil_tick(4.05)] == 4.1
+    assert PRICES[nearest_tick(4.07)] == 4.1
+    assert PRICES[nearest_tick(4.05)] == 4.0  # ties go down
+    assert (floor_tick(0.5), ceil_tick(5000.0)) == (0, len(PRICES) - 1)
+
+    assert round_price(2.013) == 2.02
+    assert round_price(2.013, "down") == 2.0
+    assert round_price(2.013, "up") == 2.02
+    with pytest.raises(ValueError):
+        round_price(2.0, "sideways")  # type: ignore[arg-type]
+
+
+def test_distance_and_shift_cross_increment_bands():
+    assert tick_distance(1.99, 2.02) == 2
+    assert tick_distance(2.98, 3.05) == 2
+    assert tick_distance(6.0, 5.9) == -1
+    assert tick_distance(1.01, 1000.0) == len(PRICES) - 1
+
+    assert shift_price(1.99, 2) == 2.02
+    assert shift_price(10.0, -1) == 9.8
+    assert shift_price(1.02, -5) == 1.01
+    assert shift_price(990.0, 3) == 1000.0
+    with pytest.raises(ValueError):
+        shift_price(2.01, 1)
+
+
+def test_spread_ticks_matches_floor_and_ceil_lookups():
+    for back, lay in [(2.0, 2.02), (4.0, 4.05), (1.995, 2.015), (0.5, 1.01), (990.0, 1200.0), (3.0, 2.5)]:
+        assert spread_ticks(back, lay) == ceil_tick(lay) - floor_tick(back)
+    assert spread_ticks(2.0, 2.02) == 1
+
+
+def test_sequence_forms_match_the_scalar_lookups():
+    prices = [1.5, 2.013, 3.05, 4.05, 999.0]
+    assert tick_indices(prices, "down") == array("h", map(floor_tick, prices))
+    assert tick_indices(prices, "nearest") == array("h", map(nearest_tick, prices))
+    assert round_prices(prices, "up") == array("d", (round_price(p, "up") for p in prices))
+    with pytest.raises(ValueError):
+        tick_indices(prices)
+
+    valid = [1.5, 2.02, 3.05, 4.1, 990.0]
+    assert tick_indices(valid) == array("h", map(tick_index, valid))
+    assert ticks.prices_at(tick_indices(valid)) == array("d", valid)
+    assert tick_distances(valid, valid[1:] + [1000.0]) == array("h", [51, 50, 20, 178, 1])
+    assert shift_prices(valid, 1) == array("d", [1.51, 2.04, 3.1, 4.2, 1000.0])